@@ -0,0 +1,81 @@
+import random
+
+from netswitch.adapters import parse_netsh_interfaces
+from netswitch.dnsconfig import parse_netsh_dnsservers
+from netswitch.ping import parse_windows_ping_output, parse_unix_ping_output
+
+from .harness import measure
+
+# ----------------------
+# Parser Throughput Benchmarks
+# ----------------------
+
+def make_netsh_interfaces(count, seed=5):
+    """`netsh interface show interface` output for count adapters"""
+    rng = random.Random(seed)
+    lines = [
+        "",
+        "Admin State    State          Type             Interface Name",
+        "-------------------------------------------------------------------------",
+    ]
+    for i in range(count):
+        state = rng.choice(["Connected", "Disconnected"])
+        name = rng.choice(["Wi-Fi", "Ethernet", "vEthernet (WSL)", "Local Area Connection*"]) + f" {i}"
+        lines.append(f"Enabled        {state:<15}Dedicated        {name}")
+    return "\r\n".join(lines) + "\r\n"
+
+def make_netsh_dnsservers(count, seed=6):
+    """`netsh interface ip show dnsservers` output for count adapters"""
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(count):
+        if rng.random() < 0.5:
+            body = ["    DNS servers configured through DHCP:  192.168.1.1",
+                    "    Register with which suffix:           Primary only"]
+        else:
+            body = ["    Statically Configured DNS Servers:    1.1.1.1",
+                    "                                          1.0.0.1",
+                    "    Register with which suffix:           Primary only"]
+        blocks.append("\r\n".join([f'Configuration for interface "Ethernet {i}"'] + body))
+    return "\r\n\r\n".join(blocks) + "\r\n"
+
+def make_windows_ping(count, seed=7):
+    rng = random.Random(seed)
+    lines = ["", "Pinging 1.1.1.1 with 32 bytes of data:"]
+    received = 0
+    for _ in range(count):
+        if rng.random() < 0.05:
+            lines.append("Request timed out.")
+        else:
+            received += 1
+            lines.append(f"Reply from 1.1.1.1: bytes=32 time={rng.randrange(1, 80)}ms TTL=57")
+    lines += ["", "Ping statistics for 1.1.1.1:",
+              f"    Packets: Sent = {count}, Received = {received}, Lost = {count - received} (0% loss),"]
+    return "\r\n".join(lines) + "\r\n"
+
+def make_unix_ping(count, seed=8):
+    rng = random.Random(seed)
+    lines = ["PING 1.1.1.1 (1.1.1.1) 56(84) bytes of data."]
+    received = 0
+    for seq in range(1, count + 1):
+        if rng.random() >= 0.05:
+            received += 1
+            lines.append(f"64 bytes from 1.1.1.1: icmp_seq={seq} ttl=57 time={rng.uniform(1, 80):.1f} ms")
+    lines += ["", "--- 1.1.1.1 ping statistics ---",
+              f"{count} packets transmitted, {received} received, {100 - 100 * received // count}% packet loss"]
+    return "\n".join(lines) + "\n"
+
+def run(quick=False):
+    count = 500 if quick else 5000
+    repeat = 3 if quick else 5
+    interfaces = make_netsh_interfaces(count)
+    dnsservers = make_netsh_dnsservers(count)
+    windows_ping = make_windows_ping(count * 2)
+    unix_ping = make_unix_ping(count * 2)
+
+    return [
+        measure("parsers.netsh_interfaces", lambda: parse_netsh_interfaces(interfaces), count, repeat),
+        measure("parsers.netsh_dnsservers", lambda: parse_netsh_dnsservers(dnsservers), count, repeat),
+        measure("parsers.windows_ping", lambda: parse_windows_ping_output(windows_ping), count * 2, repeat),
+        measure("parsers.unix_ping", lambda: parse_unix_ping_output(unix_ping), count * 2, repeat),
+    ]
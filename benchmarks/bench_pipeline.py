@@ -0,0 +1,136 @@
+import socket
+import ssl
+import tempfile
+from contextlib import ExitStack
+
+from netswitch.benchmark import benchmark_dns
+from netswitch.catalog import stream_benchmark
+from netswitch.cdn import EdgeCache, benchmark_cdn
+from netswitch.encrypted import benchmark_encrypted
+
+from .harness import measure
+from .stubdns import StubDnsServer, StubTlsDnsServer, make_self_signed_cert
+
+# ----------------------
+# Resolver Ranking Pipeline Benchmarks
+# ----------------------
+
+# (delay ms, jitter ms, loss) for each stub resolver; every one listens on its own loopback address
+PROFILES = [
+    (2, 0.5, 0.0),
+    (5, 1, 0.0),
+    (10, 2, 0.0),
+    (20, 2, 0.0),
+    (40, 5, 0.0),
+    (5, 1, 0.2),
+    (10, 2, 0.5),
+    (80, 10, 0.0),
+]
+
+def start_stubs(stack, profiles=PROFILES, first_host=10):
+    """Start one stub per profile on 127.0.0.<first_host + i>, all on the same port"""
+    stubs = []
+    port = 0
+    for i, (delay, jitter, loss) in enumerate(profiles):
+        stub = StubDnsServer(f"127.0.0.{first_host + i}", port, delay, jitter, loss, seed=i)
+        port = stub.port
+        stubs.append(stack.enter_context(stub))
+    return stubs
+
+def expected_order(stubs):
+    """Lossless stubs ranked by configured delay, as the benchmark should rank them"""
+    return [s.host for s in sorted(stubs, key=lambda s: s.delay_ms) if not s.loss]
+
+def run(quick=False):
+    samples = 3 if quick else 5
+    repeat = 2 if quick else 3
+    results = []
+
+    with ExitStack() as stack:
+        stubs = start_stubs(stack)
+        servers = [s.host for s in stubs]
+        port = stubs[0].port
+
+        ranking = []
+
+        def rank():
+            ranking[:] = benchmark_dns(servers, samples=samples, deadline=3.0, timeout=0.5, port=port)
+
+        row = measure("pipeline.benchmark_dns", rank, len(servers) * samples, repeat)
+        reachable = [r["server"] for r in ranking if r["received"] == r["sent"]]
+        row["ranking_ok"] = reachable == [h for h in expected_order(stubs) if h in reachable]
+        row["lossy_detected"] = all(r["loss"] > 0 for r in ranking if r["server"] in
+                                    [s.host for s in stubs if s.loss >= 0.5])
+        results.append(row)
+
+        # The same resolvers repeated as a catalog, streamed with bounded concurrency
+        entries = [{"address": host} for host in servers] * (4 if quick else 16)
+        results.append(measure(
+            "pipeline.stream_benchmark",
+            lambda: list(stream_benchmark(entries, samples=1, concurrency=32, timeout=0.5, port=port)),
+            len(entries), repeat,
+        ))
+
+    results.extend(run_cdn(repeat))
+    results.extend(run_encrypted(samples, repeat))
+    return results
+
+def run_cdn(repeat):
+    """Resolve + connect ranking: the fastest resolver hands out an edge nobody listens on"""
+    results = []
+    with ExitStack() as stack:
+        listener = stack.enter_context(socket.socket())
+        listener.bind(("127.0.0.90", 0))
+        listener.listen(256)
+        edge_port = listener.getsockname()[1]
+
+        stubs = []
+        port = 0
+        for i, (delay, address) in enumerate(((2, "127.0.0.91"), (5, "127.0.0.90"), (20, "127.0.0.90"))):
+            stub = StubDnsServer(f"127.0.0.{70 + i}", port, delay, address=address, seed=i)
+            port = stub.port
+            stubs.append(stack.enter_context(stub))
+
+        ranking = []
+        cache = EdgeCache()
+
+        def rank():
+            cache.clear()
+            ranking[:] = benchmark_cdn([s.host for s in stubs], port=port, connect_port=edge_port,
+                                       timeout=1.0, cache=cache)
+
+        row = measure("pipeline.benchmark_cdn", rank, len(stubs), repeat)
+        row["ranking_ok"] = [r["server"] for r in ranking] == [stubs[1].host, stubs[2].host, stubs[0].host]
+        row["edge_connects"] = cache.connects
+        results.append(row)
+    return results
+
+def run_encrypted(samples, repeat):
+    """DoT and DoH rankings against TLS stubs; skipped when no openssl tool is available"""
+    results = []
+    with tempfile.TemporaryDirectory() as directory, ExitStack() as stack:
+        cert = make_self_signed_cert(directory)
+        if cert is None:
+            return results
+        context = ssl.create_default_context(cafile=cert[0])
+        for offset, mode in ((40, "dot"), (50, "doh")):
+            stubs = []
+            port = 0
+            for i, (delay, jitter, loss) in enumerate(PROFILES[:5]):
+                stub = StubTlsDnsServer(*cert, mode=mode, host=f"127.0.0.{offset + i}", port=port,
+                                        delay_ms=delay, jitter_ms=jitter, loss=loss, seed=i)
+                port = stub.port
+                stubs.append(stack.enter_context(stub))
+            hostnames = {s.host: "localhost" for s in stubs}
+
+            ranking = []
+
+            def rank():
+                ranking[:] = benchmark_encrypted([s.host for s in stubs], mode, samples=samples, deadline=5.0,
+                                                 timeout=1.0, port=port, hostnames=hostnames, context=context)
+
+            row = measure(f"pipeline.benchmark_{mode}", rank, len(stubs) * samples, repeat)
+            row["ranking_ok"] = [r["server"] for r in ranking] == expected_order(stubs)
+            row["sessions_resumed"] = sum(r["session_resumed"] for r in ranking)
+            results.append(row)
+    return results
@@ -0,0 +1,85 @@
+import random
+
+from netswitch.sanitize import sanitize_string, sanitize_command_args, is_valid_ip, is_valid_ipv6
+from netswitch.validation import validate_addresses
+
+from . import legacy_validators as legacy
+from .harness import measure
+
+# ----------------------
+# Validator Micro-benchmarks
+# ----------------------
+
+def make_ipv4_list(count, seed=1):
+    """Mostly valid IPv4 addresses with the usual malformed cases mixed in"""
+    rng = random.Random(seed)
+    bad = ["256.1.1.1", "1.2.3", "01.2.3.4", "1.2.3.4.5", "a.b.c.d", "1.2.3.-4", " 1.2.3.4 ", ""]
+    addresses = []
+    for i in range(count):
+        if i % 5 == 4:
+            addresses.append(rng.choice(bad))
+        else:
+            addresses.append(".".join(str(rng.randrange(256)) for _ in range(4)))
+    return addresses
+
+def make_ipv6_list(count, seed=2):
+    """Full, compressed, IPv4-mapped and malformed IPv6 addresses"""
+    rng = random.Random(seed)
+    bad = ["2001:db8::g", "2001:db8:::1", "1:2:3:4:5:6:7:8:9", "12345::", ":", "fe80::1%", ""]
+    addresses = []
+    for i in range(count):
+        groups = [f"{rng.randrange(65536):x}" for _ in range(8)]
+        kind = i % 5
+        if kind == 0:
+            addresses.append(":".join(groups))
+        elif kind == 1:
+            addresses.append(f"{groups[0]}:{groups[1]}::{groups[7]}")
+        elif kind == 2:
+            addresses.append(f"::ffff:{rng.randrange(256)}.{rng.randrange(256)}.1.{rng.randrange(256)}")
+        elif kind == 3:
+            addresses.append(f"fe80::{groups[6]}:{groups[7]}")
+        else:
+            addresses.append(rng.choice(bad))
+    return addresses
+
+def make_strings(count, seed=3):
+    """Adapter names and free text with control characters and overlong input"""
+    rng = random.Random(seed)
+    samples = ["Wi-Fi", "Ethernet 2", "Local Area Connection* 12", "vEthernet (WSL)", "bad\x00name\x1b[31m",
+               "  padded  ", "x" * 400, "tab\tand\nnewline", "\x7f\x80\x9f mixed"]
+    return [rng.choice(samples) + str(i) for i in range(count)]
+
+def make_command_lines(count, seed=4):
+    rng = random.Random(seed)
+    args = ["netsh", "interface", "ip", "set", "dns", 'name="Wi-Fi"', "static", "1.1.1.1",
+            "primary", "validate=no", "; del C:\\", "$(calc)", "a|b", "`x`"]
+    return [[rng.choice(args) for _ in range(8)] for _ in range(count)]
+
+def _disagreements(new, old, items):
+    return sum(1 for item in items if bool(new(item)) != bool(old(item)))
+
+def run(quick=False):
+    count = 2000 if quick else 20000
+    repeat = 3 if quick else 5
+    ipv4 = make_ipv4_list(count)
+    ipv6 = make_ipv6_list(count)
+    mixed = ipv4[: count // 2] + ipv6[: count // 2]
+    strings = make_strings(count)
+    commands = make_command_lines(count // 10)
+
+    return [
+        measure("validators.is_valid_ip", lambda: [is_valid_ip(a) for a in ipv4], count, repeat),
+        measure("validators.is_valid_ipv6", lambda: [is_valid_ipv6(a) for a in ipv6], count, repeat),
+        measure("validators.either_family", lambda: [is_valid_ip(a) or is_valid_ipv6(a) for a in mixed],
+                count, repeat),
+        dict(measure("validators.legacy.is_valid_ip", lambda: [legacy.is_valid_ip(a) for a in ipv4], count, repeat),
+             disagreements=_disagreements(is_valid_ip, legacy.is_valid_ip, ipv4)),
+        dict(measure("validators.legacy.is_valid_ipv6", lambda: [legacy.is_valid_ipv6(a) for a in ipv6], count, repeat),
+             disagreements=_disagreements(is_valid_ipv6, legacy.is_valid_ipv6, ipv6)),
+        measure("validators.validate_addresses", lambda: validate_addresses(mixed + mixed), count * 2, repeat),
+        measure("validators.legacy.validate_addresses", lambda: legacy.validate_addresses(mixed + mixed),
+                count * 2, repeat),
+        measure("validators.sanitize_string", lambda: [sanitize_string(s, 100) for s in strings], count, repeat),
+        measure("validators.sanitize_command_args", lambda: [sanitize_command_args(c) for c in commands],
+                len(commands), repeat),
+    ]
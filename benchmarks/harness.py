@@ -0,0 +1,83 @@
+import json
+import platform
+import statistics
+import sys
+import time
+
+# ----------------------
+# Benchmark Harness
+# ----------------------
+
+def measure(name, fn, items=1, repeat=5, number=1, setup=None):
+    """Run fn() number times per round for repeat rounds and summarize the per-round timings
+
+    items is how many units of work (addresses, lines, queries) one call of fn processes.
+    """
+    if setup is not None:
+        setup()
+    fn()  # Warm-up: imports, regex compilation, socket setup
+
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+
+    best = min(rounds)
+    return {
+        "name": name,
+        "items": items,
+        "repeat": repeat,
+        "number": number,
+        "best_s": round(best, 6),
+        "median_s": round(statistics.median(rounds), 6),
+        "items_per_s": round(items / best, 1) if best > 0 else None,
+    }
+
+def environment():
+    """Details that make results comparable (or not) across runs"""
+    import netswitch
+    return {
+        "netswitch": netswitch.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+def save_results(path, results):
+    """Write a suite run as JSON"""
+    with open(path, "w", encoding="utf-8") as results_file:
+        json.dump({"environment": environment(), "results": results}, results_file, indent=2)
+
+def load_results(path):
+    with open(path, encoding="utf-8") as results_file:
+        return json.load(results_file)
+
+def compare(baseline, current, threshold=0.10):
+    """Per-benchmark change in best time; entries slower than threshold are flagged"""
+    before = {r["name"]: r for r in baseline["results"]}
+    report = []
+    for row in current["results"]:
+        old = before.get(row["name"])
+        if old is None or not old.get("best_s"):
+            continue
+        change = row["best_s"] / old["best_s"] - 1
+        report.append({
+            "name": row["name"],
+            "baseline_s": old["best_s"],
+            "current_s": row["best_s"],
+            "change": round(change, 3),
+            "regression": change > threshold,
+        })
+    return report
+
+def print_table(results, stream=sys.stdout):
+    width = max((len(r["name"]) for r in results), default=10)
+    for r in results:
+        extra = "  ".join(f"{k}={v}" for k, v in r.items()
+                          if k not in ("name", "items", "repeat", "number", "best_s", "median_s", "items_per_s"))
+        rate = f"{r['items_per_s']:>14,.0f}/s" if r.get("items_per_s") else " " * 16
+        print(f"{r['name']:<{width}}  best {r['best_s'] * 1000:>10.3f} ms  {rate}  {extra}".rstrip(), file=stream)
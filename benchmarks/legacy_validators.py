@@ -0,0 +1,43 @@
+import re
+
+from netswitch.sanitize import sanitize_string
+
+# ----------------------
+# Legacy Validators
+# ----------------------
+
+# Frozen copies of the regex validators that predate netswitch.validation, kept as the baseline
+
+def is_valid_ip(ip):
+    if not isinstance(ip, str):
+        return False
+    ip = sanitize_string(ip, 15)
+    pattern = r"^(?:[0-9]{1,3}\.){3}[0-9]{1,3}$"
+    if not re.match(pattern, ip):
+        return False
+    try:
+        parts = ip.split('.')
+        if len(parts) != 4:
+            return False
+        for part in parts:
+            num = int(part)
+            if not (0 <= num <= 255):
+                return False
+            if len(part) > 1 and part[0] == '0':
+                return False
+        return True
+    except (ValueError, IndexError):
+        return False
+
+def is_valid_ipv6(ip):
+    if not isinstance(ip, str):
+        return False
+    ip = sanitize_string(ip, 45)
+    pattern = r'^([0-9a-fA-F]{0,4}:){1,7}[0-9a-fA-F]{0,4}$|^::1$|^::$'
+    return bool(re.match(pattern, ip))
+
+def validate_addresses(addresses):
+    """What callers did before the batch API: sanitize, validate and dedupe in separate steps"""
+    cleaned = [sanitize_string(a, 45) for a in addresses]
+    valid = [a for a in cleaned if is_valid_ip(a) or is_valid_ipv6(a)]
+    return list(dict.fromkeys(valid))
@@ -0,0 +1,46 @@
+import argparse
+import sys
+
+from . import bench_validators, bench_parsers, bench_pipeline
+from .harness import compare, load_results, print_table, save_results
+
+# ----------------------
+# Benchmark Runner
+# ----------------------
+
+SUITES = {
+    "validators": bench_validators,
+    "parsers": bench_parsers,
+    "pipeline": bench_pipeline,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="NetSwitch benchmark suite")
+    parser.add_argument("suites", nargs="*", help=f"suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs and fewer rounds")
+    parser.add_argument("--output", default="benchmark-results.json", help="where to save results as JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown reported as a regression")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    unknown = [name for name in args.suites if name not in SUITES]
+    if unknown:
+        parser.error(f"unknown suite: {', '.join(unknown)}")
+
+    results = []
+    for name in args.suites or SUITES:
+        results.extend(SUITES[name].run(quick=args.quick))
+    print_table(results)
+    save_results(args.output, results)
+    print(f"\nSaved {len(results)} results to {args.output}")
+
+    if args.compare:
+        report = compare(load_results(args.compare), {"results": results}, args.threshold)
+        regressions = [r for r in report if r["regression"]]
+        for r in report:
+            flag = "REGRESSION" if r["regression"] else ""
+            print(f"{r['name']:<36} {r['change']:>+8.1%}  {flag}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import os
+import random
+import socket
+import ssl
+import struct
+import subprocess
+import threading
+import time
+
+# ----------------------
+# Stub DNS Server
+# ----------------------
+
+class StubDnsServer:
+    """Local UDP/TCP DNS responder with injected latency, jitter and loss
+
+    Answers every A query with `address` and every AAAA query with ::1, so the
+    resolver-ranking pipeline can be measured without any network access.
+    Loss decisions come from a seeded generator to keep runs reproducible.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, delay_ms=0.0, jitter_ms=0.0, loss=0.0,
+                 address="192.0.2.1", ttl=300, seed=0):
+        self.host = host
+        self.delay_ms = delay_ms
+        self.jitter_ms = jitter_ms
+        self.loss = loss
+        self.address = address
+        self.ttl = ttl
+        self.queries = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        self._udp = socket.socket(family, socket.SOCK_DGRAM)
+        self._udp.bind((host, port))
+        self.port = self._udp.getsockname()[1]
+        self._tcp = socket.socket(family, socket.SOCK_STREAM)
+        self._tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._tcp.bind((host, self.port))
+        self._tcp.listen(16)
+
+    def start(self):
+        self._running.set()
+        for target in (self._serve_udp, self._serve_tcp):
+            threading.Thread(target=target, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._running.clear()
+        for sock in (self._udp, self._tcp):
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _answer(self, query):
+        """Build a NOERROR response for the first question of query"""
+        offset = 12
+        while query[offset]:
+            offset += query[offset] + 1
+        end = offset + 5
+        qtype = struct.unpack("!H", query[offset + 1:offset + 3])[0]
+        if qtype == 28:
+            record = struct.pack("!HHIH", 28, 1, self.ttl, 16) + socket.inet_pton(socket.AF_INET6, "::1")
+        else:
+            record = struct.pack("!HHIH", 1, 1, self.ttl, 4) + socket.inet_aton(self.address)
+        header = query[:2] + struct.pack("!HHHHH", 0x8180, 1, 1, 0, 0)
+        return header + query[12:end] + b"\xc0\x0c" + record
+
+    def _decide(self):
+        """Return the reply delay in seconds, or None to drop the query"""
+        with self._lock:
+            self.queries += 1
+            if self._random.random() < self.loss:
+                return None
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.delay_ms + jitter) / 1000.0
+
+    def _serve_udp(self):
+        while self._running.is_set():
+            try:
+                query, client = self._udp.recvfrom(4096)
+            except OSError:
+                return
+            delay = self._decide()
+            if delay is None:
+                continue
+            threading.Timer(delay, self._reply_udp, (query, client)).start()
+
+    def _reply_udp(self, query, client):
+        try:
+            self._udp.sendto(self._answer(query), client)
+        except (OSError, IndexError, struct.error):
+            pass
+
+    def _serve_tcp(self):
+        while self._running.is_set():
+            try:
+                conn, _ = self._tcp.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._reply_tcp, args=(conn,), daemon=True).start()
+
+    def _reply_tcp(self, conn):
+        with conn:
+            try:
+                header = conn.recv(2)
+                if len(header) < 2:
+                    return
+                size = struct.unpack("!H", header)[0]
+                query = b""
+                while len(query) < size:
+                    chunk = conn.recv(size - len(query))
+                    if not chunk:
+                        return
+                    query += chunk
+                delay = self._decide()
+                if delay is None:
+                    return
+                time.sleep(delay)
+                response = self._answer(query)
+                conn.sendall(struct.pack("!H", len(response)) + response)
+            except (OSError, IndexError, struct.error):
+                return
+
+# ----------------------
+# Encrypted Stub Servers
+# ----------------------
+
+def make_self_signed_cert(directory, hostname="localhost"):
+    """Create a throwaway certificate with the openssl tool; returns (certfile, keyfile) or None"""
+    certfile = os.path.join(directory, "stub-cert.pem")
+    keyfile = os.path.join(directory, "stub-key.pem")
+    cmd = [
+        "openssl", "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1",
+        "-nodes", "-days", "1", "-subj", f"/CN={hostname}", "-addext", f"subjectAltName=DNS:{hostname}",
+        "-keyout", keyfile, "-out", certfile,
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return certfile, keyfile
+
+class StubTlsDnsServer(StubDnsServer):
+    """DNS over TLS (RFC 7858) or DNS over HTTPS (RFC 8484) stub with injected latency and loss
+
+    Connections are kept open for further queries, and the server context
+    issues session tickets so clients can resume.
+    """
+
+    def __init__(self, certfile, keyfile, mode="dot", host="127.0.0.1", port=0, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self.mode = mode
+        self.handshakes = 0
+        self.context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.context.load_cert_chain(certfile, keyfile)
+
+    def start(self):
+        self._running.set()
+        threading.Thread(target=self._serve_tls, daemon=True).start()
+        return self
+
+    def _serve_tls(self):
+        while self._running.is_set():
+            try:
+                conn, _ = self._tcp.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle_tls, args=(conn,), daemon=True).start()
+
+    def _handle_tls(self, conn):
+        try:
+            conn.settimeout(10)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            tls = self.context.wrap_socket(conn, server_side=True)
+        except (OSError, ssl.SSLError):
+            conn.close()
+            return
+        with self._lock:
+            self.handshakes += 1
+        with tls:
+            try:
+                while True:
+                    query = self._read_dot(tls) if self.mode == "dot" else self._read_doh(tls)
+                    if query is None:
+                        return
+                    delay = self._decide()
+                    if delay is None:
+                        continue
+                    time.sleep(delay)
+                    response = self._answer(query)
+                    if self.mode == "dot":
+                        tls.sendall(struct.pack("!H", len(response)) + response)
+                    else:
+                        tls.sendall(
+                            b"HTTP/1.1 200 OK\r\nContent-Type: application/dns-message\r\n"
+                            + f"Content-Length: {len(response)}\r\n\r\n".encode("ascii") + response
+                        )
+            except (OSError, ssl.SSLError, IndexError, ValueError, struct.error):
+                return
+
+    @staticmethod
+    def _read_exact(tls, size):
+        data = b""
+        while len(data) < size:
+            chunk = tls.recv(size - len(data))
+            if not chunk:
+                return None
+            data += chunk
+        return data
+
+    def _read_dot(self, tls):
+        header = self._read_exact(tls, 2)
+        return self._read_exact(tls, struct.unpack("!H", header)[0]) if header else None
+
+    def _read_doh(self, tls):
+        """Read one HTTP/1.1 POST request and return its body"""
+        head = b""
+        while b"\r\n\r\n" not in head:
+            chunk = tls.recv(1)
+            if not chunk:
+                return None
+            head += chunk
+        length = 0
+        for line in head.decode("latin-1").split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value.strip())
+        return self._read_exact(tls, length)
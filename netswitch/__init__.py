@@ -0,0 +1,71 @@
+__version__ = "1.1.1"
+
+from .sanitize import (
+    sanitize_string,
+    sanitize_network_adapter_name,
+    validate_dns_server_name,
+    sanitize_command_args,
+    is_valid_ip,
+    is_valid_ipv6,
+)
+from .validation import is_ipv4, is_ipv6, normalize_address, parse_address, is_server_address, validate_addresses
+from .probe import DNS_PORT, DEFAULT_PROBE_DOMAIN, build_dns_query, parse_dns_response, probe_dns
+from .ping import parse_ping_output, ping_samples
+from .benchmark import DEFAULT_DNS_CANDIDATES, test_dns, summarize_samples, benchmark_dns, find_fastest_dns
+from .commands import run_command
+from .dnsconfig import (
+    apply_dns,
+    apply_dns_batch,
+    apply_dns_config,
+    rollback_dns,
+    flush_dns,
+    get_dns_servers,
+    parse_netsh_dnsservers,
+    plan_dns_changes,
+    build_netsh_dns_script,
+)
+from .adapters import (
+    ALL_ADAPTERS,
+    AdapterInventory,
+    list_adapters,
+    parse_netsh_interfaces,
+    get_network_context,
+    network_fingerprint,
+)
+from .forwarder import FORWARDER_ADDRESS, DnsCache, DnsForwarder, upstreams_from_ranking
+from .monitor import ResolverHealth, ResolverMonitor
+from .catalog import BUILTIN_CATALOG, RateLimiter, RankingBoard, load_catalog, stream_benchmark, benchmark_catalog
+from .workload import load_domains, benchmark_workload
+from .probecache import ProbeCache
+from .adaptive import adaptive_benchmark
+from .warmup import DEFAULT_HOT_DOMAINS, hot_domains, warm_up
+from .netwatch import NetworkChangeDetector, current_network_context, read_proc_network_context
+from .platforms import PlatformBackend, WindowsBackend, LinuxBackend, get_backend
+from .cdn import DEFAULT_CDN_DOMAINS, EdgeCache, benchmark_cdn, measure_connect
+from .dualstack import PROVIDERS, benchmark_dual_stack, provider_servers
+from .metrics import REGISTRY, MetricsRegistry, timed, span, write_metrics, enable_profiling, set_tracer
+
+# Re-exports whose modules pull in sqlite3, ssl/http.client or asyncio load on first use,
+# so commands that never touch them keep a fast cold start
+_LAZY_EXPORTS = {
+    "HistoryStore": "history",
+    "default_history_path": "history",
+    "ENCRYPTED_TRANSPORTS": "encrypted",
+    "EncryptedProbePool": "encrypted",
+    "benchmark_encrypted": "encrypted",
+    "AsyncCore": "asynccore",
+    "AsyncHandle": "asynccore",
+    "async_run_command": "asynccore",
+}
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
@@ -0,0 +1,190 @@
+import hashlib
+import re
+import subprocess
+import threading
+import time
+
+from .sanitize import sanitize_string, sanitize_network_adapter_name
+from .commands import run_command
+
+# ----------------------
+# Network Adapter Inventory
+# ----------------------
+
+ALL_ADAPTERS = "All Network Adapters"
+DEFAULT_ADAPTERS = ["Wi-Fi", "Ethernet", "Local Area Connection"]
+
+def parse_netsh_interfaces(text):
+    """Parse `netsh interface show interface` output into adapter records"""
+    records = []
+    if not isinstance(text, str):
+        return records
+
+    in_table = False
+    for line in text.splitlines():
+        line = sanitize_string(line, 200)
+        if not line:
+            continue
+        if set(line) == {"-"}:
+            in_table = True
+            continue
+        if not in_table:
+            continue
+
+        # Columns: Admin State, State, Type, Interface Name (may contain spaces)
+        parts = line.split(None, 3)
+        if len(parts) != 4:
+            continue
+        records.append({
+            "admin_state": parts[0],
+            "state": parts[1],
+            "type": parts[2],
+            "name": parts[3],
+        })
+    return records
+
+def list_adapters(runner=None, timeout=15):
+    """Enumerate adapters via netsh, returning records or None on failure"""
+    runner = runner or run_command
+    try:
+        # Use fixed command to prevent injection
+        cmd = ["netsh", "interface", "show", "interface"]
+        result = runner(cmd, timeout)
+        if result.returncode != 0:
+            return None
+        return parse_netsh_interfaces(result.stdout)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+
+# ----------------------
+# Network Context
+# ----------------------
+
+_CONFIG_HEADER_RE = re.compile(r'^Configuration for interface "(.+)"\s*$')
+_CONFIG_FIELDS = {
+    "IP Address": "address",
+    "Subnet Prefix": "subnet",
+    "Default Gateway": "gateway",
+}
+
+def parse_netsh_ip_config(text):
+    """Parse `netsh interface ipv4 show config` output into {adapter: {address, subnet, gateway}}"""
+    config = {}
+    if not isinstance(text, str):
+        return config
+
+    current = None
+    for line in text.splitlines():
+        line = sanitize_string(line, 200)
+        header = _CONFIG_HEADER_RE.match(line)
+        if header:
+            current = config.setdefault(sanitize_string(header.group(1), 50), {})
+            continue
+        if current is None or ":" not in line:
+            continue
+        label, value = (part.strip() for part in line.split(":", 1))
+        field = _CONFIG_FIELDS.get(label)
+        if field and value and field not in current:
+            # "192.168.1.0/24 (mask 255.255.255.0)" keeps only the prefix
+            current[field] = value.split()[0]
+    return config
+
+def get_network_context(runner=None, timeout=15):
+    """Addresses, subnets and gateways of the adapters that have a gateway, or None on failure"""
+    runner = runner or run_command
+    try:
+        cmd = ["netsh", "interface", "ipv4", "show", "config"]
+        result = runner(cmd, timeout)
+        if result.returncode != 0:
+            return None
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    config = parse_netsh_ip_config(result.stdout)
+    return {name: entry for name, entry in config.items() if entry.get("gateway")}
+
+def network_fingerprint(context):
+    """Short stable digest of a network context (adapters, subnets, gateways)"""
+    if not context:
+        return "unknown"
+    parts = sorted(
+        f"{name}|{entry.get('subnet', '')}|{entry.get('gateway', '')}"
+        + (f"|{entry['gateway6']}" if entry.get("gateway6") else "")
+        for name, entry in context.items()
+    )
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()[:16]
+
+def _platform_adapters():
+    """Adapter records from the running platform's backend"""
+    from .platforms import get_backend
+    return get_backend().list_adapters()
+
+class AdapterInventory:
+    """TTL cache of adapter records that refreshes in the background"""
+
+    def __init__(self, ttl=60.0, loader=None):
+        self.ttl = ttl
+        self.loader = loader or _platform_adapters
+        self.version = 0
+        self._records = []
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def records(self):
+        """Return the cached adapter records without blocking"""
+        with self._lock:
+            return list(self._records)
+
+    def is_stale(self):
+        """Whether the cache is empty or older than its TTL"""
+        with self._lock:
+            return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    def names(self, limit=20):
+        """Return sanitized adapter names for display, with safe defaults"""
+        names = [ALL_ADAPTERS]
+        for record in self.records():
+            name = sanitize_network_adapter_name(record["name"])
+            if name and name not in names:
+                names.append(name)
+
+        # Ensure we always have at least the default options
+        if len(names) == 1:
+            names.extend(DEFAULT_ADAPTERS)
+        return names[:limit]  # Limit to prevent UI overflow
+
+    def connected_names(self):
+        """Return names of enabled, connected adapters (used for all-adapter applies)"""
+        names = []
+        for record in self.records():
+            if record["admin_state"] == "Enabled" and record["state"] == "Connected":
+                name = sanitize_network_adapter_name(record["name"])
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def refresh(self):
+        """Reload adapter records synchronously, keeping old data on failure"""
+        try:
+            records = self.loader()
+        except Exception:
+            records = None
+        with self._lock:
+            self._refreshing = False
+            self._loaded_at = time.monotonic()
+            if records is not None and records != self._records:
+                self._records = records
+                self.version += 1
+        return self.records()
+
+    def refresh_async(self, submit=None):
+        """Start a background refresh unless one is already running"""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        if submit is not None:
+            submit(self.refresh)
+        else:
+            threading.Thread(target=self.refresh, daemon=True).start()
+        return True
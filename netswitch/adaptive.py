@@ -0,0 +1,124 @@
+import math
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from .sanitize import sanitize_string, is_valid_ip, is_valid_ipv6
+from .probe import DNS_PORT, DEFAULT_PROBE_DOMAIN
+from .benchmark import test_dns, summarize_samples, rank_key
+
+# ----------------------
+# Adaptive Probe Scheduler
+# ----------------------
+
+class _Arm:
+    """Samples and confidence interval for one resolver"""
+
+    def __init__(self, server):
+        self.server = server
+        self.samples = []
+        self.eliminated_round = None
+
+    def add(self, rtt):
+        self.samples.append(rtt)
+
+    def interval(self, penalty_ms, z, min_spread_ms):
+        """(mean, lower, upper) latency with lost probes counted as penalty_ms"""
+        values = [s if s is not None else penalty_ms for s in self.samples]
+        mean = statistics.fmean(values)
+        spread = statistics.stdev(values) if len(values) > 1 else mean
+        # A floor on the spread keeps two identical samples from claiming certainty
+        error = z * max(spread, min_spread_ms) / math.sqrt(len(values))
+        return mean, mean - error, mean + error
+
+def _p_better(a, b):
+    """Probability that the arm with (mean, lower, upper) a is faster than b, under a normal approximation"""
+    se_a = (a[2] - a[1]) / 2
+    se_b = (b[2] - b[1]) / 2
+    scale = math.hypot(se_a, se_b)
+    if scale == 0:
+        return 1.0 if a[0] < b[0] else 0.0
+    return statistics.NormalDist().cdf((b[0] - a[0]) / scale)
+
+def adaptive_benchmark(servers, confidence=0.95, initial_samples=2, max_samples=10, budget=None,
+                       timeout=2.0, method="dns", qname=DEFAULT_PROBE_DOMAIN, port=DNS_PORT,
+                       probe_fn=None, max_workers=32, min_spread_ms=1.0, history=None):
+    """Rank resolvers by probing the close contenders more and dropping clear losers early
+
+    Every resolver gets initial_samples probes. Each later round probes only the
+    current leader and the resolvers whose confidence interval still overlaps it,
+    and eliminates the ones whose interval lies entirely above the leader's. It
+    stops when the leader is separated from everyone, every contender has
+    max_samples probes, or the probe budget is spent. The budget never drops
+below one probe per resolver, so every resolver has a sample to rank by.
+
+    Returns {"ranking", "best", "confidence", "probes", "exhaustive_probes", "rounds"},
+    where confidence estimates the probability that "best" really is the fastest.
+    """
+    servers = [sanitize_string(s, 45) for s in servers]
+    servers = [s for s in dict.fromkeys(servers) if is_valid_ip(s) or is_valid_ipv6(s)]
+    initial_samples = max(1, min(int(initial_samples), max_samples))
+    exhaustive = len(servers) * max_samples
+    budget = exhaustive if budget is None else max(int(budget), len(servers))
+    report = {"ranking": [], "best": None, "confidence": 0.0, "probes": 0,
+              "exhaustive_probes": exhaustive, "rounds": 0}
+    if not servers:
+        return report
+
+    probe_fn = probe_fn or (lambda server: test_dns(server, method, qname, port, timeout))
+    z = statistics.NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    penalty_ms = timeout * 1000
+    arms = {server: _Arm(server) for server in servers}
+
+    def run_round(targets):
+        targets = targets[:max(0, budget - report["probes"])]
+        for server, rtt in zip(targets, pool.map(probe_fn, targets)):
+            arms[server].add(rtt)
+        report["probes"] += len(targets)
+        report["rounds"] += 1
+        return bool(targets)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(servers) * initial_samples))) as pool:
+        run_round([s for _ in range(initial_samples) for s in servers])
+
+        while True:
+            alive = [a for a in arms.values() if a.eliminated_round is None]
+            bounds = {a.server: a.interval(penalty_ms, z, min_spread_ms) for a in alive}
+            leader = min(alive, key=lambda a: bounds[a.server][0])
+            leader_upper = bounds[leader.server][2]
+
+            # Drop every resolver that is confidently slower than the leader
+            for arm in alive:
+                if arm is not leader and bounds[arm.server][1] > leader_upper:
+                    arm.eliminated_round = report["rounds"]
+            contenders = [a for a in alive if a.eliminated_round is None]
+            if len(contenders) == 1:
+                break
+
+            # Sample the leader and its overlapping rivals; a maxed-out arm gets no more probes
+            targets = [a.server for a in contenders if len(a.samples) < max_samples]
+            if not targets or not run_round(targets):
+                break
+
+    rows = {arm.server: summarize_samples(arm.server, arm.samples) for arm in arms.values()}
+    for arm in arms.values():
+        rows[arm.server]["eliminated_round"] = arm.eliminated_round
+    # The pick is the survivor that ranks first by the usual loss/median ordering
+    alive = [a for a in arms.values() if a.eliminated_round is None]
+    best = min(alive, key=lambda a: rank_key(rows[a.server]))
+    bounds = {a.server: a.interval(penalty_ms, z, min_spread_ms) for a in arms.values()}
+    report["best"] = best.server
+    report["confidence"] = round(math.prod(
+        _p_better(bounds[best.server], bounds[a.server]) for a in arms.values() if a is not best
+    ), 4)
+
+    # The pick first, then the other survivors, then the eliminated resolvers
+    rows = sorted(rows.values(), key=lambda r: (r["server"] != best.server, r["eliminated_round"] is not None) + rank_key(r))
+    rows[0]["confidence"] = report["confidence"]
+    report["ranking"] = rows
+
+    if history is not None:
+        try:
+            history.record_results({arm.server: arm.samples for arm in arms.values()}, method)
+        except Exception:
+            pass
+    return report
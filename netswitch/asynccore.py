@@ -0,0 +1,297 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import locale
+import os
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import REGISTRY, span, timed
+
+# ----------------------
+# Async Command Runner
+# ----------------------
+
+def _decode(data):
+    """Bytes from a child process as text, the way subprocess.run(text=True) returns it"""
+    text = (data or b"").decode(locale.getpreferredencoding(False), errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def _kill(process):
+    try:
+        process.kill()
+    except ProcessLookupError:
+        pass
+
+async def async_run_command(cmd, timeout=30):
+    """Async run_command: a CompletedProcess, or TimeoutExpired; the child is killed on timeout or cancellation"""
+    program = os.path.basename(cmd[0]).lower() if cmd else ""
+    details = {"command": program, "args": list(cmd[1:])}
+    with timed("command", command=program) as op:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except OSError as e:
+            REGISTRY.record_error(**details, outcome="error", error=str(e))
+            raise
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            _kill(process)
+            await process.wait()
+            REGISTRY.record_error(**details, outcome="timeout", timeout=timeout)
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        except asyncio.CancelledError:
+            _kill(process)
+            op["outcome"] = "cancelled"
+            raise
+        result = subprocess.CompletedProcess(cmd, process.returncode, _decode(stdout), _decode(stderr))
+        if result.returncode != 0:
+            op["outcome"] = "exit_nonzero"
+            REGISTRY.record_error(**details, outcome="exit_nonzero", returncode=result.returncode,
+                                  output=((result.stderr or "") + (result.stdout or "")).strip()[:2000])
+    return result
+
+# ----------------------
+# Async Core
+# ----------------------
+
+# Operation whose code is running, so commands it starts can be cancelled with it
+_current_handle = contextvars.ContextVar("netswitch_operation", default=None)
+
+class AsyncHandle:
+    """Handle for an operation on the async core; cancel() may be called from any thread"""
+
+    def __init__(self, core, name=None, key=None):
+        self.core = core
+        self.name = name
+        self.key = key
+        self.coalesced = 0
+        self.future = None
+        self._task = None
+        self._callbacks = []
+        self._commands = set()
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    def cancel(self):
+        """Cancel the operation and kill the commands it is running; its callbacks are dropped"""
+        self._cancelled.set()
+        for command in list(self._commands):
+            command.cancel()
+        self.core._call_soon(self._cancel_task)
+
+    def _cancel_task(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the operation finished or was cancelled; returns whether it did"""
+        return self._done.wait(timeout)
+
+class AsyncCore:
+    """An asyncio event loop on its own thread that runs keyed operations
+
+    Submitting a key that is already in flight coalesces: the caller joins the
+    running operation and its callbacks get the same result. With supersede,
+    the running operation is cancelled instead and its waiting callbacks move
+    to the new one. Plain functions run on a bounded worker pool, coroutine
+    functions on the loop itself. deliver(handle, callback, value) passes
+    results on (by default the callback is called on the loop thread).
+    """
+
+    def __init__(self, max_workers=4, deliver=None):
+        self.max_workers = max_workers
+        self.deliver = deliver or (lambda handle, callback, value: callback(value))
+        self.loop = None
+        self._pool = None
+        self._thread = None
+        self._inflight = {}
+        self._handles = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the loop thread; returns once the loop is running"""
+        if self._thread is not None:
+            return self
+        ready = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="netswitch")
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.set_default_executor(self._pool)
+            self.loop.call_soon(ready.set)
+            try:
+                self.loop.run_forever()
+            finally:
+                pending = asyncio.all_tasks(self.loop)
+                for task in pending:
+                    task.cancel()
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                self.loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True, name="netswitch-async")
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        """Cancel outstanding operations and stop the loop"""
+        with self._lock:
+            handles = list(self._handles)
+        for handle in handles:
+            handle.cancel()
+        if self._thread is not None:
+            self._call_soon(self.loop.stop)
+            self._thread.join(timeout=1.0)
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _call_soon(self, fn):
+        try:
+            self.loop.call_soon_threadsafe(fn)
+        except RuntimeError:
+            # The loop is already closed
+            pass
+
+    def submit(self, fn, *args, on_done=None, on_error=None, name=None, key=None, supersede=False, **kwargs):
+        """Run fn(*args, **kwargs) on the core; a repeated key coalesces, or supersedes the running one"""
+        return self._submit(fn, args, kwargs, (None, on_done, on_error), name, key, supersede, stream=False)
+
+    def submit_stream(self, fn, *args, on_item=None, on_done=None, on_error=None, name=None, key=None,
+                      supersede=False, **kwargs):
+        """Iterate the generator fn(*args, **kwargs) on a worker, delivering each item as it comes
+
+        fn receives a `cancelled` callable so it can stop early once the handle is cancelled.
+        """
+        return self._submit(fn, args, kwargs, (on_item, on_done, on_error), name, key, supersede, stream=True)
+
+    def _submit(self, fn, args, kwargs, callbacks, name, key, supersede, stream):
+        if self._thread is None:
+            raise RuntimeError("The async core is not running.")
+        with self._lock:
+            running = self._inflight.get(key) if key is not None else None
+            if running is not None and (running.done() or running.is_cancelled()):
+                running = None
+            if running is not None and not supersede:
+                running.coalesced += 1
+                if callbacks not in running._callbacks:
+                    running._callbacks.append(callbacks)
+                return running
+
+            handle = AsyncHandle(self, name, key)
+            if running is not None:
+                # The new operation answers whoever was waiting on the one it replaces
+                handle._callbacks.extend(running._callbacks)
+                running._callbacks = []
+                running.cancel()
+            if callbacks not in handle._callbacks:
+                handle._callbacks.append(callbacks)
+            if key is not None:
+                self._inflight[key] = handle
+            self._handles.add(handle)
+        handle.future = asyncio.run_coroutine_threadsafe(self._run(handle, fn, args, kwargs, stream), self.loop)
+        return handle
+
+    async def _run(self, handle, fn, args, kwargs, stream):
+        _current_handle.set(handle)
+        handle._task = asyncio.current_task()
+        if handle.is_cancelled():
+            self._finish(handle, None, None)
+            return
+        name = handle.name or getattr(fn, "__name__", "task")
+        try:
+            if stream:
+                value = await asyncio.to_thread(self._iterate, handle, name, fn, args, kwargs)
+            elif asyncio.iscoroutinefunction(fn):
+                with span(name):
+                    value = await fn(*args, **kwargs)
+            else:
+                value = await asyncio.to_thread(self._call, name, fn, args, kwargs)
+        except asyncio.CancelledError:
+            self._finish(handle, None, None)
+        except Exception as e:
+            self._finish(handle, 2, e)
+        else:
+            self._finish(handle, 1, value)
+
+    @staticmethod
+    def _call(name, fn, args, kwargs):
+        """Worker side of a plain operation; the span (and any profile) covers the work, not the idle loop"""
+        with span(name):
+            return fn(*args, **kwargs)
+
+    def _iterate(self, handle, name, fn, args, kwargs):
+        """Worker side of a stream: forward items until the generator ends or the handle is cancelled"""
+        count = 0
+        with span(name):
+            for item in fn(*args, cancelled=handle.is_cancelled, **kwargs):
+                if handle.is_cancelled():
+                    break
+                count += 1
+                with self._lock:
+                    callbacks = list(handle._callbacks)
+                for on_item, _, _ in callbacks:
+                    if on_item is not None:
+                        self.deliver(handle, on_item, item)
+        return count
+
+    def _finish(self, handle, slot, value):
+        """Mark the handle done and pass its result to every waiting callback (slot 1: done, 2: error)"""
+        with self._lock:
+            if self._inflight.get(handle.key) is handle:
+                del self._inflight[handle.key]
+            self._handles.discard(handle)
+            callbacks = handle._callbacks
+            handle._callbacks = []
+            handle._done.set()
+        if slot is None or handle.is_cancelled():
+            return
+        for triple in callbacks:
+            if triple[slot] is not None:
+                try:
+                    self.deliver(handle, triple[slot], value)
+                except Exception:
+                    pass
+
+    def in_flight(self, key):
+        """The running operation for key, or None"""
+        with self._lock:
+            return self._inflight.get(key)
+
+    def run_command(self, cmd, timeout=30):
+        """Blocking command runner for code on worker threads, backed by async_run_command
+
+        The child runs as an asyncio subprocess on the loop and is killed when
+        the operation that started it is cancelled or superseded.
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("run_command would block the event loop; await async_run_command instead.")
+        handle = _current_handle.get()
+        command = asyncio.run_coroutine_threadsafe(async_run_command(cmd, timeout), self.loop)
+        if handle is not None:
+            handle._commands.add(command)
+            if handle.is_cancelled():
+                command.cancel()
+        try:
+            return command.result()
+        except concurrent.futures.CancelledError:
+            raise OSError("Command cancelled.") from None
+        finally:
+            if handle is not None:
+                handle._commands.discard(command)
@@ -0,0 +1,196 @@
+import statistics
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+from .sanitize import sanitize_string, is_valid_ip, is_valid_ipv6
+from .probe import DNS_PORT, DEFAULT_PROBE_DOMAIN, probe_dns
+from .ping import ping_samples
+
+# ----------------------
+# Resolver Benchmark
+# ----------------------
+
+def test_dns(dns, method="dns", qname=DEFAULT_PROBE_DOMAIN, port=DNS_PORT, timeout=2.0):
+    """Test DNS with enhanced validation and sanitization"""
+    # Sanitize and validate DNS address
+    dns = sanitize_string(dns, 45)
+    if not (is_valid_ip(dns) or is_valid_ipv6(dns)):
+        return None
+
+    if method == "dns":
+        result = probe_dns(dns, qname=qname, port=port, timeout=timeout)
+        return result["rtt_ms"] if result["ok"] else None
+    if method in ("dot", "doh"):
+        # Pooled connections: repeated tests measure queries, not TLS handshakes
+        from .encrypted import shared_pool
+        result = shared_pool().probe(dns, method, qname=qname, port=None if port == DNS_PORT else port)
+        return result["rtt_ms"] if result["ok"] else None
+    
+    # Time the echo round trip reported by ping, not the process spawn
+    result = ping_samples(dns, count=1, timeout=timeout)
+    if result and result["rtts"]:
+        return result["rtts"][0]
+    return None
+
+DEFAULT_DNS_CANDIDATES = ["1.1.1.1", "8.8.8.8", "9.9.9.9", "208.67.222.222"]
+
+def _percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+def summarize_samples(server, samples):
+    """Summarize RTT samples (None for a lost probe) into one ranking row"""
+    received = [s for s in samples if s is not None]
+    ordered = sorted(received)
+    sent = len(samples)
+
+    # Jitter as the mean difference between consecutive replies (RFC 3550 style)
+    diffs = [abs(b - a) for a, b in zip(received, received[1:])]
+
+    def _round(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        "server": server,
+        "sent": sent,
+        "received": len(received),
+        "loss": round(1 - len(received) / sent, 3) if sent else 1.0,
+        "min": _round(ordered[0] if ordered else None),
+        "median": _round(statistics.median(ordered) if ordered else None),
+        "p95": _round(_percentile(ordered, 95)),
+        "jitter": _round(statistics.mean(diffs) if diffs else (0.0 if received else None)),
+    }
+
+def rank_key(row):
+    """Sort key for ranking rows: reachable first, then loss, then median latency"""
+    return (row["received"] == 0, row["loss"], row["median"] if row["median"] is not None else float("inf"))
+
+def benchmark_dns(servers, samples=3, deadline=5.0, timeout=2.0, method="dns",
+                  qname=DEFAULT_PROBE_DOMAIN, port=DNS_PORT, max_workers=32, history=None):
+    """Probe every resolver concurrently with several samples under a global deadline"""
+    servers = [sanitize_string(s, 45) for s in servers]
+    servers = [s for s in dict.fromkeys(servers) if is_valid_ip(s) or is_valid_ipv6(s)]
+    samples = max(1, min(int(samples), 50))
+    if not servers:
+        return []
+    if method in ("dot", "doh"):
+        # Encrypted transports rank by steady-state latency on reused connections
+        from .encrypted import benchmark_encrypted
+        return benchmark_encrypted(servers, transport=method, samples=samples, deadline=deadline,
+                                   timeout=timeout, qname=qname, port=None if port == DNS_PORT else port,
+                                   history=history)
+
+    # A single probe can never outlive the whole benchmark
+    timeout = min(timeout, deadline)
+    results = {server: [] for server in servers}
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(servers) * samples)))
+    try:
+        futures = {}
+        if method == "ping":
+            # One ping process per resolver carries every sample
+            for server in servers:
+                futures[pool.submit(ping_samples, server, samples, timeout)] = server
+        else:
+            for _ in range(samples):
+                for server in servers:
+                    futures[pool.submit(test_dns, server, method, qname, port, timeout)] = server
+        per_future = samples if method == "ping" else 1
+
+        def _collect(future):
+            try:
+                value = future.result()
+            except Exception:
+                return [None] * per_future
+            if method == "ping":
+                return value["samples"] if value else [None] * per_future
+            return [value]
+
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                results[futures[future]].extend(_collect(future))
+        except FuturesTimeoutError:
+            pass
+
+        # Anything still outstanding at the deadline counts as lost
+        for future, server in futures.items():
+            if not future.done():
+                results[server].extend([None] * per_future)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if history is not None:
+        try:
+            history.record_results(results, method)
+        except Exception:
+            pass
+
+    rows = [summarize_samples(server, results[server]) for server in servers]
+    return sorted(rows, key=rank_key)
+
+def find_fastest_dns(method="dns", servers=None, samples=3, deadline=5.0, domains=None,
+                     history=None, max_age=0, cache=None, adaptive=False, cdn=False, dual_stack=False):
+    """Rank the predefined safe resolver list, fastest first
+
+    With adaptive set, probes go to close contenders and the top row carries a "confidence".
+    With cdn set, resolve time plus connect time to the returned CDN edge is ranked over domains.
+    With dual_stack set, each provider's IPv4 and IPv6 endpoints race for one row per provider.
+    With domains alone, the list is replayed cold and warm as a workload and never cached.
+    Otherwise cache serves fresh rows and history newer than max_age replaces a probe.
+    """
+    # Use only trusted, hardcoded DNS servers unless a list is supplied
+    dns_list = servers if servers is not None else DEFAULT_DNS_CANDIDATES
+    if dual_stack:
+        from .dualstack import benchmark_dual_stack, providers_for
+        return benchmark_dual_stack(providers_for(servers), samples=samples, method=method, deadline=deadline,
+                                    history=history, cache=cache)
+    if cdn:
+        if method != "dns":
+            raise ValueError("CDN rankings resolve over plain DNS only.")
+        from .cdn import benchmark_cdn
+        return benchmark_cdn(dns_list, domains, deadline=deadline, history=history)
+    if domains:
+        # Replay the user's own domains instead of probing one name repeatedly
+        if method != "dns":
+            raise ValueError("A domain workload is replayed over plain DNS only.")
+        from .workload import benchmark_workload
+        return benchmark_workload(dns_list, domains, timeout=min(2.0, deadline))
+
+    def _probe(targets):
+        if adaptive:
+            from .adaptive import adaptive_benchmark
+            return adaptive_benchmark(targets, method=method, max_samples=max(samples, 2),
+                                      history=history)["ranking"]
+        return benchmark_dns(targets, samples=samples, deadline=deadline, method=method, history=history)
+
+    cached = []
+    if cache is not None:
+        # Fresh rows come back at once; stale ones are returned marked and re-probed in the
+        # background, or re-probed now with the missing ones when there is no background
+        cached, stale, dns_list = cache.lookup(dns_list, method)
+        if stale and cache.background_refresh:
+            cache.refresh_async(stale, _probe, method)
+        elif stale:
+            cached = [row for row in cached if not row.get("stale")]
+            dns_list = stale + dns_list
+        if not dns_list:
+            return cached
+
+    ranking = None
+    if history is not None and max_age:
+        # Recent stored samples for every resolver make a fresh probe unnecessary
+        ranking = history.ranking(dns_list, window=max_age, method=method, min_samples=samples)
+        if not {row["server"] for row in ranking} >= set(sanitize_string(s, 45) for s in dns_list):
+            ranking = None
+    if ranking is None:
+        ranking = _probe(dns_list)
+
+    if cache is not None:
+        for row in ranking:
+            cache.put(row, method)
+        cache.save()
+    return sorted(cached + ranking, key=rank_key)
@@ -0,0 +1,310 @@
+import csv
+import heapq
+import ipaddress
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from .sanitize import sanitize_string
+from .validation import parse_address
+from .probe import DNS_PORT, DEFAULT_PROBE_DOMAIN
+from .benchmark import test_dns, summarize_samples, rank_key
+
+# ----------------------
+# Resolver Catalog
+# ----------------------
+
+BUILTIN_CATALOG = [
+    {"address": "1.1.1.1", "name": "Cloudflare", "category": "public"},
+    {"address": "1.0.0.1", "name": "Cloudflare", "category": "public"},
+    {"address": "8.8.8.8", "name": "Google", "category": "public"},
+    {"address": "8.8.4.4", "name": "Google", "category": "public"},
+    {"address": "9.9.9.9", "name": "Quad9", "category": "public"},
+    {"address": "149.112.112.112", "name": "Quad9", "category": "public"},
+    {"address": "208.67.222.222", "name": "OpenDNS", "category": "public"},
+]
+
+_ADDRESS_FIELDS = ("address", "ip", "server", "resolver")
+
+def _entry_from_record(record):
+    """Normalize one raw CSV/JSON record into an entry dict (address may be invalid)"""
+    if isinstance(record, str):
+        return {"address": record, "name": "", "category": ""}
+    if not isinstance(record, dict):
+        return None
+    address = next((record[f] for f in _ADDRESS_FIELDS if record.get(f)), "")
+    return {
+        "address": str(address),
+        "name": sanitize_string(str(record.get("name") or ""), 100),
+        "category": sanitize_string(str(record.get("category") or ""), 50),
+    }
+
+_JSON_CHUNK_SIZE = 1 << 16
+_JSON_WHITESPACE = " \t\r\n"
+
+class _JsonStream:
+    """Decodes a JSON document one value at a time from a sliding buffer
+
+    Only the unread rest of the current chunk and the value being decoded
+    are held in memory, so a catalog array of any length reads in flat memory.
+    """
+
+    def __init__(self, source, chunk_size=_JSON_CHUNK_SIZE):
+        self.source = source
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self):
+        """Append the next chunk, dropping what was consumed; False at end of file"""
+        chunk = self.source.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, or "" at end of file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _JSON_WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON catalog: expected {char!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number running to the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def array(self):
+        """Yield the elements of the array starting here"""
+        self.take("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError("Malformed JSON catalog: expected ',' or ']'")
+
+def _iter_json_records(source):
+    """Records of a JSON catalog: a top-level array, or the "resolvers" array of an object"""
+    stream = _JsonStream(source)
+    first = stream.peek()
+    if first == "[":
+        yield from stream.array()
+        return
+    if first != "{":
+        stream.value()
+        return
+    stream.take("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.take(":")
+        if key == "resolvers" and stream.peek() == "[":
+            yield from stream.array()
+            return
+        # Other members are decoded and dropped
+        stream.value()
+        char = stream.peek()
+        stream.pos += 1
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError("Malformed JSON catalog: expected ',' or '}'")
+
+def iter_catalog_records(path):
+    """Yield entries (None for unreadable records) from a CSV, JSON or JSON-lines catalog file, streaming"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline="", encoding="utf-8-sig") as catalog_file:
+        if extension == ".csv":
+            for record in csv.DictReader(catalog_file):
+                record = {(k or "").strip().lower(): (v or "").strip() for k, v in record.items()}
+                yield _entry_from_record(record)
+        elif extension in (".jsonl", ".ndjson"):
+            for line in catalog_file:
+                line = line.strip()
+                if line:
+                    try:
+                        yield _entry_from_record(json.loads(line))
+                    except ValueError:
+                        yield None
+        else:
+            for record in _iter_json_records(catalog_file):
+                yield _entry_from_record(record)
+
+def resolver_address(address):
+    """Canonical text form of a usable resolver address, or None (invalid, unspecified or multicast)"""
+    parsed = parse_address(sanitize_string(address, 80))
+    if parsed is None or parsed.is_unspecified or parsed.is_multicast:
+        return None
+    return str(parsed)
+
+def load_catalog(path=None, stats=None):
+    """Yield validated, de-duplicated catalog entries (the built-in list when path is None)"""
+    records = iter_catalog_records(path) if path else (dict(entry) for entry in BUILTIN_CATALOG)
+    seen = set()
+    stats = stats if stats is not None else {}
+    stats.update({"records": 0, "invalid": 0, "duplicates": 0, "entries": 0})
+
+    for record in records:
+        stats["records"] += 1
+        # Records arrive as entries already; None marks one that could not be read
+        entry = record
+        address = resolver_address(entry["address"]) if entry else None
+        if address is None:
+            stats["invalid"] += 1
+            continue
+
+        # Dedupe on the packed address: a few bytes per resolver, not the whole entry
+        key = ipaddress.ip_address(address).packed
+        if key in seen:
+            stats["duplicates"] += 1
+            continue
+        seen.add(key)
+        stats["entries"] += 1
+        entry["address"] = address
+        yield entry
+
+class RateLimiter:
+    """Thread-safe token bucket limiting how many probes start per second"""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            self.sleep(wait_time)
+
+def _benchmark_entry(entry, samples, timeout, method, qname, port, limiter, cancelled):
+    """Probe one catalog entry sequentially and summarize it"""
+    results = []
+    for _ in range(samples):
+        if cancelled is not None and cancelled():
+            break
+        if limiter is not None:
+            limiter.acquire()
+        results.append(test_dns(entry["address"], method, qname, port, timeout))
+    row = summarize_samples(entry["address"], results)
+    row["name"] = entry.get("name", "")
+    row["category"] = entry.get("category", "")
+    return row
+
+def stream_benchmark(entries, samples=3, concurrency=32, rate=None, timeout=2.0, method="dns",
+                     qname=DEFAULT_PROBE_DOMAIN, port=DNS_PORT, cancelled=None):
+    """Benchmark catalog entries with bounded concurrency, yielding each row as it finishes"""
+    samples = max(1, min(int(samples), 50))
+    concurrency = max(1, int(concurrency))
+    limiter = RateLimiter(rate) if rate else None
+    entries = iter(entries)
+    in_flight = set()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="netswitch-catalog") as pool:
+        def _fill():
+            # Only `concurrency` entries are ever pulled from the iterator ahead of results
+            while len(in_flight) < concurrency:
+                if cancelled is not None and cancelled():
+                    return
+                entry = next(entries, None)
+                if entry is None:
+                    return
+                in_flight.add(pool.submit(_benchmark_entry, entry, samples, timeout, method,
+                                          qname, port, limiter, cancelled))
+
+        _fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                try:
+                    yield future.result()
+                except Exception:
+                    continue
+            _fill()
+
+class RankingBoard:
+    """Keeps the best k rows seen so far in constant memory"""
+
+    def __init__(self, k=10):
+        self.k = k
+        self.count = 0
+        self._heap = []
+
+    def add(self, row):
+        """Offer a row; returns True if it entered the top k"""
+        self.count += 1
+        key = rank_key(row)
+        # heapq is a min-heap: store negated ordering so the worst kept row is on top
+        item = (_Reverse(key), self.count, row)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+            return True
+        if key < self._heap[0][0].key:
+            heapq.heapreplace(self._heap, item)
+            return True
+        return False
+
+    def top(self):
+        """The kept rows, best first"""
+        return [row for _, _, row in sorted(self._heap, key=lambda item: item[0].key)]
+
+class _Reverse:
+    """Inverts ordering of a sort key for use in a min-heap"""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return other.key < self.key
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+def benchmark_catalog(path=None, cancelled=None, **kwargs):
+    """Load a catalog and stream its benchmark rows (see stream_benchmark)"""
+    yield from stream_benchmark(load_catalog(path), cancelled=cancelled, **kwargs)
@@ -0,0 +1,155 @@
+import socket
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from .sanitize import sanitize_string, is_valid_ip, is_valid_ipv6
+from .probe import DNS_PORT, DNS_QTYPES, probe_dns
+from .benchmark import summarize_samples, rank_key
+from .workload import normalize_domain
+from .metrics import record_operation
+
+# ----------------------
+# CDN-aware Ranking
+# ----------------------
+
+# CDN-hosted names whose answer depends on which resolver asked
+DEFAULT_CDN_DOMAINS = [
+    "www.youtube.com", "www.netflix.com", "www.microsoft.com", "www.apple.com",
+    "www.amazon.com", "www.cloudflare.com", "ajax.googleapis.com", "cdn.jsdelivr.net",
+]
+
+def measure_connect(address, port=443, timeout=2.0):
+    """TCP connect time to address:port in ms, or None if it failed"""
+    family = socket.AF_INET6 if ":" in address else socket.AF_INET
+    started = time.perf_counter()
+    try:
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect((address, port))
+            elapsed = time.perf_counter() - started
+    except OSError:
+        record_operation("edge_connect", time.perf_counter() - started, "error")
+        return None
+    record_operation("edge_connect", elapsed, "ok")
+    return round(elapsed * 1000, 2)
+
+class EdgeCache:
+    """Connect times per edge address, shared by every resolver that returns the same edge
+
+    Concurrent requests for one address wait on a single connect instead of
+    opening their own.
+    """
+
+    def __init__(self, ttl=300.0, clock=time.monotonic, connect_fn=None):
+        self.ttl = ttl
+        self.clock = clock
+        self.connect_fn = connect_fn or measure_connect
+        self.connects = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def connect_time(self, address, port=443, timeout=2.0):
+        """Cached or freshly measured connect time in ms (None if unreachable)"""
+        key = (address, port)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (not entry[1].done() or self.clock() - entry[0] < self.ttl):
+                future = entry[1]
+                owner = False
+            else:
+                future = Future()
+                self._entries[key] = (self.clock(), future)
+                self.connects += 1
+                owner = True
+        if owner:
+            try:
+                future.set_result(self.connect_fn(address, port, timeout))
+            except Exception:
+                future.set_result(None)
+        return future.result()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.connects = 0
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+def shared_edge_cache():
+    """Process-wide edge cache so repeated rankings reuse their connect measurements"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = EdgeCache()
+        return _shared_cache
+
+def _resolve_and_connect(server, domain, qtype, port, connect_port, timeout, cache):
+    """One resolver/domain pair: (resolve ms, edge address, connect ms); None parts mark failures"""
+    response = probe_dns(server, qname=domain, qtype=qtype, port=port, timeout=timeout)
+    addresses = [a["address"] for a in response["answers"] if a["type"] == qtype]
+    if not response["ok"] or not addresses:
+        return response["rtt_ms"], None, None
+    # Clients connect to the first address they are given
+    edge = addresses[0]
+    return response["rtt_ms"], edge, cache.connect_time(edge, connect_port, timeout)
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return round(statistics.median(values), 2) if values else None
+
+def benchmark_cdn(servers, domains=None, qtype="A", port=DNS_PORT, connect_port=443, timeout=2.0,
+                  concurrency=16, cache=None, deadline=None, history=None):
+    """Rank resolvers by resolve time plus TCP connect time to the edge each one returns
+
+    Every resolver resolves every domain; a sample is lost when resolution or
+    the connect fails, or is still running at the deadline. Rows add
+    resolve_ms, connect_ms (medians) and edges, the number of distinct edge
+    addresses the resolver handed out. history stores the totals as "cdn".
+    """
+    servers = [sanitize_string(s, 45) for s in servers]
+    servers = [s for s in dict.fromkeys(servers) if is_valid_ip(s) or is_valid_ipv6(s)]
+    domains = [d for d in dict.fromkeys(normalize_domain(d) for d in (domains or DEFAULT_CDN_DOMAINS)) if d]
+    if qtype not in DNS_QTYPES or not servers or not domains:
+        return []
+    cache = cache if cache is not None else shared_edge_cache()
+    if deadline is not None:
+        timeout = min(timeout, deadline)
+
+    results = {server: [] for server in servers}
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="netswitch-cdn")
+    try:
+        futures = {pool.submit(_resolve_and_connect, server, domain, qtype, port, connect_port, timeout, cache): server
+                   for domain in domains for server in servers}
+        wait(futures, timeout=deadline)
+        for future, server in futures.items():
+            # Anything still outstanding at the deadline counts as lost
+            results[server].append(future.result() if future.done() else (None, None, None))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    rows = []
+    totals_by_server = {}
+    for server, pairs in results.items():
+        totals = [resolve + connect if resolve is not None and connect is not None else None
+                  for resolve, _, connect in pairs]
+        totals_by_server[server] = totals
+        row = summarize_samples(server, totals)
+        row.update({
+            "resolve_ms": _median(resolve for resolve, _, _ in pairs),
+            "connect_ms": _median(connect for _, _, connect in pairs),
+            "edges": len({edge for _, edge, _ in pairs if edge}),
+        })
+        rows.append(row)
+
+    if history is not None:
+        try:
+            history.record_results(totals_by_server, "cdn")
+        except Exception:
+            pass
+    return sorted(rows, key=rank_key)
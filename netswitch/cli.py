@@ -0,0 +1,456 @@
+import argparse
+import json
+import sys
+import time
+
+from . import __version__
+from .adapters import AdapterInventory
+from .benchmark import DEFAULT_DNS_CANDIDATES, find_fastest_dns
+from .dnsconfig import apply_dns_batch, load_snapshot, rollback_dns, flush_dns
+from .forwarder import DnsForwarder, upstreams_from_ranking
+from .probe import DNS_PORT
+from .monitor import ResolverMonitor
+from .catalog import RankingBoard, load_catalog, stream_benchmark
+from .workload import benchmark_workload, load_domains
+from .probecache import ProbeCache
+from .warmup import hot_domains, warm_up
+from .netwatch import NetworkChangeDetector, read_proc_network_context
+from .platforms import get_backend
+from .dualstack import PROVIDERS, provider_servers
+from .metrics import enable_profiling, span, write_metrics
+
+# ----------------------
+# Command Line Interface
+# ----------------------
+
+def _print_json(data, args):
+    """Write a result as JSON to stdout"""
+    print(json.dumps(data, indent=args.indent), flush=True)
+
+def _open_history(args):
+    """Open the history store named on the command line (empty string: default path)"""
+    if args.history is None:
+        return None
+    from .history import HistoryStore
+    return HistoryStore(args.history or None)
+
+def _warm_domains(args):
+    """Domains named by --warm: True for the built-in list, else the file's domains"""
+    if args.warm is None:
+        return None
+    return load_domains(args.warm) if args.warm else True
+
+def cmd_benchmark(args):
+    """Rank resolvers and print the table"""
+    try:
+        domains = load_domains(args.cdn) if args.cdn else None
+    except (OSError, ValueError) as e:
+        _print_json({"ok": False, "error": str(e)}, args)
+        return 1
+    history = _open_history(args)
+    try:
+        ranking = find_fastest_dns(
+            method=args.method,
+            servers=args.servers or None,
+            samples=args.samples,
+            deadline=args.deadline,
+            history=history,
+            max_age=args.max_age,
+            # The process exits after printing, so stale rows are re-probed before it does
+            cache=ProbeCache(ttl=args.cache_ttl, path=args.cache, background_refresh=False) if args.cache else None,
+            adaptive=args.adaptive,
+            cdn=args.cdn is not None,
+            dual_stack=args.dual_stack,
+            domains=domains,
+        )
+    except ValueError as e:
+        _print_json({"ok": False, "error": str(e)}, args)
+        return 1
+    finally:
+        if history is not None:
+            history.close()
+    _print_json(ranking, args)
+    return 0 if ranking and ranking[0]["received"] else 1
+
+def cmd_history(args):
+    """Print stored trends, or a ranking built from stored samples"""
+    from .history import HOUR, MINUTE, HistoryStore
+    with HistoryStore(args.history or None) as history:
+        if args.compact:
+            _print_json({"ok": True, "removed": history.compact()}, args)
+            return 0
+        history.rollup()
+        if not args.servers:
+            ranking = history.ranking(window=args.hours * HOUR, method=args.method)
+            _print_json(ranking, args)
+            return 0 if ranking else 1
+        period = MINUTE if args.period == "minute" else HOUR
+        since = history.clock() - args.hours * HOUR
+        trends = {server: history.trend(server, since=since, period=period, method=args.method)
+                  for server in args.servers}
+    _print_json(trends, args)
+    return 0
+
+def cmd_catalog(args):
+    """Benchmark a resolver catalog, printing each row as it arrives"""
+    stats = {}
+    try:
+        entries = load_catalog(args.path, stats)
+        if args.validate_only:
+            for _ in entries:
+                pass
+            _print_json({"catalog": stats}, args)
+            return 0
+
+        board = RankingBoard(args.top)
+        for row in stream_benchmark(entries, samples=args.samples, concurrency=args.concurrency,
+                                    rate=args.rate, method=args.method):
+            board.add(row)
+            _print_json(row, args)
+    except (OSError, ValueError) as e:
+        _print_json({"ok": False, "error": str(e)}, args)
+        return 1
+    _print_json({"catalog": stats, "top": board.top()}, args)
+    return 0 if board.top() and board.top()[0]["received"] else 1
+
+def cmd_workload(args):
+    """Replay a domain list against resolvers and print cold/warm latency per resolver"""
+    try:
+        domains = load_domains(args.domains, limit=args.limit)
+    except (OSError, ValueError) as e:
+        _print_json({"ok": False, "error": str(e)}, args)
+        return 1
+    ranking = benchmark_workload(args.servers or DEFAULT_DNS_CANDIDATES, domains, qtype=args.qtype,
+                                 timeout=args.timeout, concurrency=args.concurrency)
+    _print_json(ranking, args)
+    return 0 if ranking and ranking[0]["error_rate"] < 1 else 1
+
+def cmd_apply(args):
+    """Apply DNS servers to the selected adapters"""
+    servers = list(args.servers)
+    if args.provider:
+        # IPv4 and IPv6 servers of the provider, applied together in one batch
+        servers += provider_servers(args.provider)
+    if not servers:
+        _print_json({"ok": False, "error": "No DNS servers given."}, args)
+        return 1
+    try:
+        adapters = _target_adapters(args)
+    except ValueError as e:
+        _print_json({"ok": False, "error": str(e)}, args)
+        return 1
+    result = apply_dns_batch(adapters, servers, warm=_warm_domains(args))
+    _print_json(result, args)
+    return 0 if result["ok"] else 1
+
+def cmd_rollback(args):
+    """Restore the DNS config saved in an apply result (or bare snapshot) file"""
+    try:
+        if args.snapshot == "-":
+            snapshot = load_snapshot(json.load(sys.stdin))
+        else:
+            with open(args.snapshot, encoding="utf-8") as snapshot_file:
+                snapshot = load_snapshot(json.load(snapshot_file))
+    except (OSError, ValueError) as e:
+        _print_json({"ok": False, "error": str(e)}, args)
+        return 1
+    result = rollback_dns(snapshot)
+    _print_json(result, args)
+    return 0 if result["ok"] else 1
+
+def _target_adapters(args):
+    """Resolve --adapter/--all options into a list of adapter names; ValueError if --all finds none"""
+    if args.all:
+        inventory = AdapterInventory()
+        inventory.refresh()
+        names = inventory.connected_names()
+        if not names:
+            raise ValueError("No connected network adapters found.")
+        return names
+    return args.adapter or ["Wi-Fi"]
+
+def cmd_forward(args):
+    """Run the local caching forwarder until interrupted"""
+    if (args.adapter or args.all) and args.port != DNS_PORT:
+        # DNS settings carry no port, adapters would query port 53 and get no answer
+        _print_json({"ok": False, "error": f"Adapters can only use a forwarder listening on port {DNS_PORT}."}, args)
+        return 1
+    upstreams = args.upstreams
+    if not upstreams:
+        upstreams = upstreams_from_ranking(find_fastest_dns(), args.race)
+        if not upstreams:
+            _print_json({"ok": False, "error": "No DNS servers reachable."}, args)
+            return 1
+    try:
+        adapters = _target_adapters(args) if args.adapter or args.all else None
+    except ValueError as e:
+        _print_json({"ok": False, "error": str(e)}, args)
+        return 1
+
+    forwarder = DnsForwarder(upstreams, listen=args.listen, port=args.port, race=args.race)
+    try:
+        forwarder.start()
+    except OSError as e:
+        _print_json({"ok": False, "error": str(e)}, args)
+        return 1
+
+    snapshot = None
+    if adapters:
+        result = apply_dns_batch(adapters, [forwarder.listen])
+        if not result["ok"]:
+            forwarder.stop()
+            _print_json(result, args)
+            return 1
+        snapshot = result["snapshot"]
+
+    _print_json({"ok": True, "listen": forwarder.listen, "port": forwarder.port,
+                 "upstreams": forwarder.upstreams}, args)
+    try:
+        while True:
+            time.sleep(args.stats_interval or 3600)
+            if args.stats_interval:
+                _print_json(forwarder.stats(), args)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        forwarder.stop()
+        if snapshot:
+            rollback_dns(snapshot)
+        history = _open_history(args)
+        if history is not None:
+            # Remember what was looked up so later warm-ups can pre-resolve it
+            with history:
+                history.record_domains(forwarder.hot_domains(limit=500))
+    _print_json(forwarder.stats(), args)
+    return 0
+
+def cmd_monitor(args):
+    """Watch resolvers and fail over automatically until interrupted"""
+    candidates = args.candidates or DEFAULT_DNS_CANDIDATES
+    apply_fn = (lambda servers: True) if args.dry_run else None
+    try:
+        monitor = ResolverMonitor(
+            args.active, candidates, adapters=_target_adapters(args), apply_fn=apply_fn,
+            interval=args.interval, fast_interval=args.fast_interval, margin_ms=args.margin_ms,
+            window=args.window, cooldown=args.cooldown, on_event=lambda event: _print_json(event, args),
+        )
+    except ValueError as e:
+        _print_json({"ok": False, "error": str(e)}, args)
+        return 1
+
+    monitor.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+    _print_json(monitor.snapshot(), args)
+    return 0
+
+def cmd_flush(args):
+    """Flush the DNS resolver cache"""
+    result = flush_dns(warm=_warm_domains(args))
+    _print_json(result, args)
+    return 0 if result["ok"] else 1
+
+def cmd_watch(args):
+    """Print network changes until interrupted, re-ranking resolvers for each new network"""
+    def on_change(event):
+        cache.on_network_change(event)
+        if args.rebenchmark:
+            # Only resolvers without a result for this network are probed again
+            event["ranking"] = find_fastest_dns(servers=args.servers or None, cache=cache)
+        _print_json(event, args)
+
+    context_fn = (lambda: read_proc_network_context(args.root)) if args.root else None
+    detector = NetworkChangeDetector(context_fn=context_fn, interval=args.interval, on_change=on_change)
+    # The cache follows the detector instead of reading the network itself
+    cache = ProbeCache(ttl=args.cache_ttl, path=args.cache, context_fn=lambda: detector.fingerprint)
+    detector.poll()
+    cache.set_context(detector.fingerprint)
+    _print_json({"ok": True, "fingerprint": detector.fingerprint, "context": detector.context}, args)
+    detector.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.stop()
+    return 0
+
+def cmd_warmup(args):
+    """Pre-resolve hot domains through the OS resolver or the given servers"""
+    history = _open_history(args)
+    try:
+        domains = hot_domains(load_domains(args.domains) if args.domains else None, history, args.limit)
+    finally:
+        if history is not None:
+            history.close()
+    result = warm_up(domains, servers=args.servers, qtype=args.qtype, timeout=args.timeout,
+                     concurrency=args.concurrency, limit=args.limit)
+    _print_json(result, args)
+    return 0 if result["ok"] else 1
+
+def cmd_adapters(args):
+    """List network adapters"""
+    records = get_backend().list_adapters()
+    if records is None:
+        _print_json({"ok": False, "error": "Failed to enumerate network adapters."}, args)
+        return 1
+    _print_json(records, args)
+    return 0
+
+def cmd_gui(args):
+    """Launch the GUI (imports customtkinter only now)"""
+    from .gui import main as gui_main
+    return gui_main()
+
+def build_parser():
+    """Build the argument parser for all subcommands"""
+    parser = argparse.ArgumentParser(prog="netswitch", description="NetSwitch DNS management")
+    parser.add_argument("--version", action="version", version=f"NetSwitch {__version__}")
+    parser.add_argument("--indent", type=int, default=None, help="indent JSON output")
+    parser.add_argument("--metrics", metavar="PATH", help="write metrics on exit (.json, otherwise Prometheus text)")
+    parser.add_argument("--profile", metavar="DIR", help="write a cProfile dump per action into DIR")
+    sub = parser.add_subparsers(dest="command")
+
+    bench = sub.add_parser("benchmark", help="rank DNS resolvers by latency")
+    bench.add_argument("servers", nargs="*", help=f"resolvers to test (default: {' '.join(DEFAULT_DNS_CANDIDATES)})")
+    bench.add_argument("--method", choices=["dns", "ping", "dot", "doh"], default="dns",
+                       help="probe transport (dot/doh: DNS over TLS/HTTPS on pooled connections)")
+    bench.add_argument("--samples", type=int, default=3)
+    bench.add_argument("--deadline", type=float, default=5.0)
+    bench.add_argument("--history", nargs="?", const="", default=None, metavar="PATH",
+                       help="record samples in the history database (default location if no PATH)")
+    bench.add_argument("--max-age", type=float, default=0,
+                       help="reuse stored samples this recent (s) instead of probing")
+    bench.add_argument("--cache", metavar="PATH", help="cache results per network in this JSON file")
+    bench.add_argument("--cache-ttl", type=float, default=300.0, help="how long cached results stay fresh (s)")
+    bench.add_argument("--adaptive", action="store_true",
+                       help="probe close contenders more and drop clear losers early (--samples caps each resolver)")
+    bench.add_argument("--cdn", nargs="?", const="", default=None, metavar="FILE",
+                       help="rank by resolve + connect time to the CDN edge returned (built-in domains if no FILE)")
+    bench.add_argument("--dual-stack", action="store_true",
+                       help="race each provider's IPv6 and IPv4 endpoints and report both families")
+    bench.set_defaults(func=cmd_benchmark)
+
+    history = sub.add_parser("history", help="show stored resolver trends")
+    history.add_argument("servers", nargs="*", help="resolvers to show trends for (default: ranking of all)")
+    history.add_argument("--history", default="", metavar="PATH", help="history database (default location)")
+    history.add_argument("--method", choices=["dns", "ping", "dot", "doh"], default="dns")
+    history.add_argument("--period", choices=["minute", "hour"], default="hour")
+    history.add_argument("--hours", type=float, default=24, help="how far back to look")
+    history.add_argument("--compact", action="store_true", help="roll up and drop expired data")
+    history.set_defaults(func=cmd_history)
+
+    catalog = sub.add_parser("catalog", help="benchmark a resolver catalog, streaming results")
+    catalog.add_argument("path", nargs="?", help="CSV, JSON or JSON-lines catalog (default: built-in list)")
+    catalog.add_argument("--method", choices=["dns", "ping", "dot", "doh"], default="dns")
+    catalog.add_argument("--samples", type=int, default=3)
+    catalog.add_argument("--concurrency", type=int, default=32, help="resolvers probed at once")
+    catalog.add_argument("--rate", type=float, default=None, help="maximum probes started per second")
+    catalog.add_argument("--top", type=int, default=10, help="size of the final ranking")
+    catalog.add_argument("--validate-only", action="store_true", help="only validate and deduplicate")
+    catalog.set_defaults(func=cmd_catalog)
+
+    workload = sub.add_parser("workload", help="replay a domain list against resolvers (cold vs. warm)")
+    workload.add_argument("domains", help="file with one domain per line (or a CSV query-log export)")
+    workload.add_argument("servers", nargs="*", help="resolvers to test (default: built-in list)")
+    workload.add_argument("--qtype", choices=["A", "AAAA"], default="A")
+    workload.add_argument("--concurrency", type=int, default=16, help="queries in flight at once")
+    workload.add_argument("--timeout", type=float, default=2.0)
+    workload.add_argument("--limit", type=int, default=10000, help="maximum domains read from the file")
+    workload.set_defaults(func=cmd_workload)
+
+    apply = sub.add_parser("apply", help="apply DNS servers to adapters")
+    apply.add_argument("servers", nargs="*", help="DNS servers in priority order (IPv4 and IPv6 may be mixed)")
+    apply.add_argument("--provider", choices=sorted(PROVIDERS), help="apply this provider's IPv4 and IPv6 servers")
+    target = apply.add_mutually_exclusive_group()
+    target.add_argument("--adapter", action="append", help="adapter name (repeatable)")
+    target.add_argument("--all", action="store_true", help="all connected adapters")
+    apply.add_argument("--warm", nargs="?", const="", default=None, metavar="FILE",
+                       help="pre-resolve hot domains on the new servers (built-in list if no FILE)")
+    apply.set_defaults(func=cmd_apply)
+
+    rollback = sub.add_parser("rollback", help="restore the DNS config saved by an earlier apply")
+    rollback.add_argument("snapshot", help="JSON output of apply (or its snapshot), - for stdin")
+    rollback.set_defaults(func=cmd_rollback)
+
+    forward = sub.add_parser("forward", help="run a local caching DNS forwarder")
+    forward.add_argument("upstreams", nargs="*", help="upstream resolvers (default: fastest from a benchmark)")
+    forward.add_argument("--listen", default="127.0.0.1")
+    forward.add_argument("--port", type=int, default=53)
+    forward.add_argument("--race", type=int, default=3, help="upstreams raced on each cache miss")
+    forward.add_argument("--stats-interval", type=float, default=0, help="print stats every N seconds")
+    forward.add_argument("--history", nargs="?", const="", default=None, metavar="PATH",
+                         help="store the most queried domains on exit, for warm-up")
+    target = forward.add_mutually_exclusive_group()
+    target.add_argument("--adapter", action="append", help="point this adapter at the forwarder (repeatable)")
+    target.add_argument("--all", action="store_true", help="point all connected adapters at the forwarder")
+    forward.set_defaults(func=cmd_forward)
+
+    monitor = sub.add_parser("monitor", help="watch resolvers and fail over automatically")
+    monitor.add_argument("active", help="resolver currently in use")
+    monitor.add_argument("candidates", nargs="*", help="alternative resolvers (default: built-in list)")
+    monitor.add_argument("--interval", type=float, default=60.0, help="probe period while healthy (s)")
+    monitor.add_argument("--fast-interval", type=float, default=10.0, help="probe period while unhealthy (s)")
+    monitor.add_argument("--margin-ms", type=float, default=20.0, help="required improvement to switch")
+    monitor.add_argument("--window", type=float, default=120.0, help="how long the improvement must hold (s)")
+    monitor.add_argument("--cooldown", type=float, default=900.0, help="minimum time between switches (s)")
+    monitor.add_argument("--dry-run", action="store_true", help="report switches without applying them")
+    target = monitor.add_mutually_exclusive_group()
+    target.add_argument("--adapter", action="append", help="adapter to switch (repeatable)")
+    target.add_argument("--all", action="store_true", help="switch all connected adapters")
+    monitor.set_defaults(func=cmd_monitor)
+
+    flush = sub.add_parser("flush", help="flush the DNS resolver cache")
+    flush.add_argument("--warm", nargs="?", const="", default=None, metavar="FILE",
+                       help="pre-resolve hot domains after flushing (built-in list if no FILE)")
+    flush.set_defaults(func=cmd_flush)
+
+    warmup = sub.add_parser("warmup", help="pre-resolve hot domains to warm DNS caches")
+    warmup.add_argument("servers", nargs="*", help="resolvers to warm (default: the OS resolver)")
+    warmup.add_argument("--domains", metavar="FILE", help="domain list (default: built-in list)")
+    warmup.add_argument("--history", nargs="?", const="", default=None, metavar="PATH",
+                        help="add the most queried domains stored by the forwarder")
+    warmup.add_argument("--qtype", choices=["A", "AAAA"], default="A")
+    warmup.add_argument("--concurrency", type=int, default=8, help="lookups in flight at once")
+    warmup.add_argument("--timeout", type=float, default=2.0)
+    warmup.add_argument("--limit", type=int, default=50, help="maximum domains resolved")
+    warmup.set_defaults(func=cmd_warmup)
+
+    watch = sub.add_parser("watch", help="report network changes and re-rank resolvers per network")
+    watch.add_argument("servers", nargs="*", help="resolvers to rank (default: built-in list)")
+    watch.add_argument("--interval", type=float, default=5.0, help="polling period (s)")
+    watch.add_argument("--rebenchmark", action="store_true", help="rank resolvers again on each change")
+    watch.add_argument("--cache", metavar="PATH", help="keep per-network results in this JSON file")
+    watch.add_argument("--cache-ttl", type=float, default=300.0, help="how long cached results stay fresh (s)")
+    watch.add_argument("--root", metavar="DIR", help="read /proc and /sys under DIR (Linux, for testing)")
+    watch.set_defaults(func=cmd_watch)
+
+    adapters = sub.add_parser("adapters", help="list network adapters")
+    adapters.set_defaults(func=cmd_adapters)
+
+    gui = sub.add_parser("gui", help="launch the graphical interface")
+    gui.set_defaults(func=cmd_gui)
+    return parser
+
+def main(argv=None):
+    """Entry point: run a subcommand, or the GUI when none is given"""
+    args = build_parser().parse_args(sys.argv[1:] if argv is None else argv)
+    if args.profile:
+        enable_profiling(args.profile)
+    if not args.command:
+        return cmd_gui(args)
+    try:
+        with span(args.command):
+            return args.func(args)
+    finally:
+        if args.metrics:
+            try:
+                write_metrics(args.metrics)
+            except OSError as e:
+                print(f"Could not write metrics: {e}", file=sys.stderr)
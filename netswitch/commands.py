@@ -0,0 +1,27 @@
+import os
+import subprocess
+
+from .metrics import REGISTRY, timed
+
+# ----------------------
+# Command Runner
+# ----------------------
+
+def run_command(cmd, timeout=30):
+    """Default command runner: run cmd and return a CompletedProcess, recording its duration and exit code"""
+    program = os.path.basename(cmd[0]).lower() if cmd else ""
+    details = {"command": program, "args": list(cmd[1:])}
+    with timed("command", command=program) as op:
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            REGISTRY.record_error(**details, outcome="timeout", timeout=timeout)
+            raise
+        except OSError as e:
+            REGISTRY.record_error(**details, outcome="error", error=str(e))
+            raise
+        if result.returncode != 0:
+            op["outcome"] = "exit_nonzero"
+            REGISTRY.record_error(**details, outcome="exit_nonzero", returncode=result.returncode,
+                                  output=((result.stderr or "") + (result.stdout or "")).strip()[:2000])
+    return result
@@ -0,0 +1,345 @@
+import os
+import re
+import subprocess
+import tempfile
+
+from .sanitize import sanitize_string, sanitize_network_adapter_name, is_valid_ip, is_valid_ipv6
+from .commands import run_command
+
+# ----------------------
+# Batched DNS Apply
+# ----------------------
+
+def _address_family(address):
+    """Return "ipv6" for IPv6 addresses and "ip" for IPv4 (netsh contexts)"""
+    return "ipv6" if is_valid_ipv6(address) and not is_valid_ip(address) else "ip"
+
+def _netsh_set_commands(name, family, servers):
+    """netsh commands replacing an adapter's DNS list for one address family"""
+    if family == "ip":
+        first = servers[0] if servers else "none"
+        lines = [f'interface ip set dns name="{name}" static {first}']
+    else:
+        first = servers[0] if servers else "none"
+        lines = [f'interface ipv6 set dnsservers name="{name}" source=static address={first} register=primary']
+    return lines + _netsh_add_commands(name, family, servers[1:], start=2)
+
+def _netsh_add_commands(name, family, servers, start=1):
+    """netsh commands appending DNS servers at consecutive indexes"""
+    lines = []
+    for index, server in enumerate(servers, start=start):
+        if family == "ip":
+            lines.append(f'interface ip add dns name="{name}" {server} index={index}')
+        else:
+            lines.append(f'interface ipv6 add dnsservers name="{name}" address={server} index={index}')
+    return lines
+
+def _netsh_delete_commands(name, family, servers):
+    """netsh commands removing individual DNS servers"""
+    if family == "ip":
+        return [f'interface ip delete dns name="{name}" {server}' for server in servers]
+    return [f'interface ipv6 delete dnsservers name="{name}" address={server}' for server in servers]
+
+def _netsh_dhcp_commands(name, family):
+    """netsh commands returning an adapter to DHCP-assigned DNS"""
+    if family == "ip":
+        return [f'interface ip set dns name="{name}" dhcp']
+    return [f'interface ipv6 set dnsservers name="{name}" source=dhcp']
+
+def _unsafe_adapter_name(name):
+    """Whether a name could break out of its quoted argument or line in a netsh script"""
+    return not isinstance(name, str) or any(c in name for c in '\r\n"')
+
+def desired_dns_config(adapters, servers):
+    """Describe the target static DNS config as {adapter: {family: entry}}"""
+    config = {}
+    for adapter in adapters:
+        if _unsafe_adapter_name(adapter):
+            raise ValueError("Invalid network adapter name.")
+        name = sanitize_network_adapter_name(adapter)
+        families = config.setdefault(name, {})
+        for server in servers:
+            entry = families.setdefault(_address_family(server), {"source": "static", "servers": []})
+            entry["servers"].append(server)
+    return config
+
+def plan_dns_changes(current, desired):
+    """Return {adapter: [netsh commands]} holding only the changes actually needed"""
+    plan = {}
+    for adapter, families in desired.items():
+        if _unsafe_adapter_name(adapter):
+            raise ValueError("Invalid network adapter name.")
+        name = sanitize_network_adapter_name(adapter)
+        commands = []
+        for family, target in families.items():
+            existing = (current or {}).get(adapter, {}).get(family)
+            wanted = target["servers"]
+
+            if target["source"] == "dhcp":
+                if not existing or existing["source"] != "dhcp":
+                    commands.extend(_netsh_dhcp_commands(name, family))
+                continue
+            if not existing or existing["source"] != "static":
+                commands.extend(_netsh_set_commands(name, family, wanted))
+                continue
+
+            have = [s.lower() for s in existing["servers"]]
+            if have == [s.lower() for s in wanted]:
+                continue
+
+            # Keep the matching leading servers, drop the rest and append the missing ones
+            keep = 0
+            while keep < min(len(have), len(wanted)) and have[keep] == wanted[keep].lower():
+                keep += 1
+            if keep == 0:
+                commands.extend(_netsh_set_commands(name, family, wanted))
+            else:
+                commands.extend(_netsh_delete_commands(name, family, existing["servers"][keep:]))
+                commands.extend(_netsh_add_commands(name, family, wanted[keep:], start=keep + 1))
+        plan[name] = commands
+    return plan
+
+def build_netsh_dns_script(adapters, servers, current=None):
+    """Build one netsh script that sets the DNS servers on every adapter"""
+    return _render_netsh_script(plan_dns_changes(current, desired_dns_config(adapters, servers)))
+
+def _render_netsh_script(plan):
+    """Join a change plan into netsh script text (empty when nothing changes)"""
+    lines = [line for commands in plan.values() for line in commands]
+    return "\n".join(lines) + "\n" if lines else ""
+
+def parse_netsh_dnsservers(text):
+    """Parse `netsh interface ip show dnsservers` into {adapter: {source, servers}}"""
+    config = {}
+    current = None
+    in_dns = False
+    if not isinstance(text, str):
+        return config
+
+    for raw_line in text.splitlines():
+        line = sanitize_string(raw_line, 200)
+        header = re.match(r'^Configuration for interface "(.+)"$', line)
+        if header:
+            current = {"source": "static", "servers": []}
+            config[header.group(1)] = current
+            in_dns = False
+            continue
+        if current is None or not line:
+            continue
+
+        labelled = re.match(r"^([^:]+):\s*(.*)$", line)
+        if labelled and not is_valid_ipv6(line):
+            label, value = labelled.groups()
+            in_dns = "DNS" in label
+            if not in_dns:
+                continue
+            current["source"] = "dhcp" if "DHCP" in label else "static"
+            line = value
+        elif not in_dns:
+            continue
+
+        # Continuation lines carry one additional server address each
+        value = line.split()[0] if line.split() else ""
+        if is_valid_ip(value) or is_valid_ipv6(value):
+            current["servers"].append(value)
+    return config
+
+def get_dns_servers(families=("ip", "ipv6"), runner=None, timeout=30):
+    """Read the current DNS config as {adapter: {family: entry}}, or None if netsh fails"""
+    runner = runner or run_command
+    config = {}
+    try:
+        for family in families:
+            result = runner(["netsh", "interface", family, "show", "dnsservers"], timeout)
+            if result.returncode != 0:
+                return None
+            for adapter, entry in parse_netsh_dnsservers(result.stdout).items():
+                config.setdefault(adapter, {})[family] = entry
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    return config
+
+def run_netsh_script(script, runner=None, timeout=60):
+    """Run a netsh script with a single `netsh -f` invocation"""
+    runner = runner or run_command
+    fd, path = tempfile.mkstemp(prefix="netswitch-", suffix=".txt")
+    try:
+        with os.fdopen(fd, "w") as script_file:
+            script_file.write(script)
+        return runner(["netsh", "-f", path], timeout)
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _snapshot_dns_config(current, desired):
+    """Copy the current config of the adapters and families about to change"""
+    snapshot = {}
+    for adapter, families in desired.items():
+        for family in families:
+            entry = (current or {}).get(adapter, {}).get(family)
+            if entry:
+                snapshot.setdefault(adapter, {})[family] = {
+                    "source": entry["source"],
+                    "servers": list(entry["servers"]),
+                }
+    return snapshot
+
+def apply_dns_config(desired, runner=None, current=None, verify=True):
+    """Bring adapters to the desired config with one netsh run, skipping no-op changes"""
+    result = {"ok": False, "adapters": [], "snapshot": {}, "error": None}
+    if not desired:
+        result["error"] = "No network adapters selected."
+        return result
+
+    families = tuple(dict.fromkeys(f for entry in desired.values() for f in entry))
+    if current is None:
+        current = get_dns_servers(families, runner=runner)
+    try:
+        plan = plan_dns_changes(current, desired)
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+    result["snapshot"] = _snapshot_dns_config(current, desired)
+
+    script = _render_netsh_script(plan)
+    output = ""
+    completed = None
+    if script:
+        try:
+            completed = run_netsh_script(script, runner=runner, timeout=30 + 10 * len(plan))
+        except subprocess.TimeoutExpired:
+            result["error"] = "Command timed out. Please try again."
+            return result
+        except OSError as e:
+            result["error"] = sanitize_string(str(e), 200)
+            return result
+        output = sanitize_string(f"{completed.stdout or ''} {completed.stderr or ''}", 200)
+        current = get_dns_servers(families, runner=runner) if verify else None
+
+    for adapter, families_wanted in desired.items():
+        changed = bool(plan.get(adapter))
+        if not changed:
+            ok = True
+        elif current is not None:
+            ok = all(
+                current.get(adapter, {}).get(family, {}).get("source") == entry["source"]
+                and (entry["source"] == "dhcp" or [s.lower() for s in current[adapter][family]["servers"]]
+                     == [s.lower() for s in entry["servers"]])
+                for family, entry in families_wanted.items()
+            )
+        else:
+            ok = completed.returncode == 0
+        result["adapters"].append({
+            "adapter": adapter,
+            "ok": ok,
+            "changed": changed,
+            "error": None if ok else (output or "DNS servers were not applied."),
+        })
+
+    result["ok"] = all(r["ok"] for r in result["adapters"])
+    if not result["ok"]:
+        result["error"] = output or "DNS servers were not applied."
+    return result
+
+def _warm(result, warm, servers=None):
+    """Attach a warm-up report to a successful apply/flush result when warm is set"""
+    if warm and result["ok"]:
+        from .warmup import warm_up
+        result["warmup"] = warm_up(None if warm is True else warm, servers=servers)
+    return result
+
+def _backend(backend, runner):
+    if backend is not None:
+        return backend
+    from .platforms import get_backend
+    return get_backend(runner)
+
+def apply_dns_batch(adapters, servers, runner=None, current=None, verify=True, warm=None, backend=None):
+    """Apply DNS servers to several adapters in one batch (one netsh run on Windows), reporting per adapter
+
+    warm may be True (built-in hot domains) or a domain list to pre-resolve
+    against the new servers once they are applied.
+    """
+    servers = [sanitize_string(s, 45) for s in servers]
+    if any(_unsafe_adapter_name(a) for a in adapters):
+        return {"ok": False, "adapters": [], "snapshot": {}, "error": "Invalid network adapter name."}
+    adapters = list(dict.fromkeys(sanitize_network_adapter_name(a) for a in adapters))
+    if not servers or not all(is_valid_ip(s) or is_valid_ipv6(s) for s in servers):
+        return {"ok": False, "adapters": [], "snapshot": {},
+                "error": "Please enter valid IPv4 or IPv6 addresses for DNS."}
+
+    result = _backend(backend, runner).apply_dns_config(desired_dns_config(adapters, servers),
+                                                       current=current, verify=verify)
+    result["servers"] = servers
+    return _warm(result, warm, servers)
+
+def load_snapshot(data):
+    """Validate a snapshot, or an apply result holding one, read back from JSON
+
+    Raises ValueError when the structure, an adapter name or a server address is not acceptable.
+    """
+    if isinstance(data, dict) and isinstance(data.get("snapshot"), dict):
+        data = data["snapshot"]
+    if not isinstance(data, dict) or not data:
+        raise ValueError("No DNS snapshot to restore.")
+    snapshot = {}
+    for adapter, families in data.items():
+        if _unsafe_adapter_name(adapter) or not isinstance(families, dict):
+            raise ValueError("Invalid network adapter name.")
+        for family, entry in families.items():
+            if family not in ("ip", "ipv6") or not isinstance(entry, dict) or entry.get("source") not in ("static", "dhcp"):
+                raise ValueError(f"Invalid DNS snapshot entry for {sanitize_string(adapter, 100)}.")
+            servers = [sanitize_string(s, 45) for s in entry.get("servers") or []]
+            if not all(is_valid_ip(s) or is_valid_ipv6(s) for s in servers):
+                raise ValueError("Please enter valid IPv4 or IPv6 addresses for DNS.")
+            snapshot.setdefault(sanitize_network_adapter_name(adapter), {})[family] = {
+                "source": entry["source"], "servers": servers,
+            }
+    return snapshot
+
+def rollback_dns(snapshot, runner=None, verify=True, backend=None):
+    """Restore the config captured in an apply result's snapshot in one batched run"""
+    return _backend(backend, runner).apply_dns_config(snapshot, verify=verify)
+
+# ----------------------
+# Core DNS Functions
+# ----------------------
+
+def apply_dns(dns1, dns2, adapter_name="Wi-Fi", runner=None, warm=None, backend=None):
+    """Apply a primary/secondary DNS pair to one adapter or a list of adapters"""
+    # Sanitize and validate inputs
+    dns1 = sanitize_string(dns1, 45)  # Support both IPv4 and IPv6
+    dns2 = sanitize_string(dns2, 45)
+    adapters = adapter_name if isinstance(adapter_name, list) else [adapter_name]
+
+    # Validate DNS addresses; a mixed IPv4 + IPv6 pair sets one server per family
+    if not all(is_valid_ip(s) or is_valid_ipv6(s) for s in (dns1, dns2)):
+        return {"ok": False, "adapters": [], "snapshot": {}, "servers": [dns1, dns2],
+                "error": "Please enter valid IPv4 or IPv6 addresses for DNS."}
+
+    return apply_dns_batch(adapters, [dns1, dns2], runner=runner, warm=warm, backend=backend)
+
+def flush_dns(runner=None, warm=None, backend=None):
+    """Flush the DNS resolver cache and return a structured result
+
+    warm may be True or a domain list to pre-resolve through the OS resolver afterwards.
+    """
+    return _warm(_backend(backend, runner).flush_dns(), warm)
+
+def ipconfig_flush_dns(runner=None):
+    """Flush the Windows resolver cache with ipconfig"""
+    runner = runner or run_command
+    try:
+        # Use fixed command arguments to prevent injection
+        cmd = ["ipconfig", "/flushdns"]
+        result = runner(cmd, 30)
+        if result.returncode != 0:
+            error_msg = sanitize_string(f"{result.stdout or ''} {result.stderr or ''}", 200)
+            return {"ok": False, "error": error_msg or "ipconfig /flushdns failed."}
+        return {"ok": True, "error": None}
+    except subprocess.TimeoutExpired:
+        return {"ok": False, "error": "Command timed out. Please try again."}
+    except Exception as e:
+        return {"ok": False, "error": sanitize_string(str(e), 200)}
@@ -0,0 +1,144 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .sanitize import sanitize_string
+from .probe import DNS_PORT, DEFAULT_PROBE_DOMAIN
+from .benchmark import test_dns, summarize_samples, rank_key
+
+# ----------------------
+# Dual-stack Providers
+# ----------------------
+
+FAMILIES = ("ipv6", "ipv4")
+
+# IPv4 and IPv6 endpoints of well-known public resolvers, primary first
+PROVIDERS = {
+    "Cloudflare": {"ipv4": ["1.1.1.1", "1.0.0.1"], "ipv6": ["2606:4700:4700::1111", "2606:4700:4700::1001"]},
+    "Google": {"ipv4": ["8.8.8.8", "8.8.4.4"], "ipv6": ["2001:4860:4860::8888", "2001:4860:4860::8844"]},
+    "Quad9": {"ipv4": ["9.9.9.9", "149.112.112.112"], "ipv6": ["2620:fe::fe", "2620:fe::9"]},
+    "OpenDNS": {"ipv4": ["208.67.222.222", "208.67.220.220"], "ipv6": ["2620:119:35::35", "2620:119:53::53"]},
+}
+
+# RFC 8305 resolution delay: IPv4 starts only if IPv6 has not answered by then
+HAPPY_EYEBALLS_DELAY_MS = 50
+
+def providers_for(servers):
+    """Providers owning any of the given addresses (all providers when servers is empty)"""
+    if not servers:
+        return dict(PROVIDERS)
+    wanted = {sanitize_string(s, 45).lower() for s in servers}
+    return {name: endpoints for name, endpoints in PROVIDERS.items()
+            if wanted & {a.lower() for family in endpoints.values() for a in family}}
+
+def provider_servers(provider, families=FAMILIES):
+    """Mixed IPv4 + IPv6 server list of a provider (or a dual-stack row), for one batched apply"""
+    if isinstance(provider, dict):
+        return list(provider["servers"])
+    endpoints = PROVIDERS.get(provider, {})
+    return [server for family in families for server in endpoints.get(family, [])]
+
+def _race(pool, v6, v4, delay, probe_fn):
+    """One happy-eyeballs round; returns ({family: rtt or None}, winning family or None)
+
+    IPv6 starts first and IPv4 after delay seconds, or as soon as IPv6 is
+    done. IPv4 always runs, even after an IPv6 win, so both families get measured.
+    """
+    started = time.perf_counter()
+
+    def timed_probe(server):
+        rtt = probe_fn(server)
+        return rtt, time.perf_counter() - started
+
+    futures = {}
+    if v6:
+        futures["ipv6"] = pool.submit(timed_probe, v6)
+        # Returns early when IPv6 finishes first, whether it answered or failed
+        wait([futures["ipv6"]], timeout=delay)
+    if v4:
+        futures["ipv4"] = pool.submit(timed_probe, v4)
+
+    rtts = {}
+    finish = {}
+    for family, future in futures.items():
+        rtt, finished_at = future.result()
+        rtts[family] = rtt
+        if rtt is not None:
+            finish[family] = finished_at
+    winner = min(finish, key=finish.get) if finish else None
+    return rtts, winner
+
+def benchmark_dual_stack(providers=None, samples=3, delay_ms=HAPPY_EYEBALLS_DELAY_MS, timeout=2.0, method="dns",
+                         qname=DEFAULT_PROBE_DOMAIN, port=DNS_PORT, probe_fn=None, max_workers=16,
+                         deadline=None, history=None, cache=None):
+    """Race each provider's IPv6 and IPv4 endpoints happy-eyeballs style and pick a family per provider
+
+    Rows carry per-family "ipv4"/"ipv6" summaries, the happy-eyeballs "wins"
+    per family, the preferred "family" (the one winning most races) and
+    "servers": the provider's addresses for every reachable family, preferred
+    family first, ready for a single mixed apply. The top-level latency fields
+    and "server" are those of the preferred family.
+
+    No race starts after deadline seconds; the rounds left count as lost. The
+    samples of every endpoint go to history, and a per-endpoint row to cache.
+    """
+    providers = PROVIDERS if providers is None else providers
+    samples = max(1, min(int(samples), 50))
+    if deadline is not None:
+        # A single probe can never outlive the whole benchmark
+        timeout = min(timeout, deadline)
+    probe_fn = probe_fn or (lambda server: test_dns(server, method, qname, port, timeout))
+    if not providers:
+        return []
+    stop_at = time.perf_counter() + deadline if deadline is not None else None
+    by_server = {}
+
+    def run_provider(name, endpoints):
+        v6_list = endpoints.get("ipv6", [])
+        v4_list = endpoints.get("ipv4", [])
+        results = {"ipv4": [], "ipv6": []}
+        wins = {"ipv4": 0, "ipv6": 0}
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            for i in range(samples):
+                # Rotate through the endpoints so secondaries are measured too
+                v6 = v6_list[i % len(v6_list)] if v6_list else None
+                v4 = v4_list[i % len(v4_list)] if v4_list else None
+                if stop_at is not None and time.perf_counter() >= stop_at:
+                    rtts, winner = {family: None for family, server in (("ipv6", v6), ("ipv4", v4)) if server}, None
+                else:
+                    rtts, winner = _race(pool, v6, v4, delay_ms / 1000, probe_fn)
+                for family, rtt in rtts.items():
+                    results[family].append(rtt)
+                    by_server.setdefault(v6 if family == "ipv6" else v4, []).append(rtt)
+                if winner:
+                    wins[winner] += 1
+
+        per_family = {family: summarize_samples(endpoints[family][0], values)
+                      for family, values in results.items() if values}
+        reachable = [f for f in FAMILIES if f in per_family and per_family[f]["received"]]
+        preferred = max(reachable, key=lambda f: wins[f]) if reachable else None
+        order = ([preferred] if preferred else []) + [f for f in reachable if f != preferred]
+
+        base = per_family[preferred] if preferred else per_family[next(iter(per_family))]
+        row = dict(base)
+        row.update({
+            "provider": name,
+            "family": preferred,
+            "servers": [server for family in order for server in endpoints[family]],
+            "wins": wins,
+        })
+        row.update({family: per_family.get(family) for family in ("ipv4", "ipv6")})
+        return row
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(providers)))) as pool:
+        rows = list(pool.map(lambda item: run_provider(*item), providers.items()))
+
+    if history is not None:
+        try:
+            history.record_results(by_server, method)
+        except Exception:
+            pass
+    if cache is not None:
+        for server, values in by_server.items():
+            cache.put(summarize_samples(server, values), method)
+        cache.save()
+    return sorted(rows, key=rank_key)
@@ -0,0 +1,309 @@
+import http.client
+import random
+import socket
+import ssl
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+from .sanitize import sanitize_string, is_valid_ip, is_valid_ipv6
+from .probe import DEFAULT_PROBE_DOMAIN, DNS_QTYPES, build_dns_query, parse_dns_response, _recv_exact
+from .benchmark import summarize_samples, rank_key
+from .metrics import record_operation
+
+# ----------------------
+# Encrypted DNS Probes (DoT / DoH)
+# ----------------------
+
+ENCRYPTED_TRANSPORTS = ("dot", "doh")
+DOT_PORT = 853
+DOH_PORT = 443
+DOH_PATH = "/dns-query"
+
+# Certificate names of well-known resolvers, used for SNI and verification
+TLS_HOSTNAMES = {
+    "1.1.1.1": "cloudflare-dns.com",
+    "1.0.0.1": "cloudflare-dns.com",
+    "8.8.8.8": "dns.google",
+    "8.8.4.4": "dns.google",
+    "9.9.9.9": "dns.quad9.net",
+    "149.112.112.112": "dns.quad9.net",
+    "208.67.222.222": "dns.opendns.com",
+    "208.67.220.220": "dns.opendns.com",
+}
+
+class _Connection:
+    """One pooled TLS connection (raw DoT stream or HTTP/1.1 keep-alive DoH)"""
+
+    def __init__(self, transport, server, port, hostname, context, timeout, session=None):
+        self.transport = transport
+        self.started = time.perf_counter()
+        family = socket.AF_INET6 if ":" in server else socket.AF_INET
+        raw = socket.socket(family, socket.SOCK_STREAM)
+        raw.settimeout(timeout)
+        # Small DNS messages and split HTTP writes must not wait for delayed ACKs
+        raw.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            raw.connect((server, port))
+            self.sock = context.wrap_socket(raw, server_hostname=hostname, session=session)
+        except (OSError, ssl.SSLError):
+            raw.close()
+            raise
+        self.handshake_ms = round((time.perf_counter() - self.started) * 1000, 2)
+        self.resumed = self.sock.session_reused
+        self.http = None
+        if transport == "doh":
+            # Passing the context avoids loading the CA store again for every connection
+            self.http = http.client.HTTPSConnection(hostname, port, timeout=timeout, context=context)
+            self.http.sock = self.sock  # Already connected and handshaken, keep-alive reuses it
+
+    @property
+    def session(self):
+        return self.sock.session
+
+    def query(self, wire, path):
+        """Send one DNS message and return the raw response"""
+        if self.transport == "dot":
+            self.sock.sendall(struct.pack("!H", len(wire)) + wire)
+            length = struct.unpack("!H", _recv_exact(self.sock, 2))[0]
+            return _recv_exact(self.sock, length)
+
+        self.http.request("POST", path, body=wire, headers={
+            "Content-Type": "application/dns-message",
+            "Accept": "application/dns-message",
+        })
+        response = self.http.getresponse()
+        body = response.read()
+        if response.status != 200:
+            raise ValueError(f"DoH server returned HTTP {response.status}")
+        if response.will_close:
+            self.close()
+        return body
+
+    @property
+    def closed(self):
+        return self.sock is None or self.sock.fileno() < 0
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+
+class EncryptedProbePool:
+    """Pooled DoT/DoH connections with TLS session resumption, reused across probes"""
+
+    def __init__(self, timeout=3.0, context=None, max_idle=60.0):
+        self.timeout = timeout
+        self.context = context or ssl.create_default_context()
+        self.max_idle = max_idle
+        self._idle = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _key(self, transport, server, port, hostname):
+        return (transport, server, port, hostname)
+
+    def _checkout(self, key):
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, released = idle.pop()
+                if time.monotonic() - released < self.max_idle and not conn.closed:
+                    return conn
+                conn.close()
+        return None
+
+    def _checkin(self, key, conn):
+        if conn.closed:
+            return
+        with self._lock:
+            self._idle.setdefault(key, []).append((conn, time.monotonic()))
+
+    def _exchange(self, key, conn, transport, server, port, hostname, qname, qtype, path, result):
+        """Run one query on conn (or a new connection) and return it to the pool on success"""
+        result["reused"] = conn is not None
+        if conn is None:
+            with self._lock:
+                session = self._sessions.get(key)
+            conn = _Connection(transport, server, port, hostname, self.context, self.timeout, session)
+            result["handshake_ms"] = conn.handshake_ms
+            result["resumed"] = conn.resumed
+        try:
+            # DoH uses ID 0 so identical queries are cacheable (RFC 8484)
+            query_id = 0 if transport == "doh" else random.getrandbits(16)
+            wire = build_dns_query(qname, qtype, query_id)
+            query_start = time.perf_counter()
+            data = conn.query(wire, path)
+            rtt = time.perf_counter() - query_start
+        except BaseException:
+            conn.close()
+            raise
+
+        # A TLS 1.3 session is only usable once the server's ticket has been read
+        with self._lock:
+            if conn.session is not None:
+                self._sessions[key] = conn.session
+        self._checkin(key, conn)
+        return data, rtt, query_id
+
+    def probe(self, server, transport="dot", qname=DEFAULT_PROBE_DOMAIN, qtype="A", port=None,
+              hostname=None, path=DOH_PATH, fresh=False):
+        """Query a resolver over DoT or DoH, reusing a pooled connection unless fresh is set
+
+        rtt_ms is the query round trip only; handshake_ms is set when a new
+        connection had to be opened, with resumed telling whether the TLS
+        session was resumed.
+        """
+        server = sanitize_string(server, 45)
+        result = {
+            "server": server,
+            "transport": transport,
+            "qname": qname,
+            "qtype": qtype,
+            "ok": False,
+            "rtt_ms": None,
+            "handshake_ms": None,
+            "reused": False,
+            "resumed": False,
+            "rcode": None,
+            "answer_count": 0,
+            "answers": [],
+            "error": None,
+        }
+        if transport not in ENCRYPTED_TRANSPORTS:
+            result["error"] = "Unsupported transport"
+            return result
+        if not (is_valid_ip(server) or is_valid_ipv6(server)):
+            result["error"] = "Invalid DNS server address"
+            return result
+        if qtype not in DNS_QTYPES:
+            result["error"] = "Unsupported query type"
+            return result
+
+        port = port or (DOT_PORT if transport == "dot" else DOH_PORT)
+        hostname = hostname or TLS_HOSTNAMES.get(server, server)
+        key = self._key(transport, server, port, hostname)
+        started = time.perf_counter()
+        try:
+            # A pooled connection may have been closed by the server meanwhile: retry once on a new one
+            def attempt(conn):
+                return self._exchange(key, conn, transport, server, port, hostname, qname, qtype, path, result)
+
+            conn = None if fresh else self._checkout(key)
+            try:
+                data, rtt, query_id = attempt(conn)
+            except (OSError, http.client.HTTPException):
+                if conn is None:
+                    raise
+                data, rtt, query_id = attempt(None)
+            response = parse_dns_response(data, query_id)
+            result.update({
+                "ok": True,
+                "rtt_ms": round(rtt * 1000, 2),
+                "rcode": response["rcode"],
+                "answer_count": response["answer_count"],
+                "answers": response["answers"],
+            })
+        except socket.timeout:
+            result["error"] = "Timed out"
+        except (OSError, ssl.SSLError, ValueError, struct.error, http.client.HTTPException) as e:
+            result["error"] = sanitize_string(str(e), 200)
+
+        outcome = "ok" if result["ok"] else ("timeout" if result["error"] == "Timed out" else "error")
+        record_operation("dns_probe", time.perf_counter() - started, outcome, transport=transport)
+        return result
+
+    def close(self):
+        """Close every idle connection and forget TLS sessions"""
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+            self._sessions.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+def shared_pool():
+    """Process-wide pool used by test_dns so repeated probes keep their connections"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = EncryptedProbePool()
+        return _shared_pool
+
+def _benchmark_server(pool, server, transport, samples, qname, port, hostname):
+    """Cold handshake, steady-state queries on the warm connection, then a resumed handshake"""
+    first = pool.probe(server, transport, qname, port=port, hostname=hostname, fresh=True)
+    rtts = [first["rtt_ms"] if first["ok"] else None]
+    for _ in range(samples - 1):
+        result = pool.probe(server, transport, qname, port=port, hostname=hostname)
+        rtts.append(result["rtt_ms"] if result["ok"] else None)
+    resumed = pool.probe(server, transport, qname, port=port, hostname=hostname, fresh=True) if first["ok"] else None
+
+    row = summarize_samples(server, rtts)
+    row.update({
+        "transport": transport,
+        "handshake_ms": first["handshake_ms"],
+        "resumed_handshake_ms": resumed["handshake_ms"] if resumed and resumed["ok"] else None,
+        "session_resumed": bool(resumed and resumed["resumed"]),
+        "error": first["error"],
+    })
+    return row, rtts
+
+def benchmark_encrypted(servers, transport="dot", samples=3, deadline=10.0, timeout=3.0,
+                        qname=DEFAULT_PROBE_DOMAIN, port=None, hostnames=None, context=None, max_workers=16,
+                        history=None):
+    """Rank resolvers by steady-state DoT/DoH query latency, reporting handshake cost separately"""
+    servers = [sanitize_string(s, 45) for s in servers]
+    servers = [s for s in dict.fromkeys(servers) if is_valid_ip(s) or is_valid_ipv6(s)]
+    samples = max(1, min(int(samples), 50))
+    hostnames = hostnames or {}
+    if not servers or transport not in ENCRYPTED_TRANSPORTS:
+        return []
+
+    rows = {}
+    results = {}
+    pool = EncryptedProbePool(timeout=min(timeout, deadline), context=context)
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(servers))))
+    try:
+        futures = {
+            executor.submit(_benchmark_server, pool, server, transport, samples, qname, port,
+                            hostnames.get(server)): server
+            for server in servers
+        }
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                try:
+                    rows[futures[future]], results[futures[future]] = future.result()
+                except Exception:
+                    pass
+        except FuturesTimeoutError:
+            pass
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        pool.close()
+
+    for server in servers:
+        if server not in rows:
+            rows[server] = summarize_samples(server, [None] * samples)
+            rows[server].update({"transport": transport, "handshake_ms": None, "resumed_handshake_ms": None,
+                                 "session_resumed": False, "error": "Deadline exceeded"})
+            results[server] = [None] * samples
+
+    if history is not None:
+        try:
+            history.record_results(results, transport)
+        except Exception:
+            pass
+    return sorted(rows.values(), key=rank_key)
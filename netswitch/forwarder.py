@@ -0,0 +1,354 @@
+import random
+import select
+import socket
+import struct
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .sanitize import sanitize_string
+from .validation import normalize_address, validate_addresses
+from .probe import DNS_PORT, DNS_RCODES, _skip_dns_name, _dns_query_tcp, _recv_exact
+from .benchmark import summarize_samples
+
+# ----------------------
+# Local Caching DNS Forwarder
+# ----------------------
+
+FORWARDER_ADDRESS = "127.0.0.1"
+NEGATIVE_TTL = 60
+MAX_CACHE_TTL = 86400
+_OPT_RR_TYPE = 41
+
+def _read_question(data):
+    """Return (cache key, end offset) for the first question of a DNS message"""
+    if len(data) < 12 or struct.unpack("!H", data[4:6])[0] < 1:
+        raise ValueError("DNS message has no question")
+    end = _skip_dns_name(data, 12)
+    qtype, qclass = struct.unpack("!HH", data[end:end + 4])
+    return (data[12:end].lower(), qtype, qclass), end + 4
+
+def _ttl_offsets(data):
+    """Return (offsets of every RR TTL field, minimum TTL) for a DNS response"""
+    counts = struct.unpack("!HHHH", data[4:12])
+    offset = 12
+    for _ in range(counts[0]):
+        offset = _skip_dns_name(data, offset) + 4
+
+    offsets = []
+    min_ttl = None
+    for _ in range(counts[1] + counts[2] + counts[3]):
+        offset = _skip_dns_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+        if rtype != _OPT_RR_TYPE:  # The OPT pseudo-record's TTL field holds flags
+            offsets.append(offset + 4)
+            min_ttl = ttl if min_ttl is None else min(min_ttl, ttl)
+        offset += 10 + rdlength
+    return offsets, min_ttl
+
+class DnsCache:
+    """LRU cache of DNS responses that honours record TTLs"""
+
+    def __init__(self, max_entries=4096, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, query_id):
+        """Return a cached response rewritten for query_id with aged TTLs, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, offsets, stored_at, expires_at = entry
+            now = self.clock()
+            if now >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+        elapsed = int(now - stored_at)
+        data = bytearray(response)
+        data[0:2] = struct.pack("!H", query_id)
+        for offset in offsets:
+            ttl = struct.unpack("!I", data[offset:offset + 4])[0]
+            data[offset:offset + 4] = struct.pack("!I", max(0, ttl - elapsed))
+        return bytes(data)
+
+    def put(self, key, response):
+        """Cache a response for its minimum TTL; errors and truncated answers are skipped"""
+        flags = struct.unpack("!H", response[2:4])[0]
+        rcode = flags & 0x000F
+        if flags & 0x0200 or rcode not in (0, 3):
+            return False
+        try:
+            offsets, min_ttl = _ttl_offsets(response)
+        except (ValueError, struct.error):
+            return False
+
+        ttl = min(min_ttl if min_ttl is not None else NEGATIVE_TTL, MAX_CACHE_TTL)
+        if ttl <= 0:
+            return False
+        now = self.clock()
+        with self._lock:
+            self._entries[key] = (response, offsets, now, now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def upstreams_from_ranking(ranking, k=3):
+    """Pick the top-k reachable resolvers from a benchmark ranking"""
+    return [row["server"] for row in ranking if row["received"]][:k]
+
+class DnsForwarder:
+    """Stub resolver on localhost that caches answers and races upstreams on a miss"""
+
+    def __init__(self, upstreams, listen=FORWARDER_ADDRESS, port=DNS_PORT, upstream_port=DNS_PORT,
+                 race=3, timeout=2.0, cache_size=4096, max_workers=32):
+        # Canonical forms, so replies can be matched on the address they come from
+        self.upstreams = validate_addresses([sanitize_string(u, 45) for u in upstreams])["valid"]
+        if not self.upstreams:
+            raise ValueError("At least one valid upstream resolver is required")
+        self.listen = listen
+        self.port = port
+        self.upstream_port = upstream_port
+        self.race = max(1, race)
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = DnsCache(cache_size)
+
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._failures = 0
+        self._wins = Counter()
+        self._latencies = deque(maxlen=2048)
+        self._names = Counter()
+
+        self._pool = None
+        self._udp = None
+        self._tcp = None
+        self._threads = []
+        self._running = threading.Event()
+
+    # Lifecycle
+
+    def start(self):
+        """Bind the UDP and TCP listeners and start serving"""
+        family = socket.AF_INET6 if ":" in self.listen else socket.AF_INET
+        self._udp = socket.socket(family, socket.SOCK_DGRAM)
+        self._udp.bind((self.listen, self.port))
+        self.port = self._udp.getsockname()[1]
+        self._tcp = socket.socket(family, socket.SOCK_STREAM)
+        self._tcp.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._tcp.bind((self.listen, self.port))
+        self._tcp.listen(32)
+
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="netswitch-fwd")
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self._serve_udp, daemon=True),
+            threading.Thread(target=self._serve_tcp, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listeners"""
+        self._running.clear()
+        for sock in (self._udp, self._tcp):
+            if sock is not None:
+                try:
+                    sock.close()
+                except OSError:
+                    pass
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Query handling
+
+    def resolve(self, query, tcp=False):
+        """Answer a raw DNS query from cache or by racing the upstreams"""
+        start = time.perf_counter()
+        query_id = struct.unpack("!H", query[:2])[0]
+        key, _ = _read_question(query)
+        self._count_name(key[0])
+
+        response = self.cache.get(key, query_id)
+        if response is not None:
+            with self._stats_lock:
+                self._hits += 1
+                self._latencies.append((time.perf_counter() - start) * 1000)
+            return response
+
+        response, winner = self._race(query)
+        if response is not None and tcp and struct.unpack("!H", response[2:4])[0] & 0x0200:
+            # The client can take a full answer over TCP, fetch it from the winner
+            try:
+                response, _ = _dns_query_tcp(winner, self.upstream_port, query, self.timeout)
+            except (OSError, ValueError, struct.error):
+                pass
+
+        with self._stats_lock:
+            self._misses += 1
+            self._latencies.append((time.perf_counter() - start) * 1000)
+            if response is None:
+                self._failures += 1
+            else:
+                self._wins[winner] += 1
+        if response is None:
+            return self._servfail(query)
+
+        self.cache.put(key, response)
+        return response
+
+    def _count_name(self, wire_name):
+        """Count a queried name so hot domains can be warmed after a flush"""
+        labels = []
+        offset = 0
+        while offset < len(wire_name) and wire_name[offset]:
+            length = wire_name[offset]
+            labels.append(wire_name[offset + 1:offset + 1 + length].decode("ascii", "replace"))
+            offset += length + 1
+        if not labels:
+            return
+        with self._stats_lock:
+            self._names[".".join(labels)] += 1
+            if len(self._names) > 4 * self.cache.max_entries:
+                # Keep the busy names, forget the long tail
+                self._names = Counter(dict(self._names.most_common(self.cache.max_entries)))
+
+    def hot_domains(self, limit=50):
+        """{domain: lookups} for the most queried names since the forwarder started"""
+        with self._stats_lock:
+            return dict(self._names.most_common(limit))
+
+    def _race(self, query):
+        """Send the query to the top upstreams at once and return the first valid answer"""
+        client_id = query[:2]
+        race_id = random.getrandbits(16)
+        wire = struct.pack("!H", race_id) + query[2:]
+        targets = self.upstreams[:self.race]
+
+        sockets = {}
+        expected = {}
+        try:
+            for upstream in targets:
+                family = socket.AF_INET6 if ":" in upstream else socket.AF_INET
+                if family not in sockets:
+                    sockets[family] = socket.socket(family, socket.SOCK_DGRAM)
+                sock = sockets[family]
+                try:
+                    sock.sendto(wire, (upstream, self.upstream_port))
+                    expected[upstream] = True
+                except OSError:
+                    continue
+
+            fallback = None
+            deadline = time.monotonic() + self.timeout
+            while expected:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                readable, _, _ = select.select(list(sockets.values()), [], [], remaining)
+                for sock in readable:
+                    try:
+                        data, addr = sock.recvfrom(65535)
+                    except OSError:
+                        continue
+                    upstream = normalize_address(addr[0])
+                    if upstream not in expected or len(data) < 12 or data[:2] != wire[:2]:
+                        continue
+                    del expected[upstream]
+                    response = client_id + data[2:]
+                    rcode = struct.unpack("!H", data[2:4])[0] & 0x000F
+                    if DNS_RCODES.get(rcode) in ("NOERROR", "NXDOMAIN"):
+                        return response, upstream
+                    fallback = (response, upstream)
+            return fallback if fallback else (None, None)
+        finally:
+            for sock in sockets.values():
+                sock.close()
+
+    @staticmethod
+    def _servfail(query):
+        """Build a SERVFAIL answer echoing the client's question"""
+        try:
+            _, end = _read_question(query)
+        except (ValueError, struct.error):
+            end = 12
+        flags = 0x8182 | (struct.unpack("!H", query[2:4])[0] & 0x0100)
+        return query[:2] + struct.pack("!HHHHH", flags, 1 if end > 12 else 0, 0, 0, 0) + query[12:end]
+
+    def _serve_udp(self):
+        while self._running.is_set():
+            try:
+                query, client = self._udp.recvfrom(4096)
+            except OSError:
+                break
+            self._pool.submit(self._answer_udp, query, client)
+
+    def _answer_udp(self, query, client):
+        try:
+            self._udp.sendto(self.resolve(query), client)
+        except (OSError, ValueError, struct.error):
+            pass
+
+    def _serve_tcp(self):
+        while self._running.is_set():
+            try:
+                conn, _ = self._tcp.accept()
+            except OSError:
+                break
+            self._pool.submit(self._answer_tcp, conn)
+
+    def _answer_tcp(self, conn):
+        with conn:
+            conn.settimeout(self.timeout * 5)
+            try:
+                while True:
+                    header = conn.recv(2)
+                    if len(header) < 2:
+                        return
+                    query = _recv_exact(conn, struct.unpack("!H", header)[0])
+                    response = self.resolve(query, tcp=True)
+                    conn.sendall(struct.pack("!H", len(response)) + response)
+            except (OSError, ValueError, struct.error):
+                return
+
+    # Metrics
+
+    def stats(self):
+        """Return cache hit rate, upstream win counts and query latency"""
+        with self._stats_lock:
+            queries = self._hits + self._misses
+            latency = summarize_samples("forwarder", list(self._latencies))
+            return {
+                "queries": queries,
+                "cache_hits": self._hits,
+                "cache_misses": self._misses,
+                "hit_rate": round(self._hits / queries, 3) if queries else 0.0,
+                "failures": self._failures,
+                "cache_entries": len(self.cache),
+                "upstream_wins": dict(self._wins),
+                "latency_ms": {k: latency[k] for k in ("min", "median", "p95")},
+            }
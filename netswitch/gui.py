@@ -0,0 +1,649 @@
+import customtkinter as ctk
+import tkinter as tk
+from tkinter import messagebox, filedialog
+import html
+import os
+
+from . import __version__
+from .sanitize import (
+    sanitize_string, sanitize_network_adapter_name, validate_dns_server_name, is_valid_ip, is_valid_ipv6
+)
+from .adapters import ALL_ADAPTERS, AdapterInventory
+from .benchmark import find_fastest_dns
+from .catalog import RankingBoard, benchmark_catalog
+from .dnsconfig import apply_dns_batch, flush_dns, rollback_dns
+from .dualstack import provider_servers
+from .history import HistoryStore
+from .probecache import ProbeCache
+from .netwatch import NetworkChangeDetector
+from .metrics import write_metrics
+from .tasks import AsyncTaskExecutor
+
+# ----------------------
+# GUI
+# ----------------------
+
+# Reuse stored results this recent instead of probing again
+HISTORY_MAX_AGE = 300
+# How often the active network is checked for a change (s)
+NETWORK_POLL_INTERVAL = 15
+
+class NetSwitchApp:
+    def get_adapters(self):
+        """Get cached network adapter names without blocking the UI"""
+        return self.adapter_inventory.names()
+
+    def _poll_adapters(self):
+        """Refresh the adapter list in the background and update the combo box"""
+        try:
+            if self.adapter_inventory.version != self._adapters_version:
+                self._adapters_version = self.adapter_inventory.version
+                current = self.adapter_choice.get()
+                adapters = self.get_adapters()
+                self.adapter_choice.configure(values=adapters)
+                self.adapter_choice.set(current if current in adapters else adapters[0])
+            if self.adapter_inventory.is_stale():
+                self.adapter_inventory.refresh_async(self.executor.submit)
+        except Exception:
+            pass
+        finally:
+            self.root.after(500, self._poll_adapters)
+
+    def __init__(self, root):
+            self.root = root
+            
+            # Sanitize and validate window title
+            title = sanitize_string(f"NetSwitch v{__version__}", 50)
+            self.root.title(title)
+            self.root.geometry("620x590")
+            self.root.resizable(False, False)
+            self.root.configure(fg_color="#f0f0f0")  # Light grey background
+            ctk.set_appearance_mode("light")
+            ctk.set_default_color_theme("blue")
+
+            # Initialize sanitized theme and status variables
+            self.theme = "Light"
+            self.show_status = True
+
+            # Slow commands run on the async core, results come back on the Tk thread
+            self.executor = AsyncTaskExecutor(self.root)
+            self.last_dns_snapshot = None
+            self.catalog_path = None
+            self.catalog_board = None
+            self.history = None
+            self.warm_cache = False
+            self.network_watch = NetworkChangeDetector(interval=NETWORK_POLL_INTERVAL, on_change=self._on_network_change)
+            # The cache follows the watcher instead of polling the network itself
+            self.probe_cache = ProbeCache(context_fn=lambda: self.network_watch.fingerprint)
+
+            # Top menu bar
+            menu_bar = ctk.CTkFrame(self.root, height=36)
+            menu_bar.pack(fill='x', side='top')
+            menu_label = ctk.CTkLabel(
+                menu_bar, text="NetSwitch", font=("Segoe UI", 16, "bold"),
+                text_color=("#9370db", "#dda0dd")
+            )
+            menu_label.pack(side='left', padx=12, pady=4)
+            exit_btn = ctk.CTkButton(menu_bar, text="Exit", width=60, command=self.safe_exit,
+                                   fg_color=("#dc3545", "#c82333"), hover_color=("#c82333", "#dc3545"))
+            exit_btn.pack(side='right', padx=12, pady=4)
+
+            # Logo/Icon (sanitized text)
+            logo_text = sanitize_string("🌐 NetSwitch", 30)
+            logo_label = ctk.CTkLabel(self.root, text=logo_text, font=("Segoe UI", 18, "bold"),
+                                    text_color=("#9370db", "#dda0dd"))
+            logo_label.pack(pady=(10, 0))
+
+            # Main Frame
+            main_frame = ctk.CTkFrame(self.root)
+            main_frame.pack(fill='both', expand=True, padx=10, pady=5)
+
+            # Section: Network Adapter
+            adapter_label = ctk.CTkLabel(main_frame, text="Select Network Adapter", font=("Segoe UI", 10, "bold"))
+            adapter_label.grid(row=0, column=0, sticky='w', pady=(0, 2))
+            self.adapter_inventory = AdapterInventory()
+            self._adapters_version = self.adapter_inventory.version
+            adapters = self.get_adapters()
+            self.adapter_choice = ctk.CTkComboBox(main_frame, values=adapters, width=260)
+            self.adapter_choice.set(adapters[0])
+            self.adapter_choice.grid(row=1, column=0, sticky='w', pady=(0, 10))
+
+            # Section: Preset DNS
+            preset_label = ctk.CTkLabel(main_frame, text="Choose a DNS Server", font=("Segoe UI", 10, "bold"))
+            preset_label.grid(row=2, column=0, sticky='w', pady=(0, 2))
+            
+            # Validate DNS choices
+            dns_options = [
+                "AU - Cloudflare (1.1.1.1, 1.0.0.1)",
+                "Google (8.8.8.8, 8.8.4.4)",
+                "Quad9 (9.9.9.9, 149.112.112.112)",
+                "Custom..."
+            ]
+            self.dns_choice = ctk.CTkComboBox(main_frame, values=dns_options, width=260)
+            self.dns_choice.set(dns_options[0])
+            self.dns_choice.grid(row=3, column=0, sticky='w', pady=(0, 10))
+            self.dns_choice.bind("<<ComboboxSelected>>", self.on_dns_choice)
+
+            # Presets have their own IPv6 switch, visible while a preset is selected
+            self.preset_ipv6 = tk.BooleanVar()
+            self.preset_ipv6_check = ctk.CTkCheckBox(main_frame, text="Include IPv6 servers", variable=self.preset_ipv6)
+            self.preset_ipv6_check.grid(row=3, column=1, sticky='w', padx=(10, 0), pady=(0, 10))
+
+            # Section: Custom DNS
+            self.custom_frame = ctk.CTkFrame(main_frame)
+            self.custom_frame.grid(row=4, column=0, sticky='ew', pady=(0, 10))
+            self.custom_frame.grid_remove()
+            ctk.CTkLabel(self.custom_frame, text="Primary DNS:").grid(row=0, column=0, sticky='w')
+            self.custom_dns1 = ctk.CTkEntry(self.custom_frame, width=120, placeholder_text="e.g. 8.8.8.8")
+            self.custom_dns1.grid(row=0, column=1, padx=(5, 0))
+            ctk.CTkLabel(self.custom_frame, text="Secondary DNS:").grid(row=1, column=0, sticky='w')
+            self.custom_dns2 = ctk.CTkEntry(self.custom_frame, width=120, placeholder_text="e.g. 8.8.4.4")
+            self.custom_dns2.grid(row=1, column=1, padx=(5, 0))
+
+            # IPv6 Option
+            self.use_ipv6 = tk.BooleanVar()
+            self.ipv6_check = ctk.CTkCheckBox(self.custom_frame, text="Use IPv6 DNS", variable=self.use_ipv6, command=self.toggle_ipv6)
+            self.ipv6_check.grid(row=2, column=0, sticky='w', pady=(5, 0))
+            self.custom_dns1_v6 = ctk.CTkEntry(self.custom_frame, width=120, placeholder_text="e.g. 2001:4860:4860::8888")
+            self.custom_dns2_v6 = ctk.CTkEntry(self.custom_frame, width=120, placeholder_text="e.g. 2001:4860:4860::8844")
+
+            # Section: Buttons (with icons and color)
+            btn_frame = ctk.CTkFrame(main_frame)
+            btn_frame.grid(row=5, column=0, pady=(5, 10), sticky='ew')
+            self.apply_btn = ctk.CTkButton(
+                btn_frame, text="💾 Apply DNS", command=self.apply_dns_action,
+                fg_color=("#1976d2", "#1565c0"), hover_color=("#1565c0", "#1976d2")
+            )
+            self.apply_btn.grid(row=0, column=0, padx=5)
+            self.fastest_btn = ctk.CTkButton(
+                btn_frame, text="⚡ Fastest DNS", command=self.fastest_dns_action,
+                fg_color=("#43a047", "#2e7d32"), hover_color=("#2e7d32", "#43a047")
+            )
+            self.fastest_btn.grid(row=0, column=1, padx=5)
+            self.flush_btn = ctk.CTkButton(
+                btn_frame, text="🧹 Flush DNS", command=self.flush_dns_action,
+                fg_color=("#ac841f", "#f9a825"), hover_color=("#ac841f", "#ac841f")
+            )
+            self.flush_btn.grid(row=0, column=2, padx=5)
+            self.options_btn = ctk.CTkButton(
+                btn_frame, text="⚙️ Options", command=self.show_options,
+                fg_color=("#607d8b", "#37474f"), hover_color=("#37474f", "#607d8b")
+            )
+            self.options_btn.grid(row=0, column=3, padx=5)
+            self.undo_btn = ctk.CTkButton(
+                btn_frame, text="↩️ Undo Apply", command=self.rollback_dns_action, state='disabled',
+                fg_color=("#8e24aa", "#6a1b9a"), hover_color=("#6a1b9a", "#8e24aa")
+            )
+            self.undo_btn.grid(row=1, column=0, padx=5, pady=(5, 0))
+
+            # Section: Status Bar
+            self.status = tk.StringVar()
+            self.status.set("Ready.")
+            self.status_bar = ctk.CTkLabel(self.root, textvariable=self.status, height=28, anchor='w', font=("Segoe UI", 10))
+            self.status_bar.pack(side='bottom', fill='x')
+
+            # Fill the adapter list without blocking startup
+            self.adapter_inventory.refresh_async(self.executor.submit)
+            self.root.after(500, self._poll_adapters)
+            self.network_watch.start()
+    
+    def safe_exit(self):
+        """Safely exit the application"""
+        try:
+            self.network_watch.stop()
+            self.executor.shutdown()
+            if self.history is not None:
+                self.history.close()
+            self.root.destroy()
+        except Exception:
+            import sys
+            sys.exit(0)
+    def toggle_ipv6(self):
+        if self.use_ipv6.get():
+            ctk.CTkLabel(self.custom_frame, text="Primary IPv6 DNS:").grid(row=3, column=0, sticky='w')
+            self.custom_dns1_v6.grid(row=3, column=1, padx=(5, 0))
+            ctk.CTkLabel(self.custom_frame, text="Secondary IPv6 DNS:").grid(row=4, column=0, sticky='w')
+            self.custom_dns2_v6.grid(row=4, column=1, padx=(5, 0))
+        else:
+            self.custom_dns1_v6.grid_remove()
+            self.custom_dns2_v6.grid_remove()
+
+
+    def show_options(self):
+        """Options dialog with enhanced input validation"""
+        try:
+            options_win = ctk.CTkToplevel(self.root)
+            options_win.title("Options")
+            options_win.geometry("340x450")
+            options_win.resizable(False, False)
+            options_win.grab_set()
+
+            # Theme selection with validation
+            ctk.CTkLabel(options_win, text="Theme:", font=("Segoe UI", 10, "bold")).pack(pady=(15, 5), anchor='w', padx=20)
+            
+            # Validate current theme
+            current_theme = getattr(self, 'theme', 'Light')
+            if current_theme not in ['Light', 'Dark']:
+                current_theme = 'Light'
+                
+            theme_var = tk.StringVar(value=current_theme)
+            theme_frame = ctk.CTkFrame(options_win, fg_color="transparent")
+            theme_frame.pack(anchor='w', padx=20)
+            ctk.CTkRadioButton(theme_frame, text="Light", variable=theme_var, value="Light").pack(side='left', padx=5)
+            ctk.CTkRadioButton(theme_frame, text="Dark", variable=theme_var, value="Dark").pack(side='left', padx=5)
+
+            # Status bar toggle with validation
+            current_status = getattr(self, 'show_status', True)
+            if not isinstance(current_status, bool):
+                current_status = True
+                
+            status_var = tk.BooleanVar(value=current_status)
+            status_frame = ctk.CTkFrame(options_win, fg_color="transparent")
+            status_frame.pack(anchor='w', padx=20, pady=(15, 0))
+            ctk.CTkCheckBox(status_frame, text="Show Status Bar", variable=status_var).pack(side='left')
+
+            # Pre-resolve popular domains so the first lookups after a flush or switch are fast
+            warm_var = tk.BooleanVar(value=bool(self.warm_cache))
+            warm_frame = ctk.CTkFrame(options_win, fg_color="transparent")
+            warm_frame.pack(anchor='w', padx=20, pady=(10, 0))
+            ctk.CTkCheckBox(warm_frame, text="Warm DNS cache after flush/apply", variable=warm_var).pack(side='left')
+
+            # Resolver catalog used by "Fastest DNS" instead of the built-in list
+            ctk.CTkLabel(options_win, text="Resolver Catalog:", font=("Segoe UI", 10, "bold")).pack(pady=(15, 5), anchor='w', padx=20)
+            catalog_var = tk.StringVar(value=self.catalog_path or "")
+            catalog_frame = ctk.CTkFrame(options_win, fg_color="transparent")
+            catalog_frame.pack(anchor='w', padx=20)
+            catalog_label = ctk.CTkLabel(
+                catalog_frame, width=160, anchor='w',
+                text=os.path.basename(catalog_var.get()) or "Built-in list"
+            )
+            catalog_label.pack(side='left')
+
+            def choose_catalog():
+                path = filedialog.askopenfilename(
+                    parent=options_win, title="Load Resolver Catalog",
+                    filetypes=[("Resolver catalogs", "*.csv *.json *.jsonl"), ("All files", "*.*")]
+                )
+                if path:
+                    catalog_var.set(path)
+                    catalog_label.configure(text=sanitize_string(os.path.basename(path), 40))
+
+            def clear_catalog():
+                catalog_var.set("")
+                catalog_label.configure(text="Built-in list")
+
+            ctk.CTkButton(catalog_frame, text="Load...", width=60, command=choose_catalog).pack(side='left', padx=5)
+            ctk.CTkButton(catalog_frame, text="Clear", width=50, command=clear_catalog).pack(side='left')
+
+            # Timings of netsh, ping and DNS probes recorded in this session
+            def export_metrics():
+                path = filedialog.asksaveasfilename(
+                    parent=options_win, title="Export Metrics", defaultextension=".prom",
+                    filetypes=[("Prometheus text", "*.prom *.txt"), ("JSON", "*.json")]
+                )
+                if not path:
+                    return
+                try:
+                    write_metrics(path)
+                    self.set_status(f"Metrics written to {sanitize_string(os.path.basename(path), 40)}")
+                except OSError as e:
+                    messagebox.showerror("Error", f"Failed to export metrics: {html.escape(sanitize_string(str(e), 100))}")
+
+            ctk.CTkLabel(options_win, text="Diagnostics:", font=("Segoe UI", 10, "bold")).pack(pady=(15, 5), anchor='w', padx=20)
+            ctk.CTkButton(options_win, text="Export Metrics...", width=120, command=export_metrics).pack(anchor='w', padx=20)
+
+            def save_options():
+                try:
+                    # Validate and sanitize theme selection
+                    theme = theme_var.get()
+                    if theme not in ['Light', 'Dark']:
+                        theme = 'Light'
+                    
+                    # Validate status bar setting
+                    show_status = bool(status_var.get())
+                    
+                    # Apply validated settings
+                    self.theme = theme
+                    self.show_status = show_status
+                    self.warm_cache = bool(warm_var.get())
+                    self.catalog_path = catalog_var.get() if os.path.isfile(catalog_var.get()) else None
+                    self.apply_theme(self.theme)
+                    self.toggle_status_bar(self.show_status)
+                    options_win.destroy()
+                    
+                except Exception as e:
+                    error_msg = sanitize_string(str(e), 100)
+                    messagebox.showerror("Error", f"Failed to save options: {html.escape(error_msg)}")
+
+            ctk.CTkButton(options_win, text="Save", command=save_options).pack(pady=20)
+            
+        except Exception as e:
+            error_msg = sanitize_string(str(e), 100)
+            messagebox.showerror("Error", f"Failed to open options: {html.escape(error_msg)}")
+
+    def toggle_status_bar(self, show):
+        """Toggle status bar with validation"""
+        try:
+            # Validate input
+            if not isinstance(show, bool):
+                show = True
+                
+            # Show or hide the status bar
+            if show:
+                self.status_bar.pack(side='bottom', fill='x')
+            else:
+                self.status_bar.pack_forget()
+                
+        except Exception:
+            # Ensure status bar is shown on error
+            try:
+                self.status_bar.pack(side='bottom', fill='x')
+            except:
+                pass
+
+    def apply_theme(self, theme):
+        """Apply theme with validation"""
+        try:
+            # Sanitize and validate theme
+            theme = sanitize_string(str(theme), 20)
+            if theme.lower() not in ['light', 'dark']:
+                theme = 'light'
+            
+            # Use customtkinter's appearance mode for light/dark
+            ctk.set_appearance_mode(theme.lower())
+            
+        except Exception:
+            # Fallback to light theme if error
+            ctk.set_appearance_mode("light")
+
+    def on_dns_choice(self, event=None):
+        """Handle DNS choice selection with validation"""
+        try:
+            choice = self.dns_choice.get()
+            choice = sanitize_string(choice, 100)
+            
+            # Validate the choice is from our allowed list
+            if validate_dns_server_name(choice):
+                if choice == "Custom...":
+                    self.custom_frame.grid()
+                    self.preset_ipv6_check.grid_remove()
+                else:
+                    self.custom_frame.grid_remove()
+                    self.preset_ipv6_check.grid()
+            else:
+                # Reset to safe default if invalid choice
+                self.dns_choice.set("AU - Cloudflare (1.1.1.1, 1.0.0.1)")
+                self.custom_frame.grid_remove()
+                self.preset_ipv6_check.grid()
+        except Exception:
+            # Fallback to safe state
+            self.dns_choice.set("AU - Cloudflare (1.1.1.1, 1.0.0.1)")
+            self.custom_frame.grid_remove()
+            self.preset_ipv6_check.grid()
+
+    def set_status(self, msg):
+        """Set status message with sanitization"""
+        try:
+            sanitized_msg = sanitize_string(str(msg), 200)
+            sanitized_msg = html.escape(sanitized_msg)
+            self.status.set(sanitized_msg)
+            self.root.update_idletasks()
+        except Exception:
+            self.status.set("Ready.")
+
+    def get_custom_dns_input(self):
+        """Get and validate custom DNS input as a server list (IPv4 and IPv6 pairs may be combined)"""
+        try:
+            dns1 = sanitize_string(self.custom_dns1.get().strip(), 45)
+            dns2 = sanitize_string(self.custom_dns2.get().strip(), 45)
+            servers = []
+            
+            # Validate both addresses
+            if self.use_ipv6.get():
+                dns1_v6 = sanitize_string(self.custom_dns1_v6.get().strip(), 45)
+                dns2_v6 = sanitize_string(self.custom_dns2_v6.get().strip(), 45)
+                
+                if dns1_v6 and dns2_v6:
+                    if is_valid_ipv6(dns1_v6) and is_valid_ipv6(dns2_v6):
+                        servers = [dns1_v6, dns2_v6]
+                    else:
+                        messagebox.showerror("Invalid Input", "Please enter valid IPv6 addresses.")
+                        return None
+                # IPv6 alone is fine; IPv4 entries, if any, are applied alongside in the same batch
+                if servers and not (dns1 or dns2):
+                    return servers
+            
+            if is_valid_ip(dns1) and is_valid_ip(dns2):
+                return [dns1, dns2] + servers
+            else:
+                messagebox.showerror("Invalid Input", "Please enter valid IP addresses.")
+                return None
+                
+        except Exception:
+            messagebox.showerror("Error", "Invalid DNS input format.")
+            return None
+
+    def apply_dns_action(self):
+        """Apply DNS on a worker thread with enhanced validation and sanitization"""
+        self.set_status("Applying DNS...")
+        self.apply_btn.configure(state='disabled')
+        try:
+            request = self._get_apply_request()
+            if request is None:
+                self.apply_btn.configure(state='normal')
+                return
+            adapters, servers = request
+            self.executor.submit(
+                apply_dns_batch, adapters, servers, runner=self.executor.runner, warm=self.warm_cache,
+                on_done=self._on_apply_done, on_error=self._on_apply_error, name="apply", key="apply"
+            )
+        except Exception as e:
+            self._on_apply_error(e)
+
+    def _get_apply_request(self):
+        """Read the adapter and DNS selection on the UI thread"""
+        choice = sanitize_string(self.dns_choice.get(), 100)
+        adapter = sanitize_network_adapter_name(self.adapter_choice.get())
+        
+        # Validate DNS choice
+        if not validate_dns_server_name(choice):
+            self.set_status("Invalid DNS server selection.")
+            return None
+        
+        # Get DNS addresses based on choice
+        provider = next((name for name in ("Cloudflare", "Google", "Quad9") if name in choice), None)
+        if provider:
+            # With the preset IPv6 box ticked, both families are applied in one batch
+            families = ("ipv4", "ipv6") if self.preset_ipv6.get() else ("ipv4",)
+            servers = provider_servers(provider, families)
+        else:  # Custom
+            servers = self.get_custom_dns_input()
+            if not servers:
+                self.set_status("Ready.")
+                return None
+        
+        # Apply to every connected adapter at once
+        if adapter == ALL_ADAPTERS:
+            adapters = self.adapter_inventory.connected_names()
+            if not adapters:
+                messagebox.showerror("Error", "No connected network adapters found.")
+                self.set_status("No connected network adapters found.")
+                return None
+        else:
+            adapters = [adapter]
+        return adapters, servers
+
+    def _on_apply_done(self, result):
+        """Report an apply result on the UI thread"""
+        self.apply_btn.configure(state='normal')
+        servers = ", ".join(result.get("servers", []))
+        if result["ok"]:
+            changed = any(r["changed"] for r in result["adapters"])
+            if changed and result["snapshot"]:
+                # Undo restores the config from before this apply
+                self.last_dns_snapshot = result["snapshot"]
+                self.undo_btn.configure(state='normal')
+            message = f"DNS applied: {servers}" if changed else f"DNS already set: {servers}"
+            message += self._warmup_summary(result)
+            messagebox.showinfo("Success", html.escape(message))
+            self.set_status(message)
+        else:
+            failed = [r for r in result["adapters"] if not r["ok"]]
+            details = "; ".join(f"{r['adapter']}: {r['error']}" for r in failed) or result["error"]
+            error_msg = sanitize_string(str(details), 200)
+            messagebox.showerror("Error", f"Failed to apply DNS: {html.escape(error_msg)}")
+            self.set_status("Failed to apply DNS.")
+
+    def _on_apply_error(self, error):
+        self.apply_btn.configure(state='normal')
+        error_msg = sanitize_string(str(error), 100)
+        self.set_status(f"Error: {error_msg}")
+
+    def rollback_dns_action(self):
+        """Restore the DNS config from before the last apply in one batch"""
+        if not self.last_dns_snapshot:
+            return
+        self.set_status("Restoring previous DNS...")
+        self.undo_btn.configure(state='disabled')
+        self.executor.submit(
+            rollback_dns, self.last_dns_snapshot, runner=self.executor.runner,
+            on_done=self._on_rollback_done, on_error=self._on_rollback_error, name="rollback", key="rollback"
+        )
+
+    def _on_rollback_done(self, result):
+        if result["ok"]:
+            self.last_dns_snapshot = None
+            messagebox.showinfo("Success", "Previous DNS settings restored.")
+            self.set_status("Previous DNS settings restored.")
+        else:
+            self.undo_btn.configure(state='normal')
+            messagebox.showerror("Error", f"Failed to restore DNS: {html.escape(sanitize_string(str(result['error']), 200))}")
+            self.set_status("Failed to restore previous DNS.")
+
+    def _on_rollback_error(self, error):
+        self.undo_btn.configure(state='normal')
+        self.set_status(f"Error restoring DNS: {sanitize_string(str(error), 100)}")
+
+    def flush_dns_action(self):
+        """Flush DNS cache on a worker thread with enhanced security"""
+        self.set_status("Flushing DNS cache...")
+        self.flush_btn.configure(state='disabled')
+        self.executor.submit(
+            flush_dns, runner=self.executor.runner, warm=self.warm_cache,
+            on_done=self._on_flush_done, on_error=self._on_flush_error, name="flush", key="flush"
+        )
+
+    def _on_flush_done(self, result):
+        self.flush_btn.configure(state='normal')
+        if result["ok"]:
+            messagebox.showinfo("Success", "DNS cache flushed successfully!")
+            self.set_status("DNS cache flushed successfully." + self._warmup_summary(result))
+        else:
+            messagebox.showerror("Error", f"Failed to flush DNS: {html.escape(result['error'])}")
+            self.set_status("Failed to flush DNS cache.")
+
+    @staticmethod
+    def _warmup_summary(result):
+        """Short status suffix for the warm-up that followed a flush or apply"""
+        warmup = result.get("warmup")
+        if not warmup:
+            return ""
+        return f" Warmed {warmup['hits']}/{warmup['queries']} lookups in {warmup['duration_ms'] / 1000:.1f}s."
+
+    def _on_flush_error(self, error):
+        self.flush_btn.configure(state='normal')
+        error_msg = sanitize_string(str(error), 100)
+        self.set_status(f"Error flushing DNS: {error_msg}")
+
+    def fastest_dns_action(self):
+        """Find fastest DNS on a worker thread with enhanced security"""
+        self.set_status("Testing fastest DNS...")
+        self.fastest_btn.configure(state='disabled')
+        if self.catalog_path:
+            # Large catalogs stream their results so the leaders show up early
+            self.catalog_board = RankingBoard(10)
+            self.executor.submit_stream(
+                benchmark_catalog, self.catalog_path,
+                on_item=self._on_catalog_row, on_done=self._on_catalog_done,
+                on_error=self._on_fastest_error, name="fastest", key="catalog"
+            )
+            return
+        self.executor.submit(
+            find_fastest_dns, history=self._get_history(), cache=self.probe_cache,
+            max_age=self.network_watch.history_window(HISTORY_MAX_AGE),
+            on_done=self._on_fastest_done, on_error=self._on_fastest_error, name="fastest", key="benchmark"
+        )
+
+    def _on_network_change(self, event):
+        """Runs on the watcher thread: switch cache context and re-probe what the new network lacks"""
+        self.probe_cache.on_network_change(event)
+        self.adapter_inventory.refresh_async(self.executor.submit)
+        # A benchmark still running measured the old network; this one replaces it for its callers too.
+        # Stored history is from the old network as well, so the new one is always probed.
+        self.executor.submit(
+            find_fastest_dns, history=self.history, max_age=0, cache=self.probe_cache,
+            on_done=self._on_network_rebenchmarked, name="rebenchmark", key="benchmark", supersede=True
+        )
+
+    def _on_network_rebenchmarked(self, ranking):
+        if ranking and ranking[0]["received"]:
+            self.set_status(f"Network changed, fastest DNS now: {ranking[0]['server']} ({ranking[0]['median']} ms)")
+        else:
+            self.set_status("Network changed.")
+
+    def _get_history(self):
+        """Open the probe history on first use; the app works without it"""
+        if self.history is None:
+            try:
+                self.history = HistoryStore()
+            except Exception:
+                return None
+        return self.history
+
+    def _on_catalog_row(self, row):
+        self.catalog_board.add(row)
+        best = self.catalog_board.top()[0]
+        if best["received"]:
+            self.set_status(
+                f"Tested {self.catalog_board.count} resolvers, fastest so far: "
+                f"{best['server']} ({best['median']} ms)"
+            )
+        else:
+            self.set_status(f"Tested {self.catalog_board.count} resolvers...")
+
+    def _on_catalog_done(self, count):
+        self._on_fastest_done(self.catalog_board.top())
+
+    def _on_fastest_done(self, ranking):
+        self.fastest_btn.configure(state='normal')
+        if ranking and ranking[0]["received"]:
+            lines = []
+            for row in ranking:
+                if not row["received"]:
+                    lines.append(f"{html.escape(row['server'])}: unreachable")
+                    continue
+                lines.append(
+                    f"{html.escape(row['server'])}: median {row['median']} ms, "
+                    f"min {row['min']}, p95 {row['p95']}, jitter {row['jitter']}, "
+                    f"loss {row['loss']:.0%}"
+                )
+            best = ranking[0]
+            safe_dns = html.escape(best["server"])
+            safe_time = html.escape(str(best["median"]))
+            messagebox.showinfo("Fastest DNS", "\n".join(lines))
+            self.set_status(f"Fastest DNS: {safe_dns} ({safe_time} ms)")
+        else:
+            messagebox.showerror("Error", "No DNS servers reachable.")
+            self.set_status("No DNS servers reachable.")
+
+    def _on_fastest_error(self, error):
+        self.fastest_btn.configure(state='normal')
+        error_msg = sanitize_string(str(error), 100)
+        self.set_status(f"Error testing DNS: {error_msg}")
+
+def main():
+    """Launch the NetSwitch window"""
+    root = ctk.CTk()
+    app = NetSwitchApp(root)
+    root.mainloop()
+    return 0
@@ -0,0 +1,295 @@
+import os
+import sqlite3
+import threading
+import time
+
+from .sanitize import sanitize_string
+from .benchmark import _percentile, summarize_samples, rank_key
+
+# ----------------------
+# Probe History Store
+# ----------------------
+
+MINUTE = 60
+HOUR = 3600
+DAY = 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    server TEXT NOT NULL,
+    method TEXT NOT NULL,
+    rtt_ms REAL
+);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE INDEX IF NOT EXISTS samples_server_ts ON samples (server, ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    period INTEGER NOT NULL,
+    server TEXT NOT NULL,
+    method TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    lost INTEGER NOT NULL,
+    min REAL,
+    p50 REAL,
+    p95 REAL,
+    max REAL,
+    PRIMARY KEY (period, server, method, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS domains (
+    domain TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL,
+    last_seen REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+def default_history_path():
+    """Per-user location of the history database"""
+    if os.environ.get("APPDATA"):
+        return os.path.join(os.environ["APPDATA"], "NetSwitch", "history.db")
+    return os.path.join(os.path.expanduser("~"), ".netswitch", "history.db")
+
+def _bucket_row(period, server, method, bucket, values):
+    """Build one rollup row from the raw RTTs (None for lost) of a bucket"""
+    received = sorted(v for v in values if v is not None)
+    return (
+        period, server, method, bucket, len(values), len(values) - len(received),
+        received[0] if received else None,
+        _percentile(received, 50),
+        _percentile(received, 95),
+        received[-1] if received else None,
+    )
+
+class HistoryStore:
+    """SQLite store of raw probe samples with per-minute and per-hour rollups"""
+
+    def __init__(self, path=None, raw_retention=2 * DAY, minute_retention=30 * DAY,
+                 hour_retention=400 * DAY, clock=time.time):
+        self.path = path or default_history_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.raw_retention = raw_retention
+        self.retention = {MINUTE: minute_retention, HOUR: hour_retention}
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next_rollup = 0.0
+        self._next_compact = 0.0
+
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            if self.path != ":memory:":
+                self._db.execute("PRAGMA journal_mode = WAL")
+                self._db.execute("PRAGMA synchronous = NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Writing
+
+    def record(self, server, rtt_ms, method="dns", ts=None):
+        """Store one probe sample (rtt_ms None for a lost probe)"""
+        self.record_many([(server, rtt_ms)], method, ts)
+
+    def record_many(self, samples, method="dns", ts=None):
+        """Store (server, rtt_ms) samples taken at ts (default: now)"""
+        ts = self.clock() if ts is None else ts
+        rows = [(ts, sanitize_string(server, 45), method, rtt) for server, rtt in samples]
+        with self._lock:
+            self._db.executemany("INSERT INTO samples (ts, server, method, rtt_ms) VALUES (?, ?, ?, ?)", rows)
+            self._db.commit()
+        self.maintain()
+
+    def record_results(self, results, method="dns", ts=None):
+        """Store a benchmark's {server: [rtt or None, ...]} results"""
+        self.record_many([(server, rtt) for server, values in results.items() for rtt in values], method, ts)
+
+    def record_domains(self, counts, ts=None):
+        """Add {domain: lookups} counts, e.g. from the forwarder, to the hot-domain table"""
+        ts = self.clock() if ts is None else ts
+        rows = [(sanitize_string(domain, 254).lower(), int(hits), ts) for domain, hits in counts.items() if hits > 0]
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO domains (domain, hits, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT (domain) DO UPDATE SET hits = hits + excluded.hits, last_seen = excluded.last_seen",
+                rows)
+            self._db.commit()
+
+    # Rollups and compaction
+
+    def _rolled_until(self, period):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (f"rolled_{period}",)).fetchone()
+        if row:
+            return row[0]
+        first = self._db.execute("SELECT MIN(ts) FROM samples").fetchone()[0]
+        return (first // period) * period if first is not None else None
+
+    def rollup(self, now=None):
+        """Aggregate every complete minute and hour of raw samples; returns rows written"""
+        now = self.clock() if now is None else now
+        written = 0
+        with self._lock:
+            for period in (MINUTE, HOUR):
+                start = self._rolled_until(period)
+                end = (now // period) * period
+                if start is None or end <= start:
+                    continue
+
+                # Rows arrive grouped by resolver and in time order, so each bucket is contiguous
+                cursor = self._db.execute(
+                    "SELECT server, method, ts, rtt_ms FROM samples WHERE ts >= ? AND ts < ? "
+                    "ORDER BY server, method, ts", (start, end))
+                rows = []
+                key = None
+                values = []
+                for server, method, ts, rtt in cursor:
+                    bucket_key = (server, method, int(ts // period) * period)
+                    if bucket_key != key:
+                        if key is not None:
+                            rows.append(_bucket_row(period, *key, values))
+                        key, values = bucket_key, []
+                    values.append(rtt)
+                if key is not None:
+                    rows.append(_bucket_row(period, *key, values))
+
+                self._db.executemany("INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"rolled_{period}", end))
+                written += len(rows)
+            self._db.commit()
+        return written
+
+    def compact(self, now=None):
+        """Roll up, then drop raw samples and rollups past their retention"""
+        now = self.clock() if now is None else now
+        self.rollup(now)
+        with self._lock:
+            # Raw samples are only dropped once the hourly rollup has covered them
+            hour_done = self._rolled_until(HOUR) or 0
+            raw_cutoff = min(now - self.raw_retention, hour_done)
+            removed = self._db.execute("DELETE FROM samples WHERE ts < ?", (raw_cutoff,)).rowcount
+            for period, retention in self.retention.items():
+                removed += self._db.execute("DELETE FROM rollups WHERE period = ? AND bucket < ?",
+                                            (period, now - retention)).rowcount
+            removed += self._db.execute("DELETE FROM domains WHERE last_seen < ?",
+                                        (now - self.retention[MINUTE],)).rowcount
+            self._db.commit()
+            self._db.execute("PRAGMA incremental_vacuum")
+        return removed
+
+    def maintain(self, now=None):
+        """Roll up once a minute and compact once an hour; cheap to call after every write"""
+        now = self.clock() if now is None else now
+        if now >= self._next_compact:
+            self._next_compact = now + HOUR
+            self._next_rollup = now + MINUTE
+            self.compact(now)
+        elif now >= self._next_rollup:
+            self._next_rollup = now + MINUTE
+            self.rollup(now)
+
+    # Queries
+
+    def trend(self, server, since=None, until=None, period=HOUR, method="dns"):
+        """Per-bucket latency and loss for one resolver, oldest first"""
+        now = self.clock()
+        since = now - DAY if since is None else since
+        until = now if until is None else until
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT bucket, count, lost, min, p50, p95, max FROM rollups "
+                "WHERE period = ? AND server = ? AND method = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+                (period, sanitize_string(server, 45), method, since, until)).fetchall()
+
+        def _round(value):
+            return round(value, 2) if value is not None else None
+
+        return [{
+            "bucket": bucket,
+            "count": count,
+            "loss": round(lost / count, 3) if count else 1.0,
+            "min": _round(low),
+            "median": _round(p50),
+            "p95": _round(p95),
+            "max": _round(high),
+        } for bucket, count, lost, low, p50, p95, high in rows]
+
+    def ranking(self, servers=None, window=900, method="dns", min_samples=1):
+        """Rank resolvers from stored samples of the last window seconds"""
+        since = self.clock() - window
+        wanted = set(sanitize_string(s, 45) for s in servers) if servers is not None else None
+        if window <= self.raw_retention:
+            with self._lock:
+                cursor = self._db.execute(
+                    "SELECT server, rtt_ms FROM samples WHERE method = ? AND ts >= ? ORDER BY server, ts",
+                    (method, since))
+                by_server = {}
+                for server, rtt in cursor:
+                    if wanted is None or server in wanted:
+                        by_server.setdefault(server, []).append(rtt)
+            rows = [summarize_samples(s, v) for s, v in by_server.items() if len(v) >= min_samples]
+        else:
+            rows = self._ranking_from_rollups(wanted, since, method, min_samples)
+        return sorted(rows, key=rank_key)
+
+    def _ranking_from_rollups(self, wanted, since, method, min_samples):
+        """Approximate rows for long windows from hourly rollups (count-weighted percentiles)"""
+        with self._lock:
+            cursor = self._db.execute(
+                "SELECT server, count, lost, min, p50, p95 FROM rollups "
+                "WHERE period = ? AND method = ? AND bucket >= ?", (HOUR, method, since))
+            totals = {}
+            for server, count, lost, low, p50, p95 in cursor:
+                if wanted is not None and server not in wanted:
+                    continue
+                t = totals.setdefault(server, {"sent": 0, "lost": 0, "min": None, "p50": 0.0, "p95": 0.0})
+                t["sent"] += count
+                t["lost"] += lost
+                received = count - lost
+                if received:
+                    t["min"] = low if t["min"] is None else min(t["min"], low)
+                    t["p50"] += p50 * received
+                    t["p95"] += p95 * received
+
+        rows = []
+        for server, t in totals.items():
+            if t["sent"] < min_samples:
+                continue
+            received = t["sent"] - t["lost"]
+            rows.append({
+                "server": server,
+                "sent": t["sent"],
+                "received": received,
+                "loss": round(t["lost"] / t["sent"], 3),
+                "min": round(t["min"], 2) if received else None,
+                "median": round(t["p50"] / received, 2) if received else None,
+                "p95": round(t["p95"] / received, 2) if received else None,
+                "jitter": None,
+            })
+        return rows
+
+    def hot_domains(self, limit=50, window=7 * DAY):
+        """Most looked-up domains seen within the last window seconds, busiest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT domain FROM domains WHERE last_seen >= ? ORDER BY hits DESC, domain LIMIT ?",
+                (self.clock() - window, limit))
+            return [r[0] for r in rows]
+
+    def servers(self):
+        """Every resolver with stored history"""
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT server FROM rollups UNION SELECT DISTINCT server FROM samples")
+            return sorted(r[0] for r in rows)
@@ -0,0 +1,211 @@
+import cProfile
+import json
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ----------------------
+# Metrics and Profiling
+# ----------------------
+
+# Histogram buckets in seconds, from a fast UDP probe to a slow netsh call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _format_help(name, text):
+    # HELP text escapes backslashes and line feeds, but not quotes
+    return f"# HELP {name} " + text.replace("\\", "\\\\").replace("\n", "\\n")
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms with Prometheus text and JSON export"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, max_errors=50):
+        self.buckets = tuple(buckets)
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._errors = deque(maxlen=max_errors)
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, help=None, **labels):
+        """Add value to a counter"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            if help:
+                self._help.setdefault(name, help)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, help=None, **labels):
+        """Record one observation (seconds) in a histogram"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            if help:
+                self._help.setdefault(name, help)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def record_error(self, **details):
+        """Keep the full details of a failed operation (the last max_errors are kept)"""
+        with self._lock:
+            self._errors.append({"time": time.time(), **details})
+
+    def errors(self):
+        with self._lock:
+            return list(self._errors)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._errors.clear()
+
+    def snapshot(self):
+        """All metrics as JSON-serializable data"""
+        with self._lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(key), "value": value}
+                    for (name, key), value in sorted(self._counters.items())
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(key),
+                        "count": h["count"],
+                        "sum": round(h["sum"], 6),
+                        "buckets": {str(bound): n for bound, n in zip(self.buckets, h["buckets"])},
+                    }
+                    for (name, key), h in sorted(self._histograms.items())
+                ],
+                "errors": list(self._errors),
+            }
+
+    def to_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            seen = set()
+            for (name, key), value in sorted(self._counters.items()):
+                if name not in seen:
+                    seen.add(name)
+                    if name in self._help:
+                        lines.append(_format_help(name, self._help[name]))
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{_format_labels(key)} {value}")
+            for (name, key), h in sorted(self._histograms.items()):
+                if name not in seen:
+                    seen.add(name)
+                    if name in self._help:
+                        lines.append(_format_help(name, self._help[name]))
+                    lines.append(f"# TYPE {name} histogram")
+                for bound, n in zip(self.buckets, h["buckets"]):
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', repr(bound))])} {n}")
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {h['count']}")
+                lines.append(f"{name}_sum{_format_labels(key)} {h['sum']:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+def record_operation(kind, duration, outcome, registry=None, **labels):
+    """Count one operation by outcome and record its duration"""
+    registry = registry or REGISTRY
+    registry.inc(f"netswitch_{kind}_total", help=f"Completed {kind} operations by outcome", outcome=outcome, **labels)
+    registry.observe(f"netswitch_{kind}_seconds", duration, help=f"Duration of {kind} operations", **labels)
+
+@contextmanager
+def timed(kind, registry=None, **labels):
+    """Time a block; the caller may set op["outcome"], exceptions count as error or timeout"""
+    op = {"outcome": "ok"}
+    start = time.perf_counter()
+    try:
+        yield op
+    except subprocess.TimeoutExpired:
+        op["outcome"] = "timeout"
+        raise
+    except Exception:
+        op["outcome"] = "error"
+        raise
+    finally:
+        record_operation(kind, time.perf_counter() - start, op["outcome"], registry, **labels)
+
+def write_metrics(path, registry=None):
+    """Write metrics to path: JSON for a .json file, Prometheus text otherwise"""
+    registry = registry or REGISTRY
+    if os.path.splitext(path)[1].lower() == ".json":
+        content = json.dumps(registry.snapshot(), indent=2)
+    else:
+        content = registry.to_prometheus()
+    with open(path, "w", encoding="utf-8") as metrics_file:
+        metrics_file.write(content)
+
+# ----------------------
+# Profiling Hooks
+# ----------------------
+
+_profile_dir = None
+_tracer = None
+# cProfile supports one active profiler at a time, concurrent spans are only timed
+_profile_lock = threading.Lock()
+
+def enable_profiling(directory):
+    """Profile every span with cProfile, writing one .prof file per span into directory"""
+    global _profile_dir
+    os.makedirs(directory, exist_ok=True)
+    _profile_dir = directory
+
+def disable_profiling():
+    global _profile_dir
+    _profile_dir = None
+
+def set_tracer(callback):
+    """Call callback(span_record) when each span ends (None to disable)"""
+    global _tracer
+    _tracer = callback
+
+@contextmanager
+def span(name, registry=None, **attributes):
+    """Time a user-level action and optionally profile or trace it"""
+    profiler = None
+    if _profile_dir is not None and _profile_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    started = time.time()
+    op = {"outcome": "ok"}
+    try:
+        with timed("span", registry, span=name) as op:
+            yield op
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            try:
+                profiler.dump_stats(os.path.join(_profile_dir, f"{name}-{int(started * 1000)}.prof"))
+            except (OSError, TypeError):
+                pass
+            finally:
+                _profile_lock.release()
+        if _tracer is not None:
+            try:
+                _tracer({"span": name, "start": started, "duration": time.time() - started,
+                         "outcome": op["outcome"], **attributes})
+            except Exception:
+                pass
@@ -0,0 +1,198 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .sanitize import sanitize_string, is_valid_ip, is_valid_ipv6
+from .benchmark import test_dns
+from .dnsconfig import apply_dns_batch
+
+# ----------------------
+# Resolver Health Monitor
+# ----------------------
+
+class ResolverHealth:
+    """EWMA latency and loss for one resolver"""
+
+    def __init__(self, server):
+        self.server = server
+        self.ewma_ms = None
+        self.ewma_loss = 0.0
+        self.probes = 0
+        self.next_probe = 0.0
+
+    def update(self, rtt_ms, alpha):
+        """Fold one probe result (None when lost) into the averages"""
+        self.probes += 1
+        lost = rtt_ms is None
+        self.ewma_loss = alpha * (1.0 if lost else 0.0) + (1 - alpha) * self.ewma_loss
+        if not lost:
+            self.ewma_ms = rtt_ms if self.ewma_ms is None else alpha * rtt_ms + (1 - alpha) * self.ewma_ms
+
+    def score(self, loss_penalty_ms):
+        """Lower is better; resolvers that never answered score infinity"""
+        if self.ewma_ms is None:
+            return float("inf")
+        return self.ewma_ms + loss_penalty_ms * self.ewma_loss
+
+    def as_dict(self, loss_penalty_ms):
+        score = self.score(loss_penalty_ms)
+        return {
+            "server": self.server,
+            "ewma_ms": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+            "ewma_loss": round(self.ewma_loss, 3),
+            "score": round(score, 2) if score != float("inf") else None,
+            "probes": self.probes,
+        }
+
+class ResolverMonitor:
+    """Probe resolvers on a schedule and fail over when the active one stays worse"""
+
+    def __init__(self, active, candidates, adapters=None, apply_fn=None, probe_fn=None,
+                 interval=60.0, fast_interval=10.0, margin_ms=20.0, window=120.0, cooldown=900.0,
+                 alpha=0.3, loss_penalty_ms=500.0, unhealthy_ms=250.0, unhealthy_loss=0.2,
+                 on_event=None, clock=time.monotonic):
+        servers = [sanitize_string(s, 45) for s in [active] + list(candidates)]
+        servers = [s for s in dict.fromkeys(servers) if is_valid_ip(s) or is_valid_ipv6(s)]
+        if not servers or servers[0] != sanitize_string(active, 45):
+            raise ValueError("A valid active resolver is required")
+
+        self.active = servers[0]
+        self.health = {server: ResolverHealth(server) for server in servers}
+        self.adapters = adapters or ["Wi-Fi"]
+        self.apply_fn = apply_fn or self._apply
+        self.probe_fn = probe_fn or test_dns
+        self.interval = interval
+        self.fast_interval = fast_interval
+        self.margin_ms = margin_ms
+        self.window = window
+        self.cooldown = cooldown
+        self.alpha = alpha
+        self.loss_penalty_ms = loss_penalty_ms
+        self.unhealthy_ms = unhealthy_ms
+        self.unhealthy_loss = unhealthy_loss
+        self.on_event = on_event
+        self.clock = clock
+
+        self.events = []
+        self._worse_since = None
+        self._last_switch = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+
+    def _apply(self, servers):
+        """Default switch action: apply the servers to the monitored adapters"""
+        return apply_dns_batch(self.adapters, servers)["ok"]
+
+    def is_healthy(self):
+        """Whether the active resolver is within the latency and loss limits"""
+        health = self.health[self.active]
+        if health.ewma_ms is None:
+            return health.probes == 0
+        return health.ewma_ms <= self.unhealthy_ms and health.ewma_loss <= self.unhealthy_loss
+
+    def _emit(self, kind, **details):
+        event = {"event": kind, "time": time.time(), "active": self.active, **details}
+        self.events.append(event)
+        del self.events[:-100]
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception:
+                pass
+        return event
+
+    def tick(self):
+        """Probe every resolver that is due, then evaluate failover; returns the probed servers"""
+        now = self.clock()
+
+        # Probe faster only while the active resolver is unhealthy
+        period = self.interval if self.is_healthy() else self.fast_interval
+        due = [h for h in self.health.values() if h.next_probe <= now]
+        if due:
+            results = self._probe(due)
+            for health, rtt in zip(due, results):
+                health.update(rtt, self.alpha)
+                health.next_probe = now + period
+        self._evaluate(now)
+        return [h.server for h in due]
+
+    def _probe(self, due):
+        """Probe resolvers concurrently, on the loop's pool while running, else on a short-lived one"""
+        if self._pool is not None:
+            return list(self._pool.map(lambda h: self.probe_fn(h.server), due))
+        with ThreadPoolExecutor(max_workers=8, thread_name_prefix="netswitch-monitor") as pool:
+            return list(pool.map(lambda h: self.probe_fn(h.server), due))
+
+    def _evaluate(self, now):
+        """Switch to a better resolver once it has stayed better for the whole window"""
+        active_score = self.health[self.active].score(self.loss_penalty_ms)
+        alternatives = sorted(
+            (h for h in self.health.values() if h.server != self.active and h.ewma_ms is not None),
+            key=lambda h: h.score(self.loss_penalty_ms),
+        )
+        if not alternatives or alternatives[0].score(self.loss_penalty_ms) + self.margin_ms >= active_score:
+            self._worse_since = None
+            return None
+
+        if self._worse_since is None:
+            self._worse_since = now
+        if now - self._worse_since < self.window:
+            return None
+        if self._last_switch is not None and now - self._last_switch < self.cooldown:
+            return None
+
+        # The next best resolver of the same family (or the old active one) becomes secondary
+        best = alternatives[0]
+        fallbacks = [h.server for h in alternatives[1:]] + [self.active]
+        servers = [best.server] + [s for s in fallbacks if (":" in s) == (":" in best.server)][:1]
+
+        previous = self.active
+        try:
+            ok = self.apply_fn(servers)
+        except Exception:
+            ok = False
+        if not ok:
+            return self._emit("switch_failed", candidate=best.server)
+
+        self.active = best.server
+        self._last_switch = now
+        self._worse_since = None
+        self.health[self.active].next_probe = now
+        return self._emit("switched", previous=previous, servers=servers,
+                          previous_score=round(active_score, 2) if active_score != float("inf") else None,
+                          score=round(best.score(self.loss_penalty_ms), 2))
+
+    def snapshot(self):
+        """Current health table, best first"""
+        rows = [h.as_dict(self.loss_penalty_ms) for h in self.health.values()]
+        return sorted(rows, key=lambda r: (r["score"] is None, r["score"] or 0))
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                # Keep monitoring, but never silently
+                self._emit("tick_failed", error=str(e) or type(e).__name__)
+            next_due = min(h.next_probe for h in self.health.values())
+            self._stop.wait(max(0.5, min(next_due - self.clock(), self.interval)))
+
+    def start(self):
+        """Run the monitor loop on a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            # A fresh pool per run, so a stopped monitor can be started again
+            self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="netswitch-monitor")
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the monitor loop"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
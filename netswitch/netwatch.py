@@ -0,0 +1,200 @@
+import ipaddress
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+from .sanitize import sanitize_string
+from .adapters import get_network_context, network_fingerprint
+
+# ----------------------
+# Linux Network Context
+# ----------------------
+
+def _read_lines(root, *parts):
+    """Lines of a /proc or /sys file under root, or [] if it cannot be read"""
+    try:
+        with open(os.path.join(root, *parts), encoding="ascii", errors="replace") as source:
+            return source.read().splitlines()
+    except OSError:
+        return []
+
+def _hex_ipv4(value):
+    """Address from a little-endian hex field of /proc/net/route"""
+    return socket.inet_ntoa(struct.pack("<I", int(value, 16)))
+
+def _hex_ipv6(value):
+    return str(ipaddress.IPv6Address(bytes.fromhex(value)))
+
+def _interface_up(root, name):
+    """Whether /sys reports the interface as not down (up, or unknown for tunnels)"""
+    state = _read_lines(root, "sys", "class", "net", name, "operstate")
+    return not state or state[0].strip() != "down"
+
+def _local_ipv4_addresses(root):
+    """Host addresses from /proc/net/fib_trie (the "/32 host LOCAL" leaves)"""
+    addresses = set()
+    last = None
+    for line in _read_lines(root, "proc", "net", "fib_trie"):
+        line = line.strip()
+        if line.startswith("|--"):
+            last = line[3:].strip()
+        elif line.startswith("/32 host LOCAL") and last:
+            addresses.add(last)
+    return addresses
+
+def read_proc_network_context(root="/"):
+    """Subnets, gateways and addresses per routed interface from /proc and /sys, or None
+
+    Mirrors get_network_context: {interface: {address, subnet, gateway, address6,
+    gateway6}}, for every interface that is up and has a route. root lets tests
+    point at a directory of fixture files laid out like the real filesystem.
+    """
+    context = {}
+    rows = _read_lines(root, "proc", "net", "route")
+    if not rows:
+        return None
+    for line in rows[1:]:
+        fields = line.split()
+        if len(fields) < 8 or fields[0] == "lo":
+            continue
+        try:
+            name = sanitize_string(fields[0], 50)
+            destination, gateway, mask = _hex_ipv4(fields[1]), _hex_ipv4(fields[2]), _hex_ipv4(fields[7])
+        except (ValueError, struct.error):
+            continue
+        entry = context.setdefault(name, {})
+        if destination == "0.0.0.0" and mask == "0.0.0.0":
+            entry.setdefault("gateway", gateway)
+        elif gateway == "0.0.0.0" and "subnet" not in entry:
+            entry["subnet"] = str(ipaddress.IPv4Network(f"{destination}/{mask}", strict=False))
+
+    for line in _read_lines(root, "proc", "net", "ipv6_route"):
+        fields = line.split()
+        # Default route (::/0) through a next hop
+        if len(fields) < 10 or fields[9] == "lo" or fields[0] != "0" * 32 or fields[1] != "00":
+            continue
+        if fields[4] != "0" * 32:
+            try:
+                context.setdefault(sanitize_string(fields[9], 50), {}).setdefault("gateway6", _hex_ipv6(fields[4]))
+            except ValueError:
+                continue
+
+    for line in _read_lines(root, "proc", "net", "if_inet6"):
+        fields = line.split()
+        # Only global-scope (00) addresses identify the network
+        if len(fields) >= 6 and fields[3] == "00" and fields[5] in context:
+            try:
+                context[fields[5]].setdefault("address6", _hex_ipv6(fields[0]))
+            except ValueError:
+                continue
+
+    local = _local_ipv4_addresses(root)
+    for entry in context.values():
+        if "subnet" in entry:
+            network = ipaddress.IPv4Network(entry["subnet"])
+            matches = sorted(a for a in local if ipaddress.IPv4Address(a) in network)
+            if matches:
+                entry["address"] = matches[0]
+
+    return {name: entry for name, entry in context.items() if entry and _interface_up(root, name)}
+
+def current_network_context():
+    """Network context from the cheapest source on this platform"""
+    if sys.platform == "win32":
+        return get_network_context()
+    return read_proc_network_context()
+
+# ----------------------
+# Network Change Detection
+# ----------------------
+
+def diff_contexts(previous, current):
+    """Interfaces added, removed and changed between two network contexts"""
+    previous = previous or {}
+    current = current or {}
+    return {
+        "added": sorted(set(current) - set(previous)),
+        "removed": sorted(set(previous) - set(current)),
+        "changed": sorted(name for name in set(previous) & set(current) if previous[name] != current[name]),
+    }
+
+class NetworkChangeDetector:
+    """Polls the network context and reports when its fingerprint changes
+
+    on_change receives {"previous", "current", "added", "removed", "changed",
+    "context"} from the polling thread; callers that update a UI must hand it
+    over to their own thread.
+    """
+
+    def __init__(self, context_fn=None, interval=5.0, on_change=None, clock=time.time):
+        self.context_fn = context_fn or current_network_context
+        self.interval = interval
+        self.on_change = on_change
+        self.clock = clock
+        self.fingerprint = None
+        self.context = None
+        self.changed_at = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """Read the context once; return a change event, or None if nothing changed"""
+        try:
+            context = self.context_fn()
+        except Exception:
+            context = None
+        fingerprint = network_fingerprint(context)
+        if fingerprint == self.fingerprint:
+            return None
+
+        event = {"previous": self.fingerprint, "current": fingerprint, "context": context}
+        event.update(diff_contexts(self.context, context))
+        first = self.fingerprint is None
+        self.fingerprint = fingerprint
+        self.context = context
+        # The first reading is a baseline, not a change
+        if first:
+            return None
+        self.changed_at = self.clock()
+        return event
+
+    def history_window(self, max_age):
+        """Seconds of stored results that can describe the current network: max_age, cut at the last change
+
+        The probe history has no network context, so samples from before a
+        change were measured somewhere else.
+        """
+        if self.changed_at is None:
+            return max_age
+        return max(0, min(max_age, int(self.clock() - self.changed_at)))
+
+    def _run(self):
+        self.poll()
+        while not self._stop.wait(self.interval):
+            event = self.poll()
+            if event is not None and self.on_change is not None:
+                try:
+                    self.on_change(event)
+                except Exception:
+                    pass
+
+    def start(self):
+        """Start polling in the background; the first reading is the baseline"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="netswitch-netwatch")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
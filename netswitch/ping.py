@@ -0,0 +1,116 @@
+import re
+import subprocess
+import sys
+
+from .sanitize import sanitize_string, sanitize_command_args, is_valid_ip, is_valid_ipv6
+from .commands import run_command
+
+# ----------------------
+# ICMP Ping Backend
+# ----------------------
+
+# Reply lines: Windows "Reply from 1.1.1.1: bytes=32 time=12ms TTL=57" / "time<1ms",
+# Linux/macOS "64 bytes from 1.1.1.1: icmp_seq=1 ttl=57 time=12.3 ms"
+_WIN_REPLY_RE = re.compile(r"[=<]\s*(\d+(?:\.\d+)?)\s*ms\s+TTL=", re.IGNORECASE)
+_WIN_LOST_RE = re.compile(r"Request timed out|Destination host unreachable|General failure|transmit failed", re.IGNORECASE)
+_WIN_SUMMARY_RE = re.compile(r"Sent = (\d+), Received = (\d+), Lost = (\d+)", re.IGNORECASE)
+_UNIX_REPLY_RE = re.compile(r"icmp_seq=(\d+).*?time[=<]\s*(\d+(?:\.\d+)?)\s*ms", re.IGNORECASE)
+# macOS "Request timeout for icmp_seq 0", Linux (ping -O) "no answer yet for icmp_seq=1"
+_UNIX_LOST_RE = re.compile(r"(?:Request timeout|no answer yet) for icmp_seq[= ](\d+)", re.IGNORECASE)
+_UNIX_SUMMARY_RE = re.compile(r"(\d+) packets transmitted, (\d+) (?:packets )?received", re.IGNORECASE)
+
+def _ping_result(samples, sent=None):
+    """Build a ping result dict from an ordered sample vector; loss is counted from the vector alone"""
+    if sent is None:
+        sent = len(samples)
+    # Echo requests that produced no line at all were lost
+    samples = samples + [None] * (sent - len(samples))
+    received = len([s for s in samples if s is not None])
+    return {
+        "samples": samples,
+        "rtts": [s for s in samples if s is not None],
+        "sent": sent,
+        "received": received,
+        "loss": round(1 - received / sent, 3) if sent else 1.0,
+    }
+
+def parse_windows_ping_output(text):
+    """Parse Windows ping output into an ordered sample vector and loss summary
+
+    "Destination host unreachable" counts as lost even though the Windows
+    summary counts it as received, since it carries no round-trip time.
+    """
+    samples = []
+    sent = None
+    for line in text.splitlines():
+        reply = _WIN_REPLY_RE.search(line)
+        if reply:
+            # "time<1ms" only bounds the RTT, report it as half a millisecond
+            value = float(reply.group(1))
+            samples.append(value / 2 if reply.group(0).startswith("<") else value)
+            continue
+        if _WIN_LOST_RE.search(line):
+            samples.append(None)
+            continue
+        summary = _WIN_SUMMARY_RE.search(line)
+        if summary:
+            sent = int(summary.group(1))
+    return _ping_result(samples, sent)
+
+def parse_unix_ping_output(text, platform=None):
+    """Parse Linux/macOS ping output into an ordered sample vector and loss summary"""
+    replies = {}
+    seen = set()
+    sent = None
+    for line in text.splitlines():
+        reply = _UNIX_REPLY_RE.search(line)
+        if reply:
+            replies.setdefault(int(reply.group(1)), float(reply.group(2)))
+            seen.add(int(reply.group(1)))
+            continue
+        lost = _UNIX_LOST_RE.search(line)
+        if lost:
+            seen.add(int(lost.group(1)))
+            continue
+        summary = _UNIX_SUMMARY_RE.search(line)
+        if summary:
+            sent = int(summary.group(1))
+
+    # icmp_seq numbering starts at 1 on Linux and at 0 on macOS; a seq 0 line settles it either way
+    first = 0 if (platform or "").startswith("darwin") or 0 in seen else 1
+    if sent is None:
+        sent = max(seen) - first + 1 if seen else 0
+    samples = [replies.get(seq) for seq in range(first, first + sent)]
+    return _ping_result(samples, sent)
+
+def parse_ping_output(text, platform=None):
+    """Parse ping output for the given platform (defaults to the running one)"""
+    text = text if isinstance(text, str) else ""
+    platform = platform or sys.platform
+    if platform.startswith("win"):
+        return parse_windows_ping_output(text)
+    return parse_unix_ping_output(text, platform)
+
+def ping_samples(host, count=4, timeout=2.0):
+    """Run one ping process with several echo requests and return every RTT"""
+    host = sanitize_string(host, 45)
+    count = max(1, min(int(count), 50))
+    if not (is_valid_ip(host) or is_valid_ipv6(host)):
+        return None
+
+    if sys.platform.startswith("win"):
+        cmd = ["ping", "-n", str(count), "-w", str(int(timeout * 1000)), host]
+    else:
+        cmd = ["ping", "-c", str(count), "-i", "0.2", "-W", str(max(1, int(round(timeout)))), host]
+    cmd = sanitize_command_args(cmd)
+
+    try:
+        # ping exits non-zero when replies are lost, the summary is still valid
+        result = run_command(cmd, timeout=count * (timeout + 0.2) + 5)
+    except (subprocess.TimeoutExpired, OSError):
+        return _ping_result([None] * count)
+
+    parsed = parse_ping_output(result.stdout)
+    if not parsed["sent"]:
+        return _ping_result([None] * count)
+    return parsed
@@ -0,0 +1,381 @@
+import abc
+import os
+import re
+import signal
+import subprocess
+import sys
+import tempfile
+
+from .sanitize import sanitize_string, sanitize_network_adapter_name, is_valid_ip, is_valid_ipv6
+from .commands import run_command
+
+# ----------------------
+# Platform Backends
+# ----------------------
+
+class PlatformBackend(abc.ABC):
+    """OS-specific adapter listing, DNS apply and cache flush behind one interface
+
+    Results use the shapes of the netsh implementation: adapter records
+    {admin_state, state, type, name}, DNS config {adapter: {family: {source,
+    servers}}}, and apply results {ok, adapters, snapshot, error}.
+    """
+
+    name = "base"
+
+    @abc.abstractmethod
+    def list_adapters(self):
+        """Adapter records of the host"""
+
+    @abc.abstractmethod
+    def get_dns_servers(self, families=("ip", "ipv6")):
+        """Configured DNS per adapter and family"""
+
+    @abc.abstractmethod
+    def apply_dns_config(self, desired, current=None, verify=True):
+        """Apply a desired DNS config; returns an apply result"""
+
+    @abc.abstractmethod
+    def flush_dns(self):
+        """Flush the local resolver cache"""
+
+class WindowsBackend(PlatformBackend):
+    """netsh and ipconfig, run through an injectable command runner"""
+
+    name = "windows"
+
+    def __init__(self, runner=None):
+        self.runner = runner
+
+    def list_adapters(self):
+        from .adapters import list_adapters
+        return list_adapters(runner=self.runner)
+
+    def get_dns_servers(self, families=("ip", "ipv6")):
+        from .dnsconfig import get_dns_servers
+        return get_dns_servers(families, runner=self.runner)
+
+    def apply_dns_config(self, desired, current=None, verify=True):
+        from .dnsconfig import apply_dns_config
+        return apply_dns_config(desired, runner=self.runner, current=current, verify=verify)
+
+    def flush_dns(self):
+        from .dnsconfig import ipconfig_flush_dns
+        return ipconfig_flush_dns(runner=self.runner)
+
+# ----------------------
+# Linux Backend
+# ----------------------
+
+RESOLVED_DROPIN = "etc/systemd/resolved.conf.d/netswitch.conf"
+RESOLV_CONF = "etc/resolv.conf"
+RESOLV_CONF_BACKUP = "etc/resolv.conf.netswitch-backup"
+_HEADER = "# Written by NetSwitch"
+_IFF_UP = 0x1
+_ARPHRD_LOOPBACK = 772
+# systemd-resolved reloads its config on SIGHUP since v253; older versions exit on it
+_RESOLVED_SIGHUP_VERSION = 253
+_SYSTEMD_SHARED_RE = re.compile(r"^libsystemd-shared-(\d+)")
+
+def atomic_write(path, text, mode=0o644):
+    """Replace a file's contents atomically: write a sibling temp file, fsync, rename"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".netswitch-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as temp_file:
+            temp_file.write(text)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8", errors="replace") as source:
+            return source.read()
+    except OSError:
+        return None
+
+def parse_resolv_conf(text):
+    """Nameserver addresses of resolv.conf text, in order"""
+    servers = []
+    for line in (text or "").splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and fields[0] == "nameserver":
+            address = sanitize_string(fields[1], 45)
+            if is_valid_ip(address) or is_valid_ipv6(address):
+                servers.append(address)
+    return servers
+
+def _split_families(servers):
+    config = {}
+    for server in servers:
+        family = "ipv6" if is_valid_ipv6(server) and not is_valid_ip(server) else "ip"
+        config.setdefault(family, []).append(server)
+    return config
+
+class LinuxBackend(PlatformBackend):
+    """Reads /sys and /proc and writes resolver config files directly, spawning processes only as a fallback
+
+    DNS on Linux is system-wide, so every adapter reports (and receives) the
+    same servers. With systemd-resolved running, servers go into a resolved.conf
+    drop-in that routes all domains to them; otherwise resolv.conf is rewritten
+    with its other lines kept and the original saved for rollback. root points
+    at a temporary directory in tests; signal_fn replaces os.kill there. A
+    symlinked resolv.conf keeps its link: the file it points at is rewritten.
+    systemd-resolved older than v253 is restarted through the runner instead
+    of signalled.
+    """
+
+    name = "linux"
+
+    def __init__(self, root="/", mode=None, runner=None, signal_fn=None):
+        self.root = root
+        self.runner = runner or run_command
+        self.signal_fn = signal_fn or os.kill
+        self.mode = mode or ("resolved" if os.path.isdir(self._path("run/systemd/resolve")) else "resolvconf")
+
+    def _path(self, relative):
+        return os.path.join(self.root, relative)
+
+    def _resolve(self, path):
+        """Follow path's symlinks to the file they name, taking absolute link targets relative to root
+
+        Writes go to that file so links set up by NetworkManager or resolvconf stay in place.
+        """
+        for _ in range(8):
+            if not os.path.islink(path):
+                break
+            target = os.readlink(path)
+            if os.path.isabs(target):
+                path = self._path(target.lstrip("/"))
+            else:
+                path = os.path.normpath(os.path.join(os.path.dirname(path), target))
+        return path
+
+    def systemd_version(self):
+        """Installed systemd version from its shared library's file name, or None"""
+        for directory in ("usr/lib/systemd", "lib/systemd", "usr/lib64/systemd"):
+            try:
+                names = os.listdir(self._path(directory))
+            except OSError:
+                continue
+            for name in names:
+                match = _SYSTEMD_SHARED_RE.match(name)
+                if match:
+                    return int(match.group(1))
+        return None
+
+    # Adapters
+
+    def _sys_value(self, name, field):
+        value = _read(self._path(os.path.join("sys/class/net", name, field)))
+        return value.strip() if value else ""
+
+    def list_adapters(self):
+        """Interfaces from /sys/class/net as netsh-style records (loopback left out)"""
+        try:
+            names = sorted(os.listdir(self._path("sys/class/net")))
+        except OSError:
+            return None
+        records = []
+        for name in names:
+            if self._sys_value(name, "type") == str(_ARPHRD_LOOPBACK):
+                continue
+            try:
+                flags = int(self._sys_value(name, "flags") or "0", 16)
+            except ValueError:
+                flags = 0
+            operstate = self._sys_value(name, "operstate")
+            connected = operstate == "up" or (operstate == "unknown" and self._sys_value(name, "carrier") == "1")
+            wireless = os.path.isdir(self._path(os.path.join("sys/class/net", name, "wireless")))
+            records.append({
+                "admin_state": "Enabled" if flags & _IFF_UP else "Disabled",
+                "state": "Connected" if connected else "Disconnected",
+                "type": "Wireless" if wireless else "Dedicated",
+                "name": sanitize_network_adapter_name(name),
+            })
+        return records
+
+    # DNS configuration
+
+    def _configured(self):
+        """(source, servers) of the system-wide config: static when NetSwitch set it"""
+        if self.mode == "resolved":
+            text = _read(self._path(RESOLVED_DROPIN))
+            if text is not None:
+                servers = []
+                for line in text.splitlines():
+                    if line.startswith("DNS="):
+                        servers.extend(s for s in line[4:].split() if is_valid_ip(s) or is_valid_ipv6(s))
+                return "static", servers
+            return "dhcp", parse_resolv_conf(_read(self._path("run/systemd/resolve/resolv.conf")))
+        servers = parse_resolv_conf(_read(self._resolve(self._path(RESOLV_CONF))))
+        return ("static" if os.path.exists(self._path(RESOLV_CONF_BACKUP)) else "dhcp"), servers
+
+    def get_dns_servers(self, families=("ip", "ipv6")):
+        records = self.list_adapters()
+        if records is None:
+            return None
+        source, servers = self._configured()
+        by_family = _split_families(servers)
+        return {
+            record["name"]: {family: {"source": source, "servers": by_family.get(family, [])} for family in families}
+            for record in records
+        }
+
+    def _write(self, servers):
+        """Point the system at servers (None: restore the previous config); returns whether anything changed"""
+        if self.mode == "resolved":
+            path = self._path(RESOLVED_DROPIN)
+            if servers is None:
+                if not os.path.exists(path):
+                    return False
+                os.remove(path)
+                return True
+            # "~." routes every domain to these servers ahead of per-link ones
+            text = f"{_HEADER}\n[Resolve]\nDNS={' '.join(servers)}\nDomains=~.\n"
+        else:
+            path = self._resolve(self._path(RESOLV_CONF))
+            backup = self._path(RESOLV_CONF_BACKUP)
+            if servers is None:
+                original = _read(backup)
+                if original is None:
+                    return False
+                atomic_write(path, original)
+                os.remove(backup)
+                return True
+            original = _read(path) or ""
+            if not os.path.exists(backup):
+                atomic_write(backup, original)
+            kept = [line for line in original.splitlines()
+                    if line != _HEADER and line.split()[:1] != ["nameserver"]]
+            text = "\n".join([_HEADER] + [f"nameserver {s}" for s in servers] + kept) + "\n"
+
+        if _read(path) == text:
+            return False
+        atomic_write(path, text)
+        return True
+
+    def _reload_resolved(self):
+        """Make systemd-resolved re-read its drop-ins: SIGHUP where that reloads, a restart before
+
+        Returns None on success, else the error.
+        """
+        version = self.systemd_version()
+        if version is not None and version >= _RESOLVED_SIGHUP_VERSION:
+            try:
+                if not self._signal("systemd-resolved", signal.SIGHUP):
+                    return "systemd-resolved is not running."
+            except PermissionError:
+                return "Permission denied: run as root to reload systemd-resolved."
+            return None
+        try:
+            completed = self.runner(["systemctl", "try-restart", "systemd-resolved.service"], 30)
+        except (subprocess.TimeoutExpired, OSError) as e:
+            return sanitize_string(str(e), 200)
+        if completed.returncode != 0:
+            return sanitize_string(completed.stderr or "systemctl try-restart failed.", 200)
+        return None
+
+    def apply_dns_config(self, desired, current=None, verify=True):
+        """Write the servers of a desired config (or restore DHCP) and reload the resolver"""
+        result = {"ok": False, "adapters": [], "snapshot": {}, "error": None}
+        if not desired:
+            result["error"] = "No network adapters selected."
+            return result
+
+        current = self.get_dns_servers() if current is None else current
+        for adapter, families in desired.items():
+            entry = {f: dict(e, servers=list(e["servers"])) for f, e in (current or {}).get(adapter, {}).items()
+                     if f in families}
+            if entry:
+                result["snapshot"][adapter] = entry
+
+        servers = []
+        for families in desired.values():
+            for family in ("ip", "ipv6"):
+                entry = families.get(family)
+                if entry and entry["source"] == "static":
+                    servers.extend(s for s in entry["servers"] if s not in servers)
+
+        try:
+            changed = self._write(servers or None)
+        except OSError as e:
+            result["error"] = sanitize_string(str(e), 200)
+            return result
+        # Verify only re-reads the file just written, so a failed reload must fail the apply itself
+        error = self._reload_resolved() if changed and self.mode == "resolved" else None
+
+        ok = error is None
+        if ok and changed and verify:
+            source, applied = self._configured()
+            ok = (source == "static" and applied == servers) if servers else source == "dhcp"
+            if not ok:
+                error = "DNS servers were not applied."
+        for adapter in desired:
+            result["adapters"].append({"adapter": adapter, "ok": ok, "changed": changed, "error": error})
+        result["ok"] = ok
+        result["error"] = error
+        return result
+
+    # Cache flush
+
+    def _pids(self, program):
+        """PIDs of running processes named program, from /proc/<pid>/comm"""
+        try:
+            entries = os.listdir(self._path("proc"))
+        except OSError:
+            return []
+        pids = []
+        for entry in entries:
+            if entry.isdigit():
+                comm = _read(self._path(os.path.join("proc", entry, "comm")))
+                if comm and comm.strip() == program:
+                    pids.append(int(entry))
+        return pids
+
+    def _signal(self, program, signum):
+        """Signal every process named program; returns whether one was found and signalled"""
+        sent = False
+        for pid in self._pids(program):
+            try:
+                self.signal_fn(pid, signum)
+                sent = True
+            except ProcessLookupError:
+                continue
+        return sent
+
+    def flush_dns(self):
+        """Flush the local cache the cheapest way available: a signal, nscd as a last resort"""
+        try:
+            # systemd-resolved flushes on SIGUSR2, dnsmasq on SIGHUP
+            if self._signal("systemd-resolved", signal.SIGUSR2):
+                return {"ok": True, "error": None, "method": "systemd-resolved"}
+            if self._signal("dnsmasq", signal.SIGHUP):
+                return {"ok": True, "error": None, "method": "dnsmasq"}
+        except PermissionError:
+            return {"ok": False, "error": "Permission denied: run as root to flush the DNS cache.", "method": None}
+        if self._pids("nscd"):
+            try:
+                completed = self.runner(["nscd", "-i", "hosts"], 30)
+            except (subprocess.TimeoutExpired, OSError) as e:
+                return {"ok": False, "error": sanitize_string(str(e), 200), "method": "nscd"}
+            if completed.returncode != 0:
+                return {"ok": False, "error": sanitize_string(completed.stderr or "nscd failed.", 200), "method": "nscd"}
+            return {"ok": True, "error": None, "method": "nscd"}
+        # glibc keeps no cache of its own, so there is nothing to flush
+        return {"ok": True, "error": None, "method": "none"}
+
+def get_backend(runner=None, root="/"):
+    """Backend for the running platform"""
+    if sys.platform == "win32":
+        return WindowsBackend(runner)
+    return LinuxBackend(root, runner=runner)
@@ -0,0 +1,204 @@
+import random
+import socket
+import struct
+import time
+
+from .sanitize import sanitize_string, is_valid_ip, is_valid_ipv6
+from .metrics import record_operation
+
+# ----------------------
+# DNS Probe Engine
+# ----------------------
+
+DNS_PORT = 53
+DNS_QTYPES = {"A": 1, "AAAA": 28}
+DNS_RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+DEFAULT_PROBE_DOMAIN = "example.com"
+
+def build_dns_query(qname, qtype="A", query_id=None):
+    """Build a recursive DNS query message for a single question"""
+    qname = sanitize_string(qname, 253).rstrip(".")
+    if query_id is None:
+        query_id = random.getrandbits(16)
+
+    labels = b""
+    for label in qname.split("."):
+        encoded = label.encode("idna")
+        if not encoded or len(encoded) > 63:
+            raise ValueError("Invalid domain name label")
+        labels += bytes([len(encoded)]) + encoded
+
+    # Header: ID, flags (RD), QDCOUNT=1, AN/NS/AR=0
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    question = labels + b"\x00" + struct.pack("!HH", DNS_QTYPES.get(qtype, 1), 1)
+    return header + question
+
+def _skip_dns_name(data, offset):
+    """Return the offset just past an encoded (possibly compressed) name"""
+    while True:
+        if offset >= len(data):
+            raise ValueError("Truncated DNS name")
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        if length == 0:
+            return offset + 1
+        offset += length + 1
+
+def _same_question(data, qdcount, question):
+    """Whether a response repeats the query's question (the name compared case-insensitively)"""
+    end = 12 + len(question)
+    if qdcount != 1 or data[end - 4:end] != question[-4:]:
+        return False
+    return data[12:end - 4].lower() == question[:-4].lower()
+
+def parse_dns_response(data, query_id=None, question=None):
+    """Parse a DNS response header and answer section into a result dict
+
+    With query_id and question (the query's question section, as built by
+    build_dns_query), a response to anything else is rejected.
+    """
+    if len(data) < 12:
+        raise ValueError("DNS response too short")
+
+    resp_id, flags, qdcount, ancount, _, _ = struct.unpack("!HHHHHH", data[:12])
+    if query_id is not None and resp_id != query_id:
+        raise ValueError("DNS response ID mismatch")
+    if not flags & 0x8000:
+        raise ValueError("DNS message is not a response")
+    if question is not None and not _same_question(data, qdcount, question):
+        raise ValueError("DNS response question mismatch")
+
+    rcode = flags & 0x000F
+    truncated = bool(flags & 0x0200)
+    answers = []
+
+    # A truncated UDP answer may be cut mid-record, leave parsing to the TCP retry
+    offset = 12
+    for _ in range(0 if truncated else qdcount):
+        offset = _skip_dns_name(data, offset) + 4
+
+    for _ in range(0 if truncated else ancount):
+        offset = _skip_dns_name(data, offset)
+        rtype, _, ttl, rdlength = struct.unpack("!HHIH", data[offset:offset + 10])
+        offset += 10
+        rdata = data[offset:offset + rdlength]
+        offset += rdlength
+        if rtype == 1 and rdlength == 4:
+            answers.append({"type": "A", "ttl": ttl, "address": socket.inet_ntop(socket.AF_INET, rdata)})
+        elif rtype == 28 and rdlength == 16:
+            answers.append({"type": "AAAA", "ttl": ttl, "address": socket.inet_ntop(socket.AF_INET6, rdata)})
+
+    return {
+        "id": resp_id,
+        "rcode": DNS_RCODES.get(rcode, str(rcode)),
+        "truncated": truncated,
+        "answer_count": ancount,
+        "answers": answers,
+    }
+
+def _recv_exact(sock, size):
+    """Read exactly size bytes from a stream socket"""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed by DNS server")
+        data += chunk
+    return data
+
+def _answers_query(data, query):
+    """Whether a datagram is a response to query: same ID and the same question"""
+    if len(data) < 12 or data[:2] != query[:2] or not data[2] & 0x80:
+        return False
+    return _same_question(data, struct.unpack("!H", data[4:6])[0], query[12:])
+
+def _dns_query_udp(server, port, query, timeout):
+    """Send a query over UDP and return (response, rtt seconds)
+
+    Datagrams that do not answer this query (a late reply to an earlier one,
+    or a spoofed ID or question) are dropped and the wait goes on.
+    """
+    family = socket.AF_INET6 if ":" in server else socket.AF_INET
+    with socket.socket(family, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect((server, port))
+        start = time.perf_counter()
+        sock.send(query)
+        while True:
+            data = sock.recv(4096)
+            rtt = time.perf_counter() - start
+            if _answers_query(data, query):
+                return data, rtt
+            remaining = timeout - rtt
+            if remaining <= 0:
+                raise socket.timeout("timed out")
+            sock.settimeout(remaining)
+
+def _dns_query_tcp(server, port, query, timeout):
+    """Send a length-prefixed query over TCP and return (response, rtt seconds)"""
+    family = socket.AF_INET6 if ":" in server else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect((server, port))
+        start = time.perf_counter()
+        sock.sendall(struct.pack("!H", len(query)) + query)
+        length = struct.unpack("!H", _recv_exact(sock, 2))[0]
+        data = _recv_exact(sock, length)
+        return data, time.perf_counter() - start
+
+def probe_dns(server, qname=DEFAULT_PROBE_DOMAIN, qtype="A", port=DNS_PORT, timeout=2.0, use_tcp=False):
+    """Send a real DNS query to a resolver and time only the network round trip"""
+    server = sanitize_string(server, 45)
+    result = {
+        "server": server,
+        "qname": qname,
+        "qtype": qtype,
+        "ok": False,
+        "rtt_ms": None,
+        "rcode": None,
+        "answer_count": 0,
+        "answers": [],
+        "transport": "tcp" if use_tcp else "udp",
+        "error": None,
+    }
+    if not (is_valid_ip(server) or is_valid_ipv6(server)):
+        result["error"] = "Invalid DNS server address"
+        return result
+    if qtype not in DNS_QTYPES:
+        result["error"] = "Unsupported query type"
+        return result
+
+    started = time.perf_counter()
+    try:
+        query_id = random.getrandbits(16)
+        query = build_dns_query(qname, qtype, query_id)
+        if use_tcp:
+            data, rtt = _dns_query_tcp(server, port, query, timeout)
+        else:
+            data, rtt = _dns_query_udp(server, port, query, timeout)
+        question = query[12:]
+        response = parse_dns_response(data, query_id, question)
+
+        # Retry over TCP when the UDP answer did not fit in one datagram
+        if response["truncated"] and not use_tcp:
+            data, tcp_rtt = _dns_query_tcp(server, port, query, timeout)
+            response = parse_dns_response(data, query_id, question)
+            rtt += tcp_rtt
+            result["transport"] = "tcp"
+
+        result.update({
+            "ok": True,
+            "rtt_ms": round(rtt * 1000, 2),
+            "rcode": response["rcode"],
+            "answer_count": response["answer_count"],
+            "answers": response["answers"],
+        })
+    except socket.timeout:
+        result["error"] = "Timed out"
+    except (OSError, ValueError, struct.error) as e:
+        result["error"] = sanitize_string(str(e), 200)
+
+    outcome = "ok" if result["ok"] else ("timeout" if result["error"] == "Timed out" else "error")
+    record_operation("dns_probe", time.perf_counter() - started, outcome, transport=result["transport"])
+    return result
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from .sanitize import sanitize_string
+from .benchmark import rank_key
+from .adapters import network_fingerprint
+from .netwatch import current_network_context
+
+# ----------------------
+# Probe Result Cache
+# ----------------------
+
+FRESH = "fresh"
+STALE = "stale"
+
+def current_network_fingerprint():
+    """Fingerprint of the active adapters, subnets and gateways"""
+    return network_fingerprint(current_network_context())
+
+class ProbeCache:
+    """Per-resolver benchmark rows keyed by network context, with TTL, LRU eviction and optional persistence
+
+    Rows served from the cache carry their "age" (s), and "stale": True once
+    past the TTL. Stale resolvers are re-probed in the background; a process
+    that exits right after one benchmark (the CLI) should pass
+    background_refresh=False so they are re-probed before it returns.
+    """
+
+    def __init__(self, ttl=300.0, stale_ttl=1800.0, max_entries=1024, path=None,
+                 context_fn=None, context_ttl=10.0, clock=time.time, background_refresh=True):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self.path = path
+        self.context_fn = context_fn or current_network_fingerprint
+        self.context_ttl = context_ttl
+        self.clock = clock
+        self.background_refresh = background_refresh
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._context = None
+        self._context_checked = None
+        self._refreshing = set()
+        if path:
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # Network context
+
+    def context(self):
+        """Current network fingerprint, re-read at most every context_ttl seconds"""
+        now = self.clock()
+        with self._lock:
+            if self._context_checked is not None and now - self._context_checked < self.context_ttl:
+                return self._context
+        try:
+            fingerprint = self.context_fn()
+        except Exception:
+            fingerprint = "unknown"
+        self.set_context(fingerprint)
+        return fingerprint
+
+    def set_context(self, fingerprint):
+        """Record the network context; returns whether it changed
+
+        Results stay keyed by the context they were measured in, so returning
+        to a known network reuses its last ranking instead of re-probing.
+        """
+        with self._lock:
+            self._context_checked = self.clock()
+            if fingerprint != self._context:
+                self._context = fingerprint
+                return True
+        return False
+
+    def invalidate(self, server=None, context=None):
+        """Drop results for one resolver and/or one network context, or everything"""
+        with self._lock:
+            for key in [k for k in self._entries
+                        if (server is None or k[1] == server) and (context is None or k[0] == context)]:
+                del self._entries[key]
+
+    def contexts(self):
+        """Network contexts that have cached results"""
+        with self._lock:
+            return list(dict.fromkeys(key[0] for key in self._entries))
+
+    def on_network_change(self, event):
+        """NetworkChangeDetector callback: switch to the new context right away"""
+        self.set_context(event["current"])
+
+    # Entries
+
+    def put(self, row, method="dns", context=None):
+        """Cache one benchmark row for its resolver"""
+        context = self._context if context is None else context
+        key = (context, sanitize_string(row["server"], 45), method)
+        with self._lock:
+            self._entries[key] = (row, self.clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get(self, server, method, context):
+        """Return (row, age) for a resolver, or (None, None); expired entries are dropped"""
+        context = self._context if context is None else context
+        key = (context, sanitize_string(server, 45), method)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            row, stored_at = entry
+            age = self.clock() - stored_at
+            if age >= self.stale_ttl:
+                del self._entries[key]
+                return None, None
+            self._entries.move_to_end(key)
+        return row, age
+
+    def get(self, server, method="dns", context=None):
+        """Return (row, FRESH or STALE) for a resolver, or (None, None)"""
+        row, age = self._get(server, method, context)
+        if row is None:
+            return None, None
+        return row, FRESH if age < self.ttl else STALE
+
+    def lookup(self, servers, method="dns"):
+        """Split resolvers into cached rows (with "age", and "stale" past the TTL), stale and missing resolvers"""
+        context = self.context()
+        rows, stale, missing = [], [], []
+        for server in dict.fromkeys(sanitize_string(s, 45) for s in servers):
+            row, age = self._get(server, method, context)
+            if row is None:
+                missing.append(server)
+                continue
+            row = dict(row, age=round(age, 1))
+            if age >= self.ttl:
+                row["stale"] = True
+                stale.append(server)
+            rows.append(row)
+        return sorted(rows, key=rank_key), stale, missing
+
+    def refresh_async(self, servers, probe_fn, method="dns"):
+        """Re-probe resolvers in the background unless a refresh for them is running"""
+        context = self._context
+        with self._lock:
+            servers = [s for s in servers if (s, method) not in self._refreshing]
+            self._refreshing.update((s, method) for s in servers)
+        if not servers:
+            return False
+
+        def _refresh():
+            try:
+                for row in probe_fn(servers):
+                    self.put(row, method, context)
+                if self.path:
+                    self.save()
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update((s, method) for s in servers)
+
+        threading.Thread(target=_refresh, daemon=True).start()
+        return True
+
+    # Persistence
+
+    def save(self):
+        """Write the cache to its JSON file (atomically)"""
+        if not self.path:
+            return False
+        with self._lock:
+            data = {
+                "context": self._context,
+                "entries": [[list(key), row, stored_at] for key, (row, stored_at) in self._entries.items()],
+            }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(data, cache_file)
+            os.replace(temp_path, self.path)
+            return True
+        except OSError:
+            return False
+
+    def load(self):
+        """Restore still-usable entries from the JSON file; a missing or bad file is ignored"""
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+            now = self.clock()
+            with self._lock:
+                self._context = data.get("context")
+                for (context, server, method), row, stored_at in data.get("entries", []):
+                    if now - stored_at < self.stale_ttl and isinstance(row, dict) and "server" in row:
+                        self._entries[(context, server, method)] = (row, stored_at)
+            return True
+        except (OSError, ValueError, TypeError, KeyError):
+            return False
@@ -0,0 +1,91 @@
+import re
+
+from .validation import is_ipv4, is_ipv6
+
+# ----------------------
+# Input Sanitization Functions
+# ----------------------
+
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F-\x9F]')
+
+def sanitize_string(text, max_length=255):
+    """Sanitize string input to prevent injection attacks and ensure safe processing"""
+    if not isinstance(text, str):
+        return ""
+    
+    # Remove null bytes and control characters except newline and tab
+    sanitized = _CONTROL_CHARS_RE.sub('', text)
+    
+    # Truncate to max length
+    sanitized = sanitized[:max_length]
+    
+    # Strip leading/trailing whitespace
+    sanitized = sanitized.strip()
+    
+    return sanitized
+
+def sanitize_network_adapter_name(adapter_name):
+    """Sanitize network adapter name for netsh commands"""
+    if not isinstance(adapter_name, str):
+        return "Wi-Fi"
+    
+    # Only allow alphanumeric, spaces, hyphens, underscores, and parentheses
+    sanitized = re.sub(r'[^a-zA-Z0-9\s\-_()]', '', adapter_name)
+    # Line breaks would start a new command in a netsh script, so any whitespace run becomes one space
+    sanitized = re.sub(r'\s+', ' ', sanitized).strip()
+    
+    # If empty or too long, default to Wi-Fi
+    if not sanitized or len(sanitized) > 100:
+        return "Wi-Fi"
+    
+    return sanitized
+
+def validate_dns_server_name(dns_name):
+    """Validate DNS server selection name"""
+    allowed_dns_names = [
+        "AU - Cloudflare (1.1.1.1, 1.0.0.1)",
+        "Google (8.8.8.8, 8.8.4.4)", 
+        "Quad9 (9.9.9.9, 149.112.112.112)",
+        "Custom..."
+    ]
+    return dns_name in allowed_dns_names
+
+def sanitize_command_args(args):
+    """Sanitize command line arguments to prevent injection"""
+    if not isinstance(args, list):
+        return []
+    
+    sanitized_args = []
+    for arg in args:
+        if isinstance(arg, str):
+            # Remove dangerous characters and limit length
+            sanitized = re.sub(r'[;&|`$()<>]', '', arg)
+            sanitized = sanitized[:100]  # Limit argument length
+            sanitized_args.append(sanitized)
+        else:
+            sanitized_args.append(str(arg)[:100])
+    
+    return sanitized_args
+
+# ----------------------
+# Address Validation
+# ----------------------
+
+def _needs_sanitizing(text):
+    return not text.isprintable() or text != text.strip()
+
+def is_valid_ip(ip):
+    """IPv4 validation; surrounding whitespace and control characters are ignored"""
+    if not isinstance(ip, str):
+        return False
+    if is_ipv4(ip):
+        return True
+    return _needs_sanitizing(ip) and is_ipv4(sanitize_string(ip, 15))
+
+def is_valid_ipv6(ip):
+    """IPv6 validation, including compressed, IPv4-mapped and scoped forms"""
+    if not isinstance(ip, str):
+        return False
+    if is_ipv6(ip):
+        return True
+    return _needs_sanitizing(ip) and is_ipv6(sanitize_string(ip, 45))
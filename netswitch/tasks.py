@@ -0,0 +1,65 @@
+import logging
+import queue
+
+log = logging.getLogger(__name__)
+
+# ----------------------
+# Task Executor
+# ----------------------
+
+class AsyncTaskExecutor:
+    """Runs GUI operations on an AsyncCore; results reach the Tk thread through a thread-safe queue
+
+    Operations submitted with a key are de-duplicated: a repeated click joins
+    the running operation, or cancels and replaces it with supersede=True.
+    runner is a command runner whose processes belong to the calling operation.
+    """
+
+    def __init__(self, root, max_workers=4, poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._results = queue.Queue()
+        self._closed = False
+        # asyncio is only loaded once the GUI needs the core
+        from .asynccore import AsyncCore
+        self.core = AsyncCore(max_workers, deliver=self._deliver)
+        self.core.start()
+        self.runner = self.core.run_command
+        self.root.after(self.poll_ms, self._drain)
+
+    def submit(self, fn, *args, on_done=None, on_error=None, name=None, key=None, supersede=False, **kwargs):
+        """Run fn(*args, **kwargs) (a function or coroutine function); callbacks run on the Tk thread"""
+        return self.core.submit(fn, *args, on_done=on_done, on_error=on_error, name=name, key=key,
+                                supersede=supersede, **kwargs)
+
+    def submit_stream(self, fn, *args, on_item=None, on_done=None, on_error=None, name=None, key=None,
+                      supersede=False, **kwargs):
+        """Iterate the generator fn(*args, **kwargs) on a worker, delivering each item on the Tk thread"""
+        return self.core.submit_stream(fn, *args, on_item=on_item, on_done=on_done, on_error=on_error, name=name,
+                                       key=key, supersede=supersede, **kwargs)
+
+    def _deliver(self, handle, callback, value):
+        """Runs on the loop or a worker: hand the result over to the Tk thread"""
+        self._results.put((handle, callback, value))
+
+    def _drain(self):
+        """Deliver queued results to their callbacks, then re-arm the poll"""
+        while True:
+            try:
+                handle, callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if handle.is_cancelled():
+                continue
+            try:
+                callback(value)
+            except Exception:
+                # A failing handler must not stop the poll, but it should not vanish either
+                log.exception("Callback for task %r failed", handle.name)
+        if not self._closed:
+            self.root.after(self.poll_ms, self._drain)
+
+    def shutdown(self):
+        """Cancel outstanding operations, stop the loop and stop delivering results"""
+        self._closed = True
+        self.core.stop()
@@ -0,0 +1,86 @@
+import ipaddress
+import re
+import socket
+
+# ----------------------
+# Address Validation
+# ----------------------
+
+_OCTET = r"(?:25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9]?[0-9])"
+_IPV4_RE = re.compile(rf"{_OCTET}(?:\.{_OCTET}){{3}}")
+# Zone of a scoped address such as fe80::1%eth0 or fe80::1%12
+_SCOPE_RE = re.compile(r"[0-9A-Za-z_.\-]{1,32}")
+_V4_MAPPED_PREFIX = b"\x00" * 10 + b"\xff\xff"
+
+def is_ipv4(text):
+    """Strict dotted-quad IPv4 check (no leading zeros, no surrounding whitespace)"""
+    return isinstance(text, str) and _IPV4_RE.fullmatch(text) is not None
+
+def _pack_ipv6(text):
+    """Return (16 packed bytes, scope) for an IPv6 address, or (None, None) if invalid"""
+    if not isinstance(text, str) or ":" not in text:
+        return None, None
+    address, sep, scope = text.partition("%")
+    if sep and _SCOPE_RE.fullmatch(scope) is None:
+        return None, None
+    try:
+        # inet_pton is the platform's strict parser: one "::" at most, dotted IPv4 tails allowed
+        return socket.inet_pton(socket.AF_INET6, address), scope
+    except (OSError, ValueError):
+        return None, None
+
+def is_ipv6(text):
+    """IPv6 check, including compressed, IPv4-mapped and scoped forms"""
+    return _pack_ipv6(text)[0] is not None
+
+def normalize_address(text):
+    """Canonical text form of an address (lower-case, compressed, IPv4-mapped as IPv4), or None"""
+    if is_ipv4(text):
+        return text
+    packed, scope = _pack_ipv6(text)
+    if packed is None:
+        return None
+    if packed[:12] == _V4_MAPPED_PREFIX:
+        return socket.inet_ntoa(packed[12:])
+    address = socket.inet_ntop(socket.AF_INET6, packed)
+    return f"{address}%{scope}" if scope else address
+
+def parse_address(text):
+    """Parse an IPv4 or IPv6 address into an ipaddress object (IPv4-mapped as IPv4), or None"""
+    address = normalize_address(text)
+    return ipaddress.ip_address(address) if address is not None else None
+
+def is_server_address(address):
+    """Whether a parsed address can be a DNS server: not unspecified, multicast, "this network" or reserved IPv4"""
+    if address.is_unspecified or address.is_multicast:
+        return False
+    # IPv6 is_reserved covers ::/8 and so ::1; loopback and link-local servers are legitimate
+    return address.version == 6 or not (address.is_reserved or address.packed[0] == 0)
+
+def validate_addresses(addresses, family=None, dedupe=True):
+    """Validate, normalize and de-duplicate a list of DNS server addresses in one pass
+
+    family may be 4 or 6 to accept only that address family. Addresses that
+    cannot be a server (see is_server_address) count as invalid. Returns
+    {"valid": [normalized, ...], "invalid": [original, ...], "duplicates": count}
+    with valid addresses in their first-seen order.
+    """
+    valid = []
+    invalid = []
+    seen = set()
+    duplicates = 0
+    for text in addresses:
+        if isinstance(text, str):
+            text = text.strip()
+        address = normalize_address(text)
+        if (address is None or (family is not None and (6 if ":" in address else 4) != family)
+                or not is_server_address(ipaddress.ip_address(address))):
+            invalid.append(text)
+            continue
+        if dedupe:
+            if address in seen:
+                duplicates += 1
+                continue
+            seen.add(address)
+        valid.append(address)
+    return {"valid": valid, "invalid": invalid, "duplicates": duplicates}
@@ -0,0 +1,91 @@
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .sanitize import sanitize_string, is_valid_ip, is_valid_ipv6
+from .probe import DNS_PORT, DNS_QTYPES, probe_dns
+from .workload import normalize_domain
+from .metrics import record_operation
+
+# ----------------------
+# Cache Warm-up
+# ----------------------
+
+# Popular names worth resolving ahead of the first user after a flush or switch
+DEFAULT_HOT_DOMAINS = [
+    "www.google.com", "www.youtube.com", "www.microsoft.com", "login.microsoftonline.com",
+    "outlook.office365.com", "www.bing.com", "www.amazon.com", "www.facebook.com",
+    "www.wikipedia.org", "github.com", "www.cloudflare.com", "windowsupdate.com",
+    "teams.microsoft.com", "www.apple.com", "www.netflix.com", "discord.com",
+]
+
+def hot_domains(domains=None, history=None, limit=50):
+    """Warm-up list: the given domains (default: built-in list), then history's busiest names"""
+    names = list(DEFAULT_HOT_DOMAINS if domains is None else domains)
+    if history is not None:
+        try:
+            names.extend(history.hot_domains(limit))
+        except Exception:
+            pass
+    return [d for d in dict.fromkeys(normalize_domain(d) for d in names) if d][:limit]
+
+# getaddrinfo errors meaning the name has no records; anything else (EAI_AGAIN, no network) is a failure
+_NO_RECORDS = {code for code in (getattr(socket, "EAI_NONAME", None), getattr(socket, "EAI_NODATA", None))
+               if code is not None}
+
+def _resolve_system(domain):
+    """Resolve through the OS resolver so its cache is filled; returns (answered, rcode)"""
+    try:
+        return bool(socket.getaddrinfo(domain, None, proto=socket.IPPROTO_TCP)), "NOERROR"
+    except socket.gaierror as e:
+        return False, "NXDOMAIN" if e.errno in _NO_RECORDS else None
+    except OSError:
+        return False, None
+
+def warm_up(domains=None, servers=None, qtype="A", port=DNS_PORT, timeout=2.0, concurrency=8,
+            history=None, limit=50):
+    """Pre-resolve hot domains so the first real lookups after a flush or switch hit a warm cache
+
+    With servers, every domain is queried against each of them (warming the
+    resolvers' caches); without, through the OS resolver (warming its cache).
+    A hit is a lookup that returned records; a miss returned none (NXDOMAIN,
+    empty answer, or no response). The OS resolver applies its own timeout.
+    """
+    names = hot_domains(domains, history, limit)
+    servers = [sanitize_string(s, 45) for s in servers or []]
+    servers = [s for s in dict.fromkeys(servers) if is_valid_ip(s) or is_valid_ipv6(s)]
+    result = {"ok": False, "domains": len(names), "queries": 0, "hits": 0, "misses": 0,
+              "failures": 0, "duration_ms": 0.0, "error": None}
+    if qtype not in DNS_QTYPES:
+        result["error"] = "Unsupported query type"
+        return result
+    if not names:
+        result["error"] = "No domains to warm up."
+        return result
+
+    def lookup(task):
+        server, domain = task
+        if server is None:
+            return _resolve_system(domain)
+        response = probe_dns(server, qname=domain, qtype=qtype, port=port, timeout=timeout)
+        return response["ok"] and response["answer_count"] > 0, response["rcode"]
+
+    tasks = [(server, domain) for domain in names for server in (servers or [None])]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(tasks))),
+                            thread_name_prefix="netswitch-warmup") as pool:
+        for answered, rcode in pool.map(lookup, tasks):
+            if answered:
+                result["hits"] += 1
+            else:
+                result["misses"] += 1
+                if rcode is None:
+                    result["failures"] += 1
+    duration = time.perf_counter() - started
+
+    result.update({"ok": result["failures"] < len(tasks), "queries": len(tasks),
+                   "duration_ms": round(duration * 1000, 2)})
+    if not result["ok"]:
+        result["error"] = "No warm-up lookup got a response."
+    record_operation("warmup", duration, "ok" if result["ok"] else "error")
+    return result
@@ -0,0 +1,115 @@
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from .sanitize import sanitize_string, is_valid_ip, is_valid_ipv6
+from .probe import DNS_PORT, DNS_QTYPES, probe_dns
+from .benchmark import summarize_samples
+
+# ----------------------
+# Domain Workload Benchmark
+# ----------------------
+
+_HOSTNAME_RE = re.compile(r"^(?=.{1,253}$)(?!-)[a-z0-9_-]{1,63}(?<!-)(\.(?!-)[a-z0-9_-]{1,63}(?<!-))*$")
+_ERROR_RCODES = ("SERVFAIL", "REFUSED", "FORMERR", "NOTIMP")
+
+def normalize_domain(domain):
+    """Return a lower-case domain name without the trailing dot, or None if invalid"""
+    domain = sanitize_string(domain, 254).lower().rstrip(".")
+    return domain if _HOSTNAME_RE.match(domain) else None
+
+def load_domains(path, limit=10000):
+    """Read a domain list (one per line, or the first CSV column of a query-log export)"""
+    domains = []
+    seen = set()
+    with open(path, encoding="utf-8-sig") as domain_file:
+        for line in domain_file:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            domain = normalize_domain(line.split(",", 1)[0].strip().strip('"'))
+            if domain and domain not in seen:
+                seen.add(domain)
+                domains.append(domain)
+                if len(domains) >= limit:
+                    break
+    return domains
+
+def _query_pair(server, domain, qtype, port, timeout):
+    """Query a domain twice: the first (cold) lookup, then an immediate (warm) repeat"""
+    cold = probe_dns(server, qname=domain, qtype=qtype, port=port, timeout=timeout)
+    warm = probe_dns(server, qname=domain, qtype=qtype, port=port, timeout=timeout)
+    return server, domain, cold, warm
+
+def _answer_set(result):
+    return frozenset(a["address"] for a in result["answers"])
+
+def _consensus(results):
+    """Majority rcode across resolvers, and how many resolvers returned each address with it"""
+    rcodes = Counter(r["rcode"] for r in results if r["ok"])
+    if not rcodes:
+        return None, Counter()
+    rcode = rcodes.most_common(1)[0][0]
+    answers = Counter()
+    for r in results:
+        if r["ok"] and r["rcode"] == rcode:
+            answers.update(_answer_set(r))
+    return rcode, answers
+
+def _latency_summary(samples):
+    row = summarize_samples("", samples)
+    return {k: row[k] for k in ("min", "median", "p95")}
+
+def benchmark_workload(servers, domains, qtype="A", port=DNS_PORT, timeout=2.0, concurrency=16):
+    """Replay a domain list against each resolver, separating cold and warm lookups"""
+    servers = [sanitize_string(s, 45) for s in servers]
+    servers = [s for s in dict.fromkeys(servers) if is_valid_ip(s) or is_valid_ipv6(s)]
+    domains = [d for d in dict.fromkeys(normalize_domain(d) for d in domains) if d]
+    if qtype not in DNS_QTYPES or not servers or not domains:
+        return []
+
+    by_domain = {domain: {} for domain in domains}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="netswitch-workload") as pool:
+        futures = [pool.submit(_query_pair, server, domain, qtype, port, timeout)
+                   for domain in domains for server in servers]
+        for future in futures:
+            server, domain, cold, warm = future.result()
+            by_domain[domain][server] = (cold, warm)
+
+    stats = {server: {"cold": [], "warm": [], "errors": 0, "nxdomain": 0, "mismatches": 0}
+             for server in servers}
+    for domain, answers in by_domain.items():
+        rcode, consensus = _consensus([cold for cold, _ in answers.values()])
+        for server, (cold, warm) in answers.items():
+            entry = stats[server]
+            for kind, result in (("cold", cold), ("warm", warm)):
+                entry[kind].append(result["rtt_ms"] if result["ok"] else None)
+                if not result["ok"] or result["rcode"] in _ERROR_RCODES:
+                    entry["errors"] += 1
+                elif result["rcode"] == "NXDOMAIN":
+                    entry["nxdomain"] += 1
+
+            # A mismatch is a different rcode from the majority, or no address shared with any other resolver
+            if cold["ok"] and rcode is not None:
+                own = _answer_set(cold)
+                if cold["rcode"] != rcode:
+                    entry["mismatches"] += 1
+                elif own and sum(consensus.values()) > len(own) and all(consensus[a] == 1 for a in own):
+                    entry["mismatches"] += 1
+
+    # Rows carry the standard ranking keys (over the cold lookups) plus the workload figures
+    rows = []
+    queries = len(domains) * 2
+    for server in servers:
+        entry = stats[server]
+        cold = _latency_summary(entry["cold"])
+        rows.append({
+            **summarize_samples(server, entry["cold"]),
+            "domains": len(domains),
+            "cold": cold,
+            "warm": _latency_summary(entry["warm"]),
+            "error_rate": round(entry["errors"] / queries, 3),
+            "nxdomain_rate": round(entry["nxdomain"] / queries, 3),
+            "mismatches": entry["mismatches"],
+        })
+    return sorted(rows, key=lambda r: (r["error_rate"], r["cold"]["median"] if r["cold"]["median"] is not None else float("inf")))
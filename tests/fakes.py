@@ -0,0 +1,31 @@
+import subprocess
+
+# ----------------------
+# Fake Command Runner
+# ----------------------
+
+class FakeRunner:
+    """Command runner that records every call and answers from canned output
+
+    outputs maps a command prefix tuple to stdout (or a callable taking the
+    command). The contents of `netsh -f` script files are kept in scripts,
+    since the real file is deleted once the run returns.
+    """
+
+    def __init__(self, outputs=None, returncode=0):
+        self.outputs = outputs or {}
+        self.returncode = returncode
+        self.calls = []
+        self.scripts = []
+
+    def __call__(self, cmd, timeout=30):
+        self.calls.append(list(cmd))
+        if cmd[:2] == ["netsh", "-f"]:
+            with open(cmd[2], encoding="utf-8") as script_file:
+                self.scripts.append(script_file.read())
+        stdout = ""
+        for prefix, output in self.outputs.items():
+            if tuple(cmd[:len(prefix)]) == prefix:
+                stdout = output(cmd) if callable(output) else output
+                break
+        return subprocess.CompletedProcess(cmd, self.returncode, stdout, "")
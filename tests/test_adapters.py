@@ -0,0 +1,43 @@
+import os
+import unittest
+
+from netswitch.adapters import list_adapters, parse_netsh_interfaces
+
+from .fakes import FakeRunner
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "netsh")
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8", newline="") as fixture:
+        return fixture.read()
+
+class NetshInterfaceParserTest(unittest.TestCase):
+
+    def test_captured_output(self):
+        records = parse_netsh_interfaces(load("show_interface.txt"))
+        self.assertEqual([r["name"] for r in records], [
+            "Ethernet 2", "vEthernet (Default Switch)", "Ethernet", "Wi-Fi", "Bluetooth Network Connection",
+        ])
+        self.assertEqual(records[1], {
+            "admin_state": "Enabled", "state": "Connected", "type": "Dedicated", "name": "vEthernet (Default Switch)",
+        })
+        self.assertEqual(records[4]["admin_state"], "Disabled")
+        self.assertEqual(records[2]["state"], "Disconnected")
+
+    def test_header_only(self):
+        self.assertEqual(parse_netsh_interfaces(load("show_interface_header_only.txt")), [])
+
+    def test_garbage(self):
+        for text in ("", None, 42, "The following command was not found: interface show interface.",
+                     "\x00\x01binary\xff junk\r\n---\r\n"):
+            self.assertEqual(parse_netsh_interfaces(text), [])
+
+    def test_list_adapters_uses_the_runner(self):
+        runner = FakeRunner({("netsh", "interface", "show", "interface"): load("show_interface.txt")})
+        records = list_adapters(runner=runner)
+        self.assertEqual(len(records), 5)
+        self.assertEqual(runner.calls, [["netsh", "interface", "show", "interface"]])
+        self.assertIsNone(list_adapters(runner=FakeRunner(returncode=1)))
+
+if __name__ == "__main__":
+    unittest.main()
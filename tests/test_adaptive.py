@@ -0,0 +1,29 @@
+import unittest
+
+from netswitch.adaptive import adaptive_benchmark
+
+LATENCY = {"10.0.0.1": 10.0, "10.0.0.2": 30.0, "10.0.0.3": 60.0}
+
+def probe(server):
+    return LATENCY[server]
+
+class AdaptiveBenchmarkTest(unittest.TestCase):
+
+    def test_picks_the_fastest_with_fewer_probes(self):
+        report = adaptive_benchmark(list(LATENCY), probe_fn=probe, max_samples=10)
+        self.assertEqual(report["best"], "10.0.0.1")
+        self.assertLess(report["probes"], report["exhaustive_probes"])
+        self.assertEqual(report["ranking"][0]["server"], "10.0.0.1")
+
+    def test_tiny_budget_still_probes_every_resolver_once(self):
+        report = adaptive_benchmark(list(LATENCY), probe_fn=probe, budget=2)
+        self.assertEqual(report["probes"], 3)
+        self.assertEqual(report["best"], "10.0.0.1")
+        self.assertTrue(all(row["received"] == 1 for row in report["ranking"]))
+
+    def test_lost_probes_rank_last(self):
+        report = adaptive_benchmark(["10.0.0.1", "10.0.0.9"], probe_fn=lambda s: LATENCY.get(s), budget=2)
+        self.assertEqual([row["server"] for row in report["ranking"]], ["10.0.0.1", "10.0.0.9"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import contextlib
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+from netswitch.asynccore import AsyncCore
+from netswitch.tasks import AsyncTaskExecutor
+
+def slow(value, delay=0.2):
+    time.sleep(delay)
+    return value
+
+class AsyncCoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.results = []
+        self.core = AsyncCore(deliver=lambda handle, callback, value: callback(value)).start()
+        self.addCleanup(self.core.stop)
+
+    def collect(self, tag):
+        return lambda value: self.results.append((tag, value))
+
+    def test_repeated_key_coalesces(self):
+        first = self.core.submit(slow, 1, on_done=self.collect("a"), key="apply")
+        second = self.core.submit(slow, 2, on_done=self.collect("b"), key="apply")
+        self.assertIs(first, second)
+        self.assertTrue(first.wait(2))
+        self.assertEqual(sorted(self.results), [("a", 1), ("b", 1)])
+
+    def test_supersede_cancels_and_hands_over_callbacks(self):
+        old = self.core.submit(slow, "old", 1.0, on_done=self.collect("old"), key="benchmark")
+        new = self.core.submit(slow, "new", 0.05, on_done=self.collect("new"), key="benchmark", supersede=True)
+        self.assertTrue(new.wait(2))
+        self.assertTrue(old.is_cancelled())
+        self.assertEqual(sorted(self.results), [("new", "new"), ("old", "new")])
+
+    @unittest.skipIf(sys.platform == "win32", "uses the sleep command")
+    def test_cancel_kills_the_running_command(self):
+        started = time.monotonic()
+        handle = self.core.submit(lambda: self.core.run_command(["sleep", "5"], 10),
+                                  on_done=self.collect("done"), on_error=self.collect("error"))
+        time.sleep(0.2)
+        handle.cancel()
+        self.assertTrue(handle.wait(2))
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(self.results, [])
+
+    @unittest.skipIf(sys.platform == "win32", "uses the sleep command")
+    def test_command_timeout(self):
+        handle = self.core.submit(lambda: self.core.run_command(["sleep", "5"], 0.1), on_error=self.collect("error"))
+        self.assertTrue(handle.wait(2))
+        self.assertIsInstance(self.results[0][1], subprocess.TimeoutExpired)
+
+    def test_span_covers_the_work_on_the_worker_thread(self):
+        threads = []
+
+        @contextlib.contextmanager
+        def recording_span(name):
+            threads.append((name, threading.current_thread().name))
+            yield {}
+
+        with mock.patch("netswitch.asynccore.span", recording_span):
+            self.core.submit(slow, 1, 0, name="flush").wait(2)
+        self.assertEqual(threads[0][0], "flush")
+        self.assertTrue(threads[0][1].startswith("netswitch_"), threads[0][1])
+
+    def test_stream_delivers_items(self):
+        def numbers(count, cancelled):
+            yield from range(count)
+
+        handle = self.core.submit_stream(numbers, 3, on_item=self.collect("item"), on_done=self.collect("count"))
+        self.assertTrue(handle.wait(2))
+        self.assertEqual(self.results, [("item", 0), ("item", 1), ("item", 2), ("count", 3)])
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, fn):
+        self.scheduled.append(fn)
+
+class AsyncTaskExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = FakeRoot()
+        self.executor = AsyncTaskExecutor(self.root)
+        self.addCleanup(self.executor.shutdown)
+
+    def drain_when_ready(self, count):
+        deadline = time.monotonic() + 2
+        while self.executor._results.qsize() < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.executor._drain()
+
+    def test_failing_callback_is_logged_and_draining_continues(self):
+        results = []
+
+        def broken(value):
+            raise RuntimeError("handler bug")
+
+        self.executor.submit(slow, 1, 0, on_done=broken, name="apply")
+        self.executor.submit(slow, 2, 0, on_done=results.append)
+        with self.assertLogs("netswitch.tasks", "ERROR") as logs:
+            self.drain_when_ready(2)
+        self.assertEqual(results, [2])
+        self.assertIn("'apply'", logs.output[0])
+        self.assertIn("handler bug", logs.output[0])
+        self.assertEqual(len(self.root.scheduled), 2)
+
+if __name__ == "__main__":
+    unittest.main()
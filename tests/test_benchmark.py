@@ -0,0 +1,39 @@
+import unittest
+from unittest import mock
+
+from netswitch.benchmark import find_fastest_dns, rank_key
+from netswitch.forwarder import upstreams_from_ranking
+
+def _fake_probe(rtts):
+    """probe_dns stand-in answering every name with a fixed RTT per server (None: timeout)"""
+    def probe(server, qname, qtype="A", port=53, timeout=2.0):
+        rtt = rtts[server]
+        if rtt is None:
+            return {"ok": False, "rtt_ms": None, "rcode": None, "answers": []}
+        return {"ok": True, "rtt_ms": rtt, "rcode": "NOERROR", "answers": [{"address": "192.0.2.1"}]}
+    return probe
+
+class WorkloadRankingTest(unittest.TestCase):
+    """find_fastest_dns(domains=...) rows work wherever a ranking is expected"""
+
+    def run_workload(self, rtts, **kwargs):
+        with mock.patch("netswitch.workload.probe_dns", _fake_probe(rtts)):
+            return find_fastest_dns(servers=list(rtts), domains=["example.com", "example.org"], **kwargs)
+
+    def test_rows_carry_ranking_keys_and_workload_extras(self):
+        ranking = self.run_workload({"192.0.2.10": 30.0, "192.0.2.11": 10.0, "192.0.2.12": None})
+        self.assertEqual([row["server"] for row in ranking], ["192.0.2.11", "192.0.2.10", "192.0.2.12"])
+        best = ranking[0]
+        self.assertEqual((best["sent"], best["received"], best["loss"], best["median"]), (2, 2, 0.0, 10.0))
+        self.assertEqual(best["cold"]["median"], 10.0)
+        self.assertEqual(best["error_rate"], 0.0)
+        self.assertEqual((ranking[-1]["received"], ranking[-1]["loss"]), (0, 1.0))
+        self.assertEqual(sorted(ranking, key=rank_key), ranking)
+        self.assertEqual(upstreams_from_ranking(ranking, 2), ["192.0.2.11", "192.0.2.10"])
+
+    def test_other_methods_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.run_workload({"192.0.2.10": 10.0}, method="ping")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+
+from netswitch.catalog import _JsonStream, _iter_json_records, load_catalog
+
+RECORDS = [
+    {"address": "1.1.1.1", "name": "Cloudflare", "category": "public"},
+    "9.9.9.9",
+    {"ip": "2606:4700:4700:0:0:0:0:1111", "name": "Cloudflare v6", "weight": 12345.678},
+    {"server": "not-an-address"},
+    {"resolver": "1.1.1.1", "name": "duplicate"},
+    {"address": "224.0.0.1", "name": "multicast"},
+    42,
+]
+
+class JsonStreamTest(unittest.TestCase):
+
+    def decode_array(self, text, chunk_size):
+        return list(_JsonStream(io.StringIO(text), chunk_size).array())
+
+    def test_array_matches_json_load_at_every_chunk_size(self):
+        text = json.dumps(RECORDS, indent=2)
+        for chunk_size in (1, 2, 3, 7, 64, 1 << 16):
+            self.assertEqual(self.decode_array(text, chunk_size), RECORDS, chunk_size)
+
+    def test_resolvers_member_of_an_object(self):
+        text = json.dumps({"version": 3, "meta": {"source": "x", "list": [1, 2]}, "resolvers": RECORDS, "tail": 1})
+        self.assertEqual(list(_iter_json_records(io.StringIO(text))), RECORDS)
+        self.assertEqual(list(_iter_json_records(io.StringIO('{"other": []}'))), [])
+        self.assertEqual(list(_iter_json_records(io.StringIO("[]"))), [])
+        self.assertEqual(list(_iter_json_records(io.StringIO('"just a string"'))), [])
+
+    def test_malformed_input_raises_value_error(self):
+        for text in ('[{"address": "1.1.1.1"} {"address": "8.8.8.8"}]', '[{"address": ', '{"resolvers" []}'):
+            with self.assertRaises(ValueError):
+                list(_iter_json_records(io.StringIO(text)))
+
+class LoadCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="netswitch-catalog-")
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf-8") as catalog_file:
+            catalog_file.write(text)
+        return path
+
+    def test_formats_agree(self):
+        expected = ["1.1.1.1", "9.9.9.9", "2606:4700:4700::1111"]
+        paths = [
+            self.write("c.json", json.dumps(RECORDS)),
+            self.write("c.jsonl", "\n".join(json.dumps(r) for r in RECORDS) + "\nnot json\n"),
+            self.write("c.csv", "Address,Name\n1.1.1.1,Cloudflare\n9.9.9.9,Quad9\n"
+                                "2606:4700:4700:0:0:0:0:1111,Cloudflare v6\nbogus,\n1.1.1.1,again\n"),
+        ]
+        for path in paths:
+            stats = {}
+            self.assertEqual([e["address"] for e in load_catalog(path, stats)], expected, path)
+            self.assertEqual(stats["entries"], 3)
+            self.assertEqual(stats["duplicates"], 1)
+
+    def test_json_array_streams_in_flat_memory(self):
+        path = os.path.join(self.directory, "large.json")
+        with open(path, "w", encoding="utf-8") as catalog_file:
+            catalog_file.write("[")
+            for i in range(20000):
+                catalog_file.write(("," if i else "") + json.dumps(
+                    {"address": f"10.0.{i >> 8 & 255}.{i & 255}", "name": f"resolver {i}", "category": "x" * 200}))
+            catalog_file.write("]")
+
+        def peak_memory(fn):
+            tracemalloc.start()
+            try:
+                fn()
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        streamed = peak_memory(lambda: self.assertEqual(sum(1 for _ in load_catalog(path)), 20000))
+        with open(path, encoding="utf-8") as catalog_file:
+            loaded = peak_memory(lambda: json.load(catalog_file))
+        # Only the dedupe set (a few bytes per address) grows with the catalog, not the records
+        self.assertLess(streamed, loaded / 4)
+
+    def test_builtin_catalog_is_not_modified(self):
+        first = list(load_catalog())
+        first[0]["address"] = "changed"
+        self.assertEqual(list(load_catalog())[0]["address"], "1.1.1.1")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from benchmarks.stubdns import StubDnsServer
+from netswitch import cli
+from netswitch.benchmark import find_fastest_dns
+from netswitch.cdn import EdgeCache, benchmark_cdn
+
+from .test_cli import run
+
+DOMAINS = ["edge.example", "static.example"]
+
+class RecordingHistory:
+    def __init__(self):
+        self.calls = []
+
+    def record_results(self, results, method="dns"):
+        self.calls.append((results, method))
+
+class CdnBenchmarkTest(unittest.TestCase):
+    """Stub resolvers hand out loopback edges served by local TCP listeners"""
+
+    def setUp(self):
+        self.listeners = []
+        self.edge_port = self.listen("127.0.0.1", 0)
+        self.listen("127.0.0.4", self.edge_port)
+
+    def listen(self, host, port):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(64)
+        self.addCleanup(sock.close)
+        return sock.getsockname()[1]
+
+    def start_resolvers(self, specs):
+        port = 0
+        for host, kwargs in specs:
+            stub = StubDnsServer(host, port, **kwargs).start()
+            port = stub.port
+            self.addCleanup(stub.stop)
+        return port
+
+    def test_ranks_by_resolve_plus_connect_time(self):
+        port = self.start_resolvers([
+            ("127.0.0.2", {"delay_ms": 60, "address": "127.0.0.1"}),
+            ("127.0.0.3", {"delay_ms": 0, "address": "127.0.0.4"}),
+            ("127.0.0.5", {"delay_ms": 0, "address": "127.0.0.6"}),
+        ])
+        cache = EdgeCache()
+        history = RecordingHistory()
+        ranking = benchmark_cdn(["127.0.0.2", "127.0.0.3", "127.0.0.5"], DOMAINS, port=port,
+                                connect_port=self.edge_port, timeout=1.0, cache=cache, history=history)
+        self.assertEqual([row["server"] for row in ranking], ["127.0.0.3", "127.0.0.2", "127.0.0.5"])
+        fast, slow, dead = ranking
+        self.assertEqual((fast["received"], fast["edges"]), (2, 1))
+        self.assertGreaterEqual(slow["resolve_ms"], 50)
+        self.assertIsNotNone(slow["connect_ms"])
+        # Nothing listens on the third resolver's edge: resolved, but every sample is lost
+        self.assertEqual((dead["received"], dead["connect_ms"]), (0, None))
+        self.assertIsNotNone(dead["resolve_ms"])
+        # Both domains share one edge per resolver, so each edge is connected to once
+        self.assertEqual(cache.connects, 3)
+        self.assertEqual(history.calls[0][1], "cdn")
+        self.assertEqual(len(history.calls[0][0]["127.0.0.3"]), 2)
+
+    def test_samples_still_running_at_the_deadline_are_lost(self):
+        port = self.start_resolvers([("127.0.0.2", {"delay_ms": 500, "address": "127.0.0.1"})])
+        started = time.perf_counter()
+        ranking = benchmark_cdn(["127.0.0.2"], DOMAINS, port=port, connect_port=self.edge_port,
+                                cache=EdgeCache(), deadline=0.2)
+        self.assertLess(time.perf_counter() - started, 0.45)
+        self.assertEqual((ranking[0]["sent"], ranking[0]["received"]), (2, 0))
+
+    def test_concurrent_requests_share_one_connect(self):
+        gate = threading.Event()
+
+        def connect(address, port, timeout):
+            gate.wait(1)
+            return 3.0
+        cache = EdgeCache(connect_fn=connect)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.connect_time("127.0.0.1")))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        gate.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((results, cache.connects), ([3.0] * 4, 1))
+
+    def test_edge_cache_expires(self):
+        now = [0.0]
+        cache = EdgeCache(ttl=10, clock=lambda: now[0], connect_fn=lambda address, port, timeout: 1.0)
+        cache.connect_time("127.0.0.1")
+        cache.connect_time("127.0.0.1")
+        now[0] = 11
+        cache.connect_time("127.0.0.1")
+        self.assertEqual(cache.connects, 2)
+
+class CdnOptionsTest(unittest.TestCase):
+
+    def test_find_fastest_dns_passes_deadline_and_history(self):
+        history = RecordingHistory()
+        with mock.patch("netswitch.cdn.benchmark_cdn", return_value=[]) as benchmark:
+            find_fastest_dns(servers=["192.0.2.1"], cdn=True, deadline=1.5, history=history)
+        self.assertEqual(benchmark.call_args.kwargs, {"deadline": 1.5, "history": history})
+
+    def test_other_methods_are_rejected(self):
+        with self.assertRaises(ValueError):
+            find_fastest_dns(servers=["192.0.2.1"], cdn=True, method="ping")
+
+    def test_cli_reports_a_missing_domain_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            code, result = run(["benchmark", "--cdn", os.path.join(tmp, "missing.txt")])
+        self.assertEqual(code, 1)
+        self.assertFalse(result["ok"])
+
+    def test_cli_reports_an_unsupported_method(self):
+        with mock.patch.object(cli, "load_domains", return_value=DOMAINS):
+            code, result = run(["benchmark", "--cdn", "domains.txt", "--method", "dot"])
+        self.assertEqual((code, result["ok"]), (1, False))
+
+if __name__ == "__main__":
+    unittest.main()
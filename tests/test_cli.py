@@ -0,0 +1,70 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from netswitch import cli
+from netswitch.benchmark import summarize_samples
+from netswitch.probecache import ProbeCache
+
+def run(argv):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        code = cli.main(argv)
+    return code, json.loads(out.getvalue())
+
+class AllAdaptersTest(unittest.TestCase):
+
+    def test_apply_all_without_connected_adapters_is_an_error(self):
+        with mock.patch.object(cli.AdapterInventory, "refresh"), \
+                mock.patch.object(cli.AdapterInventory, "connected_names", return_value=[]), \
+                mock.patch.object(cli, "apply_dns_batch") as apply_dns_batch:
+            code, result = run(["apply", "1.1.1.1", "--all"])
+        self.assertEqual(code, 1)
+        self.assertEqual(result, {"ok": False, "error": "No connected network adapters found."})
+        apply_dns_batch.assert_not_called()
+
+    def test_apply_all_targets_connected_adapters(self):
+        applied = {"ok": True, "adapters": [], "snapshot": {}, "error": None}
+        with mock.patch.object(cli.AdapterInventory, "refresh"), \
+                mock.patch.object(cli.AdapterInventory, "connected_names", return_value=["Ethernet 2", "Wi-Fi"]), \
+                mock.patch.object(cli, "apply_dns_batch", return_value=applied) as apply_dns_batch:
+            code, _ = run(["apply", "1.1.1.1", "--all"])
+        self.assertEqual(code, 0)
+        self.assertEqual(apply_dns_batch.call_args[0][:2], (["Ethernet 2", "Wi-Fi"], ["1.1.1.1"]))
+
+class ForwardTest(unittest.TestCase):
+
+    def test_adapters_need_the_forwarder_on_port_53(self):
+        with mock.patch.object(cli, "DnsForwarder") as forwarder:
+            code, result = run(["forward", "1.1.1.1", "--port", "5353", "--all"])
+        self.assertEqual(code, 1)
+        self.assertFalse(result["ok"])
+        forwarder.assert_not_called()
+
+class CachedBenchmarkTest(unittest.TestCase):
+
+    def test_stale_rows_are_probed_before_exit(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            # Two minutes old: stale with a 60 s TTL, not yet expired
+            stored_at = time.time() - 120
+            cache = ProbeCache(path=path, clock=lambda: stored_at)
+            cache.context()
+            cache.put(summarize_samples("192.0.2.1", [40.0]))
+            cache.save()
+
+            probe = mock.Mock(side_effect=lambda servers, **kwargs: [summarize_samples(s, [5.0]) for s in servers])
+            with mock.patch("netswitch.benchmark.benchmark_dns", probe):
+                code, ranking = run(["benchmark", "192.0.2.1", "--cache", path, "--cache-ttl", "60"])
+            self.assertEqual(code, 0)
+            self.assertEqual(probe.call_args[0][0], ["192.0.2.1"])
+            self.assertEqual(ranking[0]["median"], 5.0)
+            self.assertEqual(ProbeCache(path=path).get("192.0.2.1")[0]["median"], 5.0)
+
+if __name__ == "__main__":
+    unittest.main()
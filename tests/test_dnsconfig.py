@@ -0,0 +1,103 @@
+import json
+import unittest
+
+from netswitch.dnsconfig import apply_dns_batch, build_netsh_dns_script, load_snapshot, plan_dns_changes, rollback_dns
+from netswitch.platforms import WindowsBackend
+from netswitch.sanitize import sanitize_network_adapter_name
+
+from .fakes import FakeRunner
+
+INJECTED = 'Wi-Fi"\ninterface set interface Ethernet disabled\nrem '
+
+class AdapterNameInjectionTest(unittest.TestCase):
+
+    def test_sanitizer_collapses_line_breaks(self):
+        name = sanitize_network_adapter_name("Wi-Fi\r\ninterface set interface Ethernet disabled")
+        self.assertNotIn("\n", name)
+        self.assertNotIn("\r", name)
+        self.assertEqual(name, "Wi-Fi interface set interface Ethernet disabled")
+
+    def test_sanitizer_keeps_names_with_spaces(self):
+        self.assertEqual(sanitize_network_adapter_name("vEthernet (Default Switch)"), "vEthernet (Default Switch)")
+        self.assertEqual(sanitize_network_adapter_name("Ethernet  2"), "Ethernet 2")
+
+    def test_script_builder_refuses_line_breaks_and_quotes(self):
+        with self.assertRaises(ValueError):
+            build_netsh_dns_script([INJECTED], ["1.1.1.1"])
+        with self.assertRaises(ValueError):
+            plan_dns_changes({}, {'Wi-Fi" x': {"ip": {"source": "static", "servers": ["1.1.1.1"]}}})
+
+    def test_apply_never_runs_a_script_for_an_unsafe_name(self):
+        runner = FakeRunner()
+        result = apply_dns_batch([INJECTED], ["1.1.1.1"], runner=runner, current={})
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["error"], "Invalid network adapter name.")
+        self.assertEqual(runner.calls, [])
+        self.assertEqual(runner.scripts, [])
+
+class BatchedApplyTest(unittest.TestCase):
+
+    def test_one_netsh_script_for_every_adapter_and_family(self):
+        runner = FakeRunner()
+        result = apply_dns_batch(["Wi-Fi", "Ethernet 2"], ["1.1.1.1", "2606:4700:4700::1111", "1.0.0.1"],
+                                 runner=runner, verify=False, backend=WindowsBackend(runner))
+        self.assertTrue(result["ok"])
+        self.assertEqual([call[:2] for call in runner.calls].count(["netsh", "-f"]), 1)
+        self.assertEqual(runner.scripts, [
+            'interface ip set dns name="Wi-Fi" static 1.1.1.1\n'
+            'interface ip add dns name="Wi-Fi" 1.0.0.1 index=2\n'
+            'interface ipv6 set dnsservers name="Wi-Fi" source=static address=2606:4700:4700::1111 register=primary\n'
+            'interface ip set dns name="Ethernet 2" static 1.1.1.1\n'
+            'interface ip add dns name="Ethernet 2" 1.0.0.1 index=2\n'
+            'interface ipv6 set dnsservers name="Ethernet 2" source=static address=2606:4700:4700::1111 register=primary\n'
+        ])
+
+    def test_unchanged_adapters_run_nothing(self):
+        current = {"Wi-Fi": {"ip": {"source": "static", "servers": ["1.1.1.1"]}}}
+        runner = FakeRunner()
+        result = apply_dns_batch(["Wi-Fi"], ["1.1.1.1"], runner=runner, current=current,
+                                 backend=WindowsBackend(runner))
+        self.assertTrue(result["ok"])
+        self.assertFalse(result["adapters"][0]["changed"])
+        self.assertEqual(runner.calls, [])
+
+SHOW_DNS_DHCP = """
+Configuration for interface "Wi-Fi"
+    DNS servers configured through DHCP:  192.168.1.1
+    Register with which suffix:           Primary only
+
+Configuration for interface "Ethernet 2"
+    Statically Configured DNS Servers:    9.9.9.9
+    Register with which suffix:           Primary only
+"""
+
+class RollbackTest(unittest.TestCase):
+
+    def test_snapshot_round_trips_through_json(self):
+        runner = FakeRunner({("netsh", "interface", "ip", "show", "dnsservers"): SHOW_DNS_DHCP})
+        result = apply_dns_batch(["Wi-Fi", "Ethernet 2"], ["1.1.1.1"], runner=runner, verify=False,
+                                 backend=WindowsBackend(runner))
+        snapshot = load_snapshot(json.loads(json.dumps(result)))
+        self.assertEqual(snapshot, {
+            "Wi-Fi": {"ip": {"source": "dhcp", "servers": ["192.168.1.1"]}},
+            "Ethernet 2": {"ip": {"source": "static", "servers": ["9.9.9.9"]}},
+        })
+
+        applied = SHOW_DNS_DHCP.replace("DNS servers configured through DHCP:  192.168.1.1",
+                                        "Statically Configured DNS Servers:    1.1.1.1")
+        runner = FakeRunner({("netsh", "interface", "ip", "show", "dnsservers"): applied.replace("9.9.9.9", "1.1.1.1")})
+        rollback_dns(snapshot, runner=runner, verify=False, backend=WindowsBackend(runner))
+        self.assertEqual(runner.scripts, [(
+            'interface ip set dns name="Wi-Fi" dhcp\n'
+            'interface ip set dns name="Ethernet 2" static 9.9.9.9\n'
+        )])
+
+    def test_invalid_snapshots_are_refused(self):
+        for data in ({}, [], {"snapshot": {}}, {INJECTED: {"ip": {"source": "dhcp", "servers": []}}},
+                     {"Wi-Fi": {"ip": {"source": "static", "servers": ["1.1.1.1; rem"]}}},
+                     {"Wi-Fi": {"ipx": {"source": "static", "servers": []}}}):
+            with self.assertRaises(ValueError):
+                load_snapshot(data)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import time
+import unittest
+
+from netswitch.dualstack import benchmark_dual_stack
+from netswitch.probecache import ProbeCache
+
+PROVIDERS = {"Example": {"ipv4": ["192.0.2.1", "192.0.2.2"], "ipv6": ["2001:db8::1", "2001:db8::2"]}}
+
+class RecordingHistory:
+    def __init__(self):
+        self.results = {}
+
+    def record_results(self, results, method="dns"):
+        self.results.update(results)
+
+class DualStackTest(unittest.TestCase):
+
+    def test_history_and_cache_get_every_endpoint(self):
+        history = RecordingHistory()
+        cache = ProbeCache(context_fn=lambda: "test")
+        rows = benchmark_dual_stack(PROVIDERS, samples=4, delay_ms=0, history=history, cache=cache,
+                                    probe_fn=lambda server: 5.0 if ":" in server else 20.0)
+        self.assertEqual(rows[0]["family"], "ipv6")
+        self.assertEqual(sorted(history.results), ["192.0.2.1", "192.0.2.2", "2001:db8::1", "2001:db8::2"])
+        self.assertEqual(history.results["2001:db8::2"], [5.0, 5.0])
+        row, _ = cache.get("192.0.2.2")
+        self.assertEqual((row["received"], row["median"]), (2, 20.0))
+
+    def test_rounds_after_the_deadline_count_as_lost(self):
+        def slow(server):
+            time.sleep(0.05)
+            return 10.0
+        started = time.perf_counter()
+        rows = benchmark_dual_stack(PROVIDERS, samples=20, delay_ms=0, deadline=0.1, probe_fn=slow)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(rows[0]["ipv4"]["sent"], 20)
+        self.assertLess(rows[0]["ipv4"]["received"], 20)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import shutil
+import ssl
+import tempfile
+import unittest
+
+from benchmarks.stubdns import StubTlsDnsServer, make_self_signed_cert
+from netswitch.encrypted import EncryptedProbePool, benchmark_encrypted
+
+class EncryptedProbeTestCase(unittest.TestCase):
+    """DoT and DoH against local TLS stubs with a throwaway self-signed certificate"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp(prefix="netswitch-tls-")
+        cls.cert = make_self_signed_cert(cls.directory)
+        if cls.cert is None:
+            shutil.rmtree(cls.directory)
+            raise unittest.SkipTest("openssl is not available")
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def start_stub(self, mode, **kwargs):
+        stub = StubTlsDnsServer(*self.cert, mode=mode, **kwargs).start()
+        self.addCleanup(stub.stop)
+        return stub
+
+    def make_pool(self):
+        pool = EncryptedProbePool(timeout=3.0, context=ssl.create_default_context(cafile=self.cert[0]))
+        self.addCleanup(pool.close)
+        return pool
+
+    def probe(self, pool, stub, mode, **kwargs):
+        result = pool.probe(stub.host, mode, port=stub.port, hostname="localhost", **kwargs)
+        self.assertTrue(result["ok"], result["error"])
+        return result
+
+class ProbePoolTest(EncryptedProbeTestCase):
+
+    def check_reuse_and_resumption(self, mode):
+        stub = self.start_stub(mode)
+        pool = self.make_pool()
+
+        first = self.probe(pool, stub, mode)
+        self.assertFalse(first["reused"])
+        self.assertIsNotNone(first["handshake_ms"])
+        self.assertEqual(first["answers"][0]["address"], "192.0.2.1")
+
+        second = self.probe(pool, stub, mode)
+        self.assertTrue(second["reused"])
+        self.assertIsNone(second["handshake_ms"])
+        self.assertEqual(stub.handshakes, 1)
+
+        resumed = self.probe(pool, stub, mode, fresh=True)
+        self.assertFalse(resumed["reused"])
+        self.assertTrue(resumed["resumed"])
+        self.assertEqual(stub.handshakes, 2)
+
+    def test_dot_reuses_connections_and_resumes_sessions(self):
+        self.check_reuse_and_resumption("dot")
+
+    def test_doh_reuses_connections_and_resumes_sessions(self):
+        self.check_reuse_and_resumption("doh")
+
+    def test_handshake_is_reported_apart_from_the_query(self):
+        stub = self.start_stub("dot", delay_ms=150)
+        result = self.probe(self.make_pool(), stub, "dot")
+        self.assertGreaterEqual(result["rtt_ms"], 140)
+        self.assertLess(result["handshake_ms"], result["rtt_ms"])
+
+    def test_untrusted_certificate_is_rejected(self):
+        stub = self.start_stub("dot")
+        result = EncryptedProbePool(timeout=3.0).probe(stub.host, "dot", port=stub.port, hostname="localhost")
+        self.assertFalse(result["ok"])
+        self.assertIn("CERTIFICATE_VERIFY_FAILED", result["error"])
+
+class BenchmarkEncryptedTest(EncryptedProbeTestCase):
+
+    def test_rows_report_handshakes_and_resumption(self):
+        port = 0
+        stubs = []
+        for i, delay in enumerate((40, 5)):
+            stub = self.start_stub("doh", host=f"127.0.0.{60 + i}", port=port, delay_ms=delay)
+            port = stub.port
+            stubs.append(stub)
+        ranking = benchmark_encrypted([s.host for s in stubs], "doh", samples=3, port=port,
+                                      hostnames={s.host: "localhost" for s in stubs},
+                                      context=ssl.create_default_context(cafile=self.cert[0]))
+        self.assertEqual([row["server"] for row in ranking], ["127.0.0.61", "127.0.0.60"])
+        for row, stub in zip(ranking, reversed(stubs)):
+            self.assertEqual(row["received"], 3)
+            self.assertIsNotNone(row["handshake_ms"])
+            self.assertTrue(row["session_resumed"])
+            self.assertIsNotNone(row["resumed_handshake_ms"])
+            # A cold and a resumed handshake; every other query reused the connection
+            self.assertEqual(stub.handshakes, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import socket
+import unittest
+
+from benchmarks.stubdns import StubDnsServer
+from netswitch.forwarder import DnsForwarder
+from netswitch.probe import probe_dns
+
+def _ipv6_loopback():
+    try:
+        with socket.socket(socket.AF_INET6, socket.SOCK_DGRAM) as sock:
+            sock.bind(("::1", 0))
+        return True
+    except OSError:
+        return False
+
+class ForwarderEndToEndTest(unittest.TestCase):
+    """A forwarder on an ephemeral port racing stub upstreams that share one port"""
+
+    def start_stubs(self, specs):
+        stubs = []
+        port = 0
+        for host, kwargs in specs:
+            stub = StubDnsServer(host, port, **kwargs).start()
+            port = stub.port
+            self.addCleanup(stub.stop)
+            stubs.append(stub)
+        return stubs, port
+
+    def start_forwarder(self, upstreams, port, **kwargs):
+        forwarder = DnsForwarder(upstreams, listen="127.0.0.1", port=0, upstream_port=port, **kwargs).start()
+        self.addCleanup(forwarder.stop)
+        return forwarder
+
+    def query(self, forwarder, qname="example.com", **kwargs):
+        return probe_dns(forwarder.listen, qname=qname, port=forwarder.port, timeout=3.0, **kwargs)
+
+    def test_fastest_upstream_wins_and_answers_are_cached(self):
+        (slow, fast), port = self.start_stubs([
+            ("127.0.0.2", {"delay_ms": 150, "address": "192.0.2.2"}),
+            ("127.0.0.3", {"delay_ms": 0, "address": "192.0.2.3"}),
+        ])
+        forwarder = self.start_forwarder(["127.0.0.2", "127.0.0.3"], port)
+
+        first = self.query(forwarder)
+        self.assertTrue(first["ok"])
+        self.assertEqual(first["answers"][0]["address"], "192.0.2.3")
+        second = self.query(forwarder)
+        self.assertEqual(second["answers"][0]["address"], "192.0.2.3")
+        self.assertTrue(self.query(forwarder, use_tcp=True)["ok"])
+
+        stats = forwarder.stats()
+        self.assertEqual((stats["cache_misses"], stats["cache_hits"]), (1, 2))
+        self.assertEqual(stats["upstream_wins"], {"127.0.0.3": 1})
+
+    def test_lost_upstream_is_covered_by_the_race(self):
+        _, port = self.start_stubs([
+            ("127.0.0.2", {"loss": 1.0}),
+            ("127.0.0.3", {"delay_ms": 20, "address": "192.0.2.3"}),
+        ])
+        forwarder = self.start_forwarder(["127.0.0.2", "127.0.0.3"], port, timeout=1.0)
+        self.assertEqual(self.query(forwarder)["answers"][0]["address"], "192.0.2.3")
+
+    def test_servfail_when_every_upstream_is_silent(self):
+        _, port = self.start_stubs([("127.0.0.2", {"loss": 1.0})])
+        forwarder = self.start_forwarder(["127.0.0.2"], port, timeout=0.3)
+        result = self.query(forwarder)
+        self.assertEqual(result["rcode"], "SERVFAIL")
+        self.assertEqual(forwarder.stats()["failures"], 1)
+
+    @unittest.skipUnless(_ipv6_loopback(), "no IPv6 loopback")
+    def test_non_canonical_ipv6_upstream_matches_its_replies(self):
+        _, port = self.start_stubs([("::1", {"address": "192.0.2.6"})])
+        forwarder = self.start_forwarder(["0:0:0:0:0:0:0:1"], port, timeout=1.0)
+        self.assertEqual(forwarder.upstreams, ["::1"])
+        result = self.query(forwarder)
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["answers"][0]["address"], "192.0.2.6")
+
+if __name__ == "__main__":
+    unittest.main()
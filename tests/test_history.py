@@ -0,0 +1,85 @@
+import unittest
+
+from netswitch.history import DAY, HOUR, MINUTE, HistoryStore
+
+BASE = 1000 * HOUR
+
+class HistoryStoreTest(unittest.TestCase):
+    """HistoryStore in memory with an injected clock"""
+
+    def setUp(self):
+        self.now = BASE
+        self.store = HistoryStore(":memory:", raw_retention=HOUR, minute_retention=2 * HOUR,
+                                  hour_retention=DAY, clock=lambda: self.now)
+        self.addCleanup(self.store.close)
+
+    def record_at(self, offset, server, rtt):
+        self.now = BASE + offset
+        self.store.record(server, rtt)
+
+    def record_minutes(self):
+        """Two samples in the first minute, a lost one in the second"""
+        self.record_at(10, "192.0.2.1", 10.0)
+        self.record_at(20, "192.0.2.1", 30.0)
+        self.record_at(70, "192.0.2.1", None)
+
+    def test_ranking_from_recent_samples(self):
+        self.store.record_results({"192.0.2.1": [10.0, 20.0, 30.0], "192.0.2.2": [5.0, None, 7.0]})
+        ranking = self.store.ranking(window=600)
+        self.assertEqual([row["server"] for row in ranking], ["192.0.2.1", "192.0.2.2"])
+        self.assertEqual((ranking[0]["median"], ranking[1]["loss"]), (20.0, 0.333))
+        self.assertEqual([row["server"] for row in self.store.ranking(["192.0.2.2"], window=600)], ["192.0.2.2"])
+        self.assertEqual(self.store.ranking(window=600, min_samples=4), [])
+        self.assertEqual(self.store.ranking(window=600, method="ping"), [])
+
+    def test_samples_outside_the_window_are_ignored(self):
+        self.store.record_results({"192.0.2.1": [10.0]}, ts=BASE - 1200)
+        self.assertEqual(self.store.ranking(window=600), [])
+
+    def test_rollup_and_trend(self):
+        self.record_minutes()
+        self.store.rollup(now=BASE + 2 * HOUR)
+        minutes = self.store.trend("192.0.2.1", since=BASE, period=MINUTE)
+        self.assertEqual([(b["bucket"], b["count"], b["loss"]) for b in minutes],
+                         [(BASE, 2, 0.0), (BASE + MINUTE, 1, 1.0)])
+        self.assertEqual((minutes[0]["min"], minutes[0]["median"], minutes[0]["max"]), (10.0, 20.0, 30.0))
+        self.assertIsNone(minutes[1]["median"])
+        hours = self.store.trend("192.0.2.1", since=BASE, period=HOUR)
+        self.assertEqual([(b["bucket"], b["count"], b["loss"]) for b in hours], [(BASE, 3, 0.333)])
+        # Already rolled-up buckets are not written again
+        self.assertEqual(self.store.rollup(now=BASE + 2 * HOUR), 0)
+
+    def test_compact_keeps_rollups_within_retention(self):
+        self.record_minutes()
+        self.now = BASE + 3 * HOUR
+        self.assertGreater(self.store.compact(), 0)
+        self.assertEqual(self.store.trend("192.0.2.1", since=BASE, period=MINUTE), [])
+        self.assertEqual(len(self.store.trend("192.0.2.1", since=BASE, period=HOUR)), 1)
+        # Past raw retention, rankings come from the hourly rollups
+        ranking = self.store.ranking(window=DAY)
+        self.assertEqual((ranking[0]["sent"], ranking[0]["received"], ranking[0]["median"]), (3, 2, 20.0))
+        self.assertEqual(self.store.ranking(window=600), [])
+        self.assertEqual(self.store.servers(), ["192.0.2.1"])
+
+        self.now = BASE + 2 * DAY
+        self.store.compact()
+        self.assertEqual(self.store.servers(), [])
+
+    def test_raw_samples_wait_for_the_hourly_rollup(self):
+        self.record_at(10, "192.0.2.1", 10.0)
+        # Past raw retention, but the hour holding the sample has not ended
+        self.store.raw_retention = 0
+        self.now = BASE + 30 * MINUTE
+        self.store.compact()
+        self.store.raw_retention = HOUR
+        self.assertEqual(self.store.ranking(window=HOUR)[0]["sent"], 1)
+
+    def test_hot_domains(self):
+        self.store.record_domains({"a.example": 5, "b.example": 1, "c.example": 0})
+        self.store.record_domains({"B.example": 10})
+        self.store.record_domains({"old.example": 100}, ts=BASE - 8 * DAY)
+        self.assertEqual(self.store.hot_domains(), ["b.example", "a.example"])
+        self.assertEqual(self.store.hot_domains(limit=1), ["b.example"])
+
+if __name__ == "__main__":
+    unittest.main()
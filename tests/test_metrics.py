@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import tempfile
+import unittest
+
+from netswitch.metrics import MetricsRegistry, record_operation, span, timed, write_metrics
+
+class PrometheusFormatTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def test_counter_with_help_and_type(self):
+        self.registry.inc("netswitch_probes_total", help="Probes sent", server="1.1.1.1")
+        self.registry.inc("netswitch_probes_total", 2, server="1.1.1.1")
+        self.assertEqual(self.registry.to_prometheus(),
+                         "# HELP netswitch_probes_total Probes sent\n"
+                         "# TYPE netswitch_probes_total counter\n"
+                         'netswitch_probes_total{server="1.1.1.1"} 3\n')
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (0.05, 0.5, 5.0):
+            self.registry.observe("netswitch_op_seconds", value, kind="apply")
+        self.assertEqual(self.registry.to_prometheus().splitlines(), [
+            "# TYPE netswitch_op_seconds histogram",
+            'netswitch_op_seconds_bucket{kind="apply",le="0.1"} 1',
+            'netswitch_op_seconds_bucket{kind="apply",le="1.0"} 2',
+            'netswitch_op_seconds_bucket{kind="apply",le="+Inf"} 3',
+            'netswitch_op_seconds_sum{kind="apply"} 5.550000',
+            'netswitch_op_seconds_count{kind="apply"} 3',
+        ])
+
+    def test_label_values_are_escaped(self):
+        self.registry.inc("netswitch_errors_total", adapter='Wi-Fi "2"\\x\nnext')
+        self.assertIn('netswitch_errors_total{adapter="Wi-Fi \\"2\\"\\\\x\\nnext"} 1', self.registry.to_prometheus())
+
+    def test_help_text_is_escaped(self):
+        self.registry.inc("netswitch_x_total", help="first\\second\nline")
+        self.assertIn("# HELP netswitch_x_total first\\\\second\\nline\n", self.registry.to_prometheus())
+
+    def test_one_header_per_metric_name(self):
+        self.registry.inc("netswitch_probes_total", server="a")
+        self.registry.inc("netswitch_probes_total", server="b")
+        self.assertEqual(self.registry.to_prometheus().count("# TYPE netswitch_probes_total"), 1)
+
+class OperationMetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def counters(self):
+        return {(c["name"], c["labels"].get("outcome")): c["value"] for c in self.registry.snapshot()["counters"]}
+
+    def test_record_operation_counts_outcomes(self):
+        record_operation("apply", 0.2, "ok", self.registry)
+        record_operation("apply", 0.3, "ok", self.registry)
+        record_operation("apply", 30.0, "timeout", self.registry)
+        self.assertEqual(self.counters(), {("netswitch_apply_total", "ok"): 2, ("netswitch_apply_total", "timeout"): 1})
+        histogram = self.registry.snapshot()["histograms"][0]
+        self.assertEqual((histogram["name"], histogram["count"], histogram["sum"]), ("netswitch_apply_seconds", 3, 30.5))
+
+    def test_timed_classifies_exceptions(self):
+        with timed("command", self.registry):
+            pass
+        with self.assertRaises(subprocess.TimeoutExpired):
+            with timed("command", self.registry):
+                raise subprocess.TimeoutExpired(["netsh"], 1)
+        with self.assertRaises(ValueError):
+            with timed("command", self.registry):
+                raise ValueError("bad")
+        with timed("command", self.registry) as op:
+            op["outcome"] = "exit_nonzero"
+        self.assertEqual(self.counters(), {
+            ("netswitch_command_total", "ok"): 1, ("netswitch_command_total", "timeout"): 1,
+            ("netswitch_command_total", "error"): 1, ("netswitch_command_total", "exit_nonzero"): 1,
+        })
+
+    def test_span_is_timed(self):
+        with span("apply", self.registry):
+            pass
+        counter = self.registry.snapshot()["counters"][0]
+        self.assertEqual((counter["name"], counter["labels"]), ("netswitch_span_total", {"outcome": "ok", "span": "apply"}))
+
+class ExportTest(unittest.TestCase):
+
+    def test_json_and_prometheus_files(self):
+        registry = MetricsRegistry()
+        record_operation("flush", 0.01, "ok", registry)
+        registry.record_error(command="netsh", outcome="exit_nonzero", returncode=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "metrics.json")
+            write_metrics(json_path, registry)
+            with open(json_path, encoding="utf-8") as source:
+                data = json.load(source)
+            self.assertEqual(data["counters"], [{"name": "netswitch_flush_total", "labels": {"outcome": "ok"}, "value": 1}])
+            self.assertEqual(data["histograms"][0]["buckets"]["0.01"], 1)
+            self.assertEqual(data["errors"][0]["returncode"], 1)
+
+            prom_path = os.path.join(tmp, "metrics.prom")
+            write_metrics(prom_path, registry)
+            with open(prom_path, encoding="utf-8") as source:
+                self.assertEqual(source.read(), registry.to_prometheus())
+
+    def test_errors_are_bounded(self):
+        registry = MetricsRegistry(max_errors=2)
+        for i in range(5):
+            registry.record_error(index=i)
+        self.assertEqual([e["index"] for e in registry.errors()], [3, 4])
+
+if __name__ == "__main__":
+    unittest.main()
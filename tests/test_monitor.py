@@ -0,0 +1,104 @@
+import threading
+import unittest
+
+from netswitch.monitor import ResolverMonitor
+
+ACTIVE = "192.0.2.1"
+CANDIDATE = "192.0.2.2"
+
+class FailoverTest(unittest.TestCase):
+    """Hysteresis, cool-down and margin of ResolverMonitor with an injected clock"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.latency = {ACTIVE: 100.0, CANDIDATE: 20.0}
+        self.applied = []
+        self.apply_ok = True
+
+    def apply(self, servers):
+        self.applied.append(servers)
+        return self.apply_ok
+
+    def make_monitor(self, **kwargs):
+        kwargs = dict(dict(interval=10.0, fast_interval=10.0, margin_ms=20.0, window=60.0, cooldown=300.0,
+                           alpha=1.0), **kwargs)
+        return ResolverMonitor(ACTIVE, [CANDIDATE], apply_fn=self.apply, probe_fn=self.latency.get,
+                               clock=lambda: self.now, **kwargs)
+
+    def tick_at(self, monitor, now):
+        self.now = now
+        monitor.tick()
+        return monitor.events[-1]["event"] if monitor.events else None
+
+    def test_no_switch_inside_the_window(self):
+        monitor = self.make_monitor()
+        self.assertIsNone(self.tick_at(monitor, 0))
+        self.assertIsNone(self.tick_at(monitor, 50))
+        self.assertEqual((monitor.active, self.applied), (ACTIVE, []))
+
+    def test_switch_once_the_window_has_passed(self):
+        monitor = self.make_monitor()
+        self.tick_at(monitor, 0)
+        self.assertEqual(self.tick_at(monitor, 60), "switched")
+        self.assertEqual(monitor.active, CANDIDATE)
+        self.assertEqual(self.applied, [[CANDIDATE, ACTIVE]])
+
+    def test_improvement_within_the_margin_never_switches(self):
+        self.latency[CANDIDATE] = 85.0
+        monitor = self.make_monitor()
+        for now in (0, 60, 120):
+            self.tick_at(monitor, now)
+        self.assertEqual((monitor.active, self.applied), (ACTIVE, []))
+
+    def test_cooldown_blocks_a_second_switch(self):
+        monitor = self.make_monitor()
+        self.tick_at(monitor, 0)
+        self.tick_at(monitor, 60)
+        self.latency.update({ACTIVE: 5.0, CANDIDATE: 100.0})
+        self.tick_at(monitor, 70)
+        self.tick_at(monitor, 140)
+        self.assertEqual((monitor.active, len(self.applied)), (CANDIDATE, 1))
+        self.assertEqual(self.tick_at(monitor, 360), "switched")
+        self.assertEqual(monitor.active, ACTIVE)
+
+    def test_failed_switch_keeps_the_active_resolver(self):
+        self.apply_ok = False
+        monitor = self.make_monitor()
+        self.tick_at(monitor, 0)
+        self.assertEqual(self.tick_at(monitor, 60), "switch_failed")
+        self.assertEqual(monitor.active, ACTIVE)
+        self.assertEqual(monitor.events[-1]["candidate"], CANDIDATE)
+
+class MonitorLoopTest(unittest.TestCase):
+
+    def test_restart_keeps_probing(self):
+        probed = threading.Semaphore(0)
+
+        def probe(server):
+            probed.release()
+            return 10.0
+        monitor = ResolverMonitor(ACTIVE, [], probe_fn=probe, apply_fn=lambda servers: True,
+                                  interval=0.01)
+        for _ in range(2):
+            monitor.start()
+            self.assertTrue(probed.acquire(timeout=5))
+            monitor.stop()
+        self.assertEqual([e for e in monitor.events if e["event"] == "tick_failed"], [])
+
+    def test_loop_errors_are_reported(self):
+        failed = threading.Event()
+
+        def probe(server):
+            raise RuntimeError("probe broke")
+        monitor = ResolverMonitor(ACTIVE, [], probe_fn=probe, apply_fn=lambda servers: True,
+                                  on_event=lambda event: failed.set())
+        monitor.start()
+        try:
+            self.assertTrue(failed.wait(5))
+        finally:
+            monitor.stop()
+        self.assertEqual(monitor.events[0]["event"], "tick_failed")
+        self.assertEqual(monitor.events[0]["error"], "probe broke")
+
+if __name__ == "__main__":
+    unittest.main()
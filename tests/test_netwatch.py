@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from netswitch.benchmark import find_fastest_dns, summarize_samples
+from netswitch.history import HistoryStore
+from netswitch.netwatch import NetworkChangeDetector, read_proc_network_context
+from netswitch.probecache import ProbeCache
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "proc", "home")
+
+class ProcNetworkContextTest(unittest.TestCase):
+    """read_proc_network_context against a recorded /proc and /sys tree"""
+
+    def test_routed_interfaces_that_are_up(self):
+        self.assertEqual(read_proc_network_context(FIXTURE), {
+            "eth0": {
+                "gateway": "192.168.1.1",
+                "subnet": "192.168.1.0/24",
+                "address": "192.168.1.10",
+                "gateway6": "fe80::1",
+                "address6": "2001:db8::10",
+            },
+        })
+
+    def test_missing_route_table(self):
+        with tempfile.TemporaryDirectory() as root:
+            self.assertIsNone(read_proc_network_context(root))
+
+    def test_detector_reports_a_new_gateway(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, "root")
+            shutil.copytree(FIXTURE, root)
+            detector = NetworkChangeDetector(context_fn=lambda: read_proc_network_context(root))
+            self.assertIsNone(detector.poll())
+            route = os.path.join(root, "proc", "net", "route")
+            with open(route) as source:
+                text = source.read()
+            with open(route, "w") as target:
+                target.write(text.replace("0101A8C0", "FE01A8C0"))
+            event = detector.poll()
+            self.assertIsNotNone(event)
+            self.assertEqual(event["context"]["eth0"]["gateway"], "192.168.1.254")
+
+class NetworkChangeHistoryTest(unittest.TestCase):
+    """After a network change, history from the previous network must not stand in for a probe"""
+
+    SERVERS = ["192.0.2.1", "192.0.2.2"]
+
+    def setUp(self):
+        self.now = 1000.0
+        self.network = {"eth0": {"subnet": "192.168.1.0/24", "gateway": "192.168.1.1"}}
+        self.detector = NetworkChangeDetector(context_fn=lambda: self.network, clock=lambda: self.now)
+        self.history = HistoryStore(":memory:", clock=lambda: self.now)
+        self.addCleanup(self.history.close)
+        self.cache = ProbeCache(context_fn=lambda: self.detector.fingerprint, clock=lambda: self.now)
+        self.probed = []
+
+    def benchmark(self, max_age):
+        def probe(servers, **kwargs):
+            self.probed.extend(servers)
+            return [summarize_samples(server, [5.0, 5.0, 5.0]) for server in servers]
+        with mock.patch("netswitch.benchmark.benchmark_dns", probe):
+            return find_fastest_dns(servers=self.SERVERS, history=self.history, max_age=max_age, cache=self.cache)
+
+    def move_to_office(self):
+        self.detector.poll()
+        self.history.record_results({server: [40.0, 40.0, 40.0] for server in self.SERVERS}, ts=self.now - 10)
+        self.network = {"wlan0": {"subnet": "10.0.0.0/24", "gateway": "10.0.0.1"}}
+        self.cache.on_network_change(self.detector.poll())
+
+    def test_history_window_starts_at_the_change(self):
+        self.assertEqual(self.detector.history_window(300), 300)
+        self.move_to_office()
+        self.assertEqual(self.detector.history_window(300), 0)
+        self.now += 100
+        self.assertEqual(self.detector.history_window(300), 100)
+
+    def test_new_network_is_probed(self):
+        self.move_to_office()
+        ranking = self.benchmark(self.detector.history_window(300))
+        self.assertEqual(sorted(self.probed), self.SERVERS)
+        self.assertEqual(ranking[0]["median"], 5.0)
+        row, _ = self.cache.get("192.0.2.1")
+        self.assertEqual(row["median"], 5.0)
+
+    def test_history_from_the_same_network_is_reused(self):
+        self.detector.poll()
+        self.history.record_results({server: [40.0, 40.0, 40.0] for server in self.SERVERS}, ts=self.now - 10)
+        self.benchmark(self.detector.history_window(300))
+        self.assertEqual(self.probed, [])
+
+if __name__ == "__main__":
+    unittest.main()
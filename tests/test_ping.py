@@ -0,0 +1,60 @@
+import os
+import unittest
+
+from netswitch.ping import parse_ping_output
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "ping")
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8", newline="") as fixture:
+        return fixture.read()
+
+class WindowsPingParserTest(unittest.TestCase):
+
+    def test_all_replies(self):
+        result = parse_ping_output(load("windows_ok.txt"), "win32")
+        self.assertEqual(result["samples"], [12.0, 11.0, 0.5, 14.0])
+        self.assertEqual((result["sent"], result["received"], result["loss"]), (4, 4, 0.0))
+
+    def test_timeouts_keep_their_position(self):
+        result = parse_ping_output(load("windows_timeout.txt"), "win32")
+        self.assertEqual(result["samples"], [21.0, None, 19.0, None])
+        self.assertEqual(result["loss"], 0.5)
+
+    def test_unreachable_counts_as_lost(self):
+        # The summary reports 4 received; loss must agree with the sample vector instead
+        result = parse_ping_output(load("windows_unreachable.txt"), "win32")
+        self.assertEqual(result["samples"], [None, 3.0, None, 4.0])
+        self.assertEqual(result["received"], 2)
+        self.assertEqual(result["loss"], 0.5)
+
+class UnixPingParserTest(unittest.TestCase):
+
+    def test_linux_all_replies(self):
+        result = parse_ping_output(load("linux_ok.txt"), "linux")
+        self.assertEqual(result["samples"], [12.3, 11.0, 13.7, 12.1])
+        self.assertEqual(result["loss"], 0.0)
+
+    def test_linux_lost_replies_leave_gaps(self):
+        result = parse_ping_output(load("linux_loss.txt"), "linux")
+        self.assertEqual(result["samples"], [None, 18.4, None, 17.9])
+        self.assertEqual((result["sent"], result["received"], result["loss"]), (4, 2, 0.5))
+
+    def test_macos_sequence_starts_at_zero(self):
+        result = parse_ping_output(load("macos_ok.txt"), "darwin")
+        self.assertEqual(result["samples"], [12.304, 11.012, 13.65])
+
+    def test_macos_first_echo_lost(self):
+        expected = [None, 12.3, 11.0]
+        self.assertEqual(parse_ping_output(load("macos_first_lost.txt"), "darwin")["samples"], expected)
+        # The timeout line for icmp_seq 0 gives the base away without the platform
+        self.assertEqual(parse_ping_output(load("macos_first_lost.txt"), "linux")["samples"], expected)
+        self.assertEqual(parse_ping_output(load("macos_first_lost.txt"), "darwin")["loss"], 0.333)
+
+    def test_garbage_and_empty_output(self):
+        for text in ("", "ping: unknown host\n", None):
+            result = parse_ping_output(text, "linux")
+            self.assertEqual((result["samples"], result["sent"], result["loss"]), ([], 0, 1.0))
+
+if __name__ == "__main__":
+    unittest.main()
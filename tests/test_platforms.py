@@ -0,0 +1,183 @@
+import os
+import shutil
+import signal
+import tempfile
+import unittest
+
+from netswitch.platforms import LinuxBackend, PlatformBackend
+
+from .fakes import FakeRunner
+
+def write(root, relative, text=""):
+    path = os.path.join(root, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as target:
+        target.write(text)
+    return path
+
+def read(root, relative):
+    with open(os.path.join(root, relative), encoding="utf-8") as source:
+        return source.read()
+
+def static(*servers):
+    return {"ip": {"source": "static", "servers": list(servers)}}
+
+DHCP = {"ip": {"source": "dhcp", "servers": []}}
+ORIGINAL = "# Generated by NetworkManager\nsearch lan\nnameserver 192.168.1.1\n"
+
+class LinuxBackendTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="netswitch-root-")
+        self.addCleanup(shutil.rmtree, self.root)
+        self.signals = []
+        self.runner = FakeRunner()
+        for name, flags, operstate in (("eth0", "0x1003", "up"), ("wlan0", "0x1002", "down"), ("lo", "0x9", "unknown")):
+            write(self.root, f"sys/class/net/{name}/flags", flags + "\n")
+            write(self.root, f"sys/class/net/{name}/operstate", operstate + "\n")
+            write(self.root, f"sys/class/net/{name}/type", "772\n" if name == "lo" else "1\n")
+        os.makedirs(os.path.join(self.root, "sys/class/net/wlan0/wireless"))
+
+    def backend(self, mode):
+        return LinuxBackend(self.root, mode=mode, runner=self.runner,
+                            signal_fn=lambda pid, signum: self.signals.append((pid, signum)))
+
+    def add_process(self, pid, comm):
+        write(self.root, f"proc/{pid}/comm", comm + "\n")
+
+class LinuxAdaptersTest(LinuxBackendTestCase):
+
+    def test_adapters_from_sys(self):
+        records = self.backend("resolvconf").list_adapters()
+        self.assertEqual(records, [
+            {"admin_state": "Enabled", "state": "Connected", "type": "Dedicated", "name": "eth0"},
+            {"admin_state": "Disabled", "state": "Disconnected", "type": "Wireless", "name": "wlan0"},
+        ])
+
+class ResolvConfTest(LinuxBackendTestCase):
+
+    def test_apply_and_rollback_plain_file(self):
+        write(self.root, "etc/resolv.conf", ORIGINAL)
+        backend = self.backend("resolvconf")
+        result = backend.apply_dns_config({"eth0": static("1.1.1.1", "1.0.0.1")})
+        self.assertTrue(result["ok"])
+        text = read(self.root, "etc/resolv.conf")
+        self.assertIn("nameserver 1.1.1.1\nnameserver 1.0.0.1\n", text)
+        self.assertIn("search lan", text)
+        self.assertNotIn("192.168.1.1", text)
+        self.assertEqual(backend.get_dns_servers()["eth0"]["ip"], {"source": "static", "servers": ["1.1.1.1", "1.0.0.1"]})
+
+        self.assertTrue(backend.apply_dns_config({"eth0": DHCP})["ok"])
+        self.assertEqual(read(self.root, "etc/resolv.conf"), ORIGINAL)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "etc/resolv.conf.netswitch-backup")))
+
+    def test_symlinked_resolv_conf_keeps_its_link(self):
+        # NetworkManager style: an absolute link, taken relative to the root
+        write(self.root, "run/NetworkManager/resolv.conf", ORIGINAL)
+        os.makedirs(os.path.join(self.root, "etc"))
+        os.symlink("/run/NetworkManager/resolv.conf", os.path.join(self.root, "etc/resolv.conf"))
+        link = os.path.join(self.root, "etc/resolv.conf")
+        backend = self.backend("resolvconf")
+
+        self.assertTrue(backend.apply_dns_config({"eth0": static("9.9.9.9")})["ok"])
+        self.assertTrue(os.path.islink(link))
+        self.assertIn("nameserver 9.9.9.9", read(self.root, "run/NetworkManager/resolv.conf"))
+
+        self.assertTrue(backend.apply_dns_config({"eth0": DHCP})["ok"])
+        self.assertTrue(os.path.islink(link))
+        self.assertEqual(os.readlink(link), "/run/NetworkManager/resolv.conf")
+        self.assertEqual(read(self.root, "run/NetworkManager/resolv.conf"), ORIGINAL)
+
+    def test_relative_symlink(self):
+        write(self.root, "etc/resolvconf/run/resolv.conf", ORIGINAL)
+        os.symlink("resolvconf/run/resolv.conf", os.path.join(self.root, "etc/resolv.conf"))
+        backend = self.backend("resolvconf")
+        backend.apply_dns_config({"eth0": static("8.8.8.8")})
+        backend.apply_dns_config({"eth0": DHCP})
+        self.assertTrue(os.path.islink(os.path.join(self.root, "etc/resolv.conf")))
+        self.assertEqual(read(self.root, "etc/resolvconf/run/resolv.conf"), ORIGINAL)
+
+class ResolvedTest(LinuxBackendTestCase):
+
+    def setUp(self):
+        super().setUp()
+        write(self.root, "run/systemd/resolve/resolv.conf", "nameserver 192.168.1.1\n")
+        self.add_process(412, "systemd-resolved")
+
+    def test_drop_in_and_sighup_on_v253(self):
+        write(self.root, "usr/lib/systemd/libsystemd-shared-255.so")
+        backend = self.backend(None)
+        self.assertEqual(backend.mode, "resolved")
+        self.assertTrue(backend.apply_dns_config({"eth0": static("1.1.1.1")})["ok"])
+        self.assertIn("DNS=1.1.1.1\nDomains=~.\n", read(self.root, "etc/systemd/resolved.conf.d/netswitch.conf"))
+        self.assertEqual(self.signals, [(412, signal.SIGHUP)])
+        self.assertEqual(self.runner.calls, [])
+
+    def test_older_resolved_is_restarted_not_signalled(self):
+        write(self.root, "usr/lib/systemd/libsystemd-shared-249.so")
+        backend = self.backend(None)
+        self.assertTrue(backend.apply_dns_config({"eth0": static("1.1.1.1")})["ok"])
+        self.assertEqual(self.signals, [])
+        self.assertEqual(self.runner.calls, [["systemctl", "try-restart", "systemd-resolved.service"]])
+
+    def test_unknown_version_is_restarted(self):
+        self.backend(None).apply_dns_config({"eth0": static("1.1.1.1")})
+        self.assertEqual(self.signals, [])
+        self.assertEqual(len(self.runner.calls), 1)
+
+    def test_denied_sighup_fails_the_apply(self):
+        write(self.root, "usr/lib/systemd/libsystemd-shared-255.so")
+
+        def deny(pid, signum):
+            raise PermissionError(1, "Operation not permitted")
+        backend = LinuxBackend(self.root, mode=None, runner=self.runner, signal_fn=deny)
+        result = backend.apply_dns_config({"eth0": static("1.1.1.1")})
+        self.assertFalse(result["ok"])
+        self.assertIn("Permission denied", result["error"])
+        self.assertEqual(result["adapters"][0]["error"], result["error"])
+
+    def test_failed_restart_fails_the_apply(self):
+        write(self.root, "usr/lib/systemd/libsystemd-shared-249.so")
+        self.runner.returncode = 1
+        result = self.backend(None).apply_dns_config({"eth0": static("1.1.1.1")})
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["error"], "systemctl try-restart failed.")
+
+    def test_stopped_resolved_fails_the_apply(self):
+        write(self.root, "usr/lib/systemd/libsystemd-shared-255.so")
+        os.remove(os.path.join(self.root, "proc/412/comm"))
+        result = self.backend(None).apply_dns_config({"eth0": static("1.1.1.1")})
+        self.assertEqual((result["ok"], result["error"]), (False, "systemd-resolved is not running."))
+
+    def test_rollback_removes_drop_in(self):
+        backend = self.backend(None)
+        backend.apply_dns_config({"eth0": static("1.1.1.1")})
+        self.assertTrue(backend.apply_dns_config({"eth0": DHCP})["ok"])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "etc/systemd/resolved.conf.d/netswitch.conf")))
+        self.assertEqual(backend.get_dns_servers()["eth0"]["ip"], {"source": "dhcp", "servers": ["192.168.1.1"]})
+
+class PlatformBackendTest(unittest.TestCase):
+
+    def test_backend_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            PlatformBackend()
+
+class LinuxFlushTest(LinuxBackendTestCase):
+
+    def test_flush_signals_resolved(self):
+        self.add_process(412, "systemd-resolved")
+        self.assertEqual(self.backend("resolved").flush_dns()["method"], "systemd-resolved")
+        self.assertEqual(self.signals, [(412, signal.SIGUSR2)])
+
+    def test_flush_signals_dnsmasq(self):
+        self.add_process(77, "dnsmasq")
+        self.assertEqual(self.backend("resolvconf").flush_dns()["method"], "dnsmasq")
+        self.assertEqual(self.signals, [(77, signal.SIGHUP)])
+
+    def test_flush_without_cache(self):
+        result = self.backend("resolvconf").flush_dns()
+        self.assertEqual((result["ok"], result["method"]), (True, "none"))
+        self.assertEqual(self.runner.calls, [])
+
+if __name__ == "__main__":
+    unittest.main()
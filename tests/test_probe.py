@@ -0,0 +1,85 @@
+import struct
+import unittest
+
+from benchmarks.stubdns import StubDnsServer
+from netswitch.probe import build_dns_query, parse_dns_response, probe_dns
+
+class TruncatingStub(StubDnsServer):
+    """Answers UDP with TC=1 and no records, so only TCP carries the answer"""
+
+    def _reply_udp(self, query, client):
+        header = query[:2] + struct.pack("!HHHHH", 0x8380, 1, 0, 0, 0)
+        self._udp.sendto(header + query[12:], client)
+
+class SpoofingStub(StubDnsServer):
+    """Sends forged UDP replies first, then the real one unless `honest` is off"""
+
+    honest = True
+
+    def _reply_udp(self, query, client):
+        answer = self._answer(query)
+        qid = struct.unpack("!H", query[:2])[0]
+        wrong_id = struct.pack("!H", qid ^ 0xFFFF) + answer[2:]
+        wrong_question = self._answer(build_dns_query("spoofed.example", "A", qid))
+        for forged in (wrong_id, wrong_question):
+            self._udp.sendto(forged, client)
+        if self.honest:
+            self._udp.sendto(answer, client)
+
+class ProbeDnsTest(unittest.TestCase):
+    def stub(self, cls, **kwargs):
+        stub = cls(**kwargs).start()
+        self.addCleanup(stub.stop)
+        return stub
+
+    def test_truncated_udp_retries_over_tcp(self):
+        stub = self.stub(TruncatingStub, address="192.0.2.7")
+        result = probe_dns("127.0.0.1", "probe.example", port=stub.port, timeout=1.0)
+        self.assertTrue(result["ok"], result["error"])
+        self.assertEqual(result["transport"], "tcp")
+        self.assertEqual([a["address"] for a in result["answers"]], ["192.0.2.7"])
+        self.assertEqual(stub.queries, 2)
+
+    def test_spoofed_replies_are_skipped(self):
+        stub = self.stub(SpoofingStub, address="192.0.2.8")
+        result = probe_dns("127.0.0.1", "probe.example", port=stub.port, timeout=1.0)
+        self.assertTrue(result["ok"], result["error"])
+        self.assertEqual(result["transport"], "udp")
+        self.assertEqual([a["address"] for a in result["answers"]], ["192.0.2.8"])
+
+    def test_only_spoofed_replies_time_out(self):
+        stub = self.stub(SpoofingStub)
+        stub.honest = False
+        result = probe_dns("127.0.0.1", "probe.example", port=stub.port, timeout=0.3)
+        self.assertFalse(result["ok"])
+        self.assertEqual(result["error"], "Timed out")
+
+class ParseDnsResponseTest(unittest.TestCase):
+    def setUp(self):
+        self.query = build_dns_query("probe.example", "A", 0x1234)
+        stub = StubDnsServer()
+        self.addCleanup(stub.stop)
+        self.response = stub._answer(self.query)
+
+    def test_matching_response_parses(self):
+        response = parse_dns_response(self.response, 0x1234, self.query[12:])
+        self.assertEqual(response["answer_count"], 1)
+
+    def test_question_name_is_case_insensitive(self):
+        upper = build_dns_query("PROBE.example", "A", 0x1234)
+        self.assertEqual(parse_dns_response(self.response, 0x1234, upper[12:])["rcode"], "NOERROR")
+
+    def test_id_mismatch_is_rejected(self):
+        with self.assertRaisesRegex(ValueError, "ID mismatch"):
+            parse_dns_response(self.response, 0x4321, self.query[12:])
+
+    def test_question_mismatch_is_rejected(self):
+        other = build_dns_query("other.example", "A", 0x1234)
+        with self.assertRaisesRegex(ValueError, "question mismatch"):
+            parse_dns_response(self.response, 0x1234, other[12:])
+        aaaa = build_dns_query("probe.example", "AAAA", 0x1234)
+        with self.assertRaisesRegex(ValueError, "question mismatch"):
+            parse_dns_response(self.response, 0x1234, aaaa[12:])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import threading
+import tempfile
+import unittest
+from unittest import mock
+
+from netswitch.benchmark import find_fastest_dns, summarize_samples
+from netswitch.probecache import FRESH, STALE, ProbeCache
+
+def row(server, rtt):
+    return summarize_samples(server, [rtt, rtt, rtt])
+
+class ProbeCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.network = "home"
+
+    def make_cache(self, **kwargs):
+        kwargs.setdefault("context_fn", lambda: self.network)
+        kwargs.setdefault("context_ttl", 0)
+        return ProbeCache(ttl=60, stale_ttl=600, clock=lambda: self.now, **kwargs)
+
+    def test_fresh_then_stale_then_expired(self):
+        cache = self.make_cache()
+        cache.context()
+        cache.put(row("192.0.2.1", 10.0))
+        self.assertEqual(cache.get("192.0.2.1")[1], FRESH)
+        self.now += 60
+        self.assertEqual(cache.get("192.0.2.1")[1], STALE)
+        self.now += 540
+        self.assertEqual(cache.get("192.0.2.1"), (None, None))
+        self.assertEqual(len(cache), 0)
+
+    def test_lookup_splits_and_marks_rows(self):
+        cache = self.make_cache()
+        cache.context()
+        cache.put(row("192.0.2.1", 10.0))
+        self.now += 100
+        cache.put(row("192.0.2.2", 20.0))
+        rows, stale, missing = cache.lookup(["192.0.2.1", "192.0.2.2", "192.0.2.3"])
+        self.assertEqual((stale, missing), (["192.0.2.1"], ["192.0.2.3"]))
+        by_server = {r["server"]: r for r in rows}
+        self.assertEqual((by_server["192.0.2.1"]["age"], by_server["192.0.2.1"]["stale"]), (100.0, True))
+        self.assertNotIn("stale", by_server["192.0.2.2"])
+        self.assertNotIn("stale", cache.get("192.0.2.1")[0])
+
+    def test_rows_are_kept_per_network(self):
+        cache = self.make_cache()
+        cache.context()
+        cache.put(row("192.0.2.1", 10.0))
+        self.network = "office"
+        self.assertEqual(cache.lookup(["192.0.2.1"])[2], ["192.0.2.1"])
+        cache.put(row("192.0.2.1", 50.0))
+        cache.on_network_change({"current": "home"})
+        self.assertEqual(cache.get("192.0.2.1")[0]["median"], 10.0)
+        self.assertEqual(sorted(cache.contexts()), ["home", "office"])
+        cache.invalidate(context="office")
+        self.assertEqual(cache.contexts(), ["home"])
+
+    def test_least_recently_used_rows_are_evicted(self):
+        cache = self.make_cache(max_entries=2)
+        cache.context()
+        for i in range(3):
+            cache.put(row(f"192.0.2.{i}", 10.0))
+        self.assertEqual(cache.get("192.0.2.0"), (None, None))
+        self.assertEqual(len(cache), 2)
+
+    def test_json_round_trip_drops_expired_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            cache = self.make_cache(path=path)
+            cache.context()
+            cache.put(row("192.0.2.1", 10.0))
+            self.now += 500
+            cache.put(row("192.0.2.2", 20.0))
+            self.assertTrue(cache.save())
+            self.now += 200
+            loaded = self.make_cache(path=path)
+            self.assertEqual(len(loaded), 1)
+            self.assertEqual(loaded.get("192.0.2.2", context="home")[0]["median"], 20.0)
+
+            with open(path, "w") as broken:
+                broken.write("{not json")
+            self.assertEqual(len(self.make_cache(path=path)), 0)
+
+class CachedBenchmarkTest(unittest.TestCase):
+    """find_fastest_dns with a cache: stale rows are re-probed now or in the background"""
+
+    SERVERS = ["192.0.2.1", "192.0.2.2"]
+
+    def setUp(self):
+        self.now = 1000.0
+        self.probed = []
+
+    def benchmark(self, cache):
+        probed = threading.Event()
+
+        def probe(servers, **kwargs):
+            self.probed.append(sorted(servers))
+            probed.set()
+            return [row(server, 5.0) for server in servers]
+        with mock.patch("netswitch.benchmark.benchmark_dns", probe):
+            ranking = find_fastest_dns(servers=self.SERVERS, cache=cache)
+            self.assertTrue(probed.wait(5))
+        return ranking
+
+    def make_cache(self, background_refresh):
+        cache = ProbeCache(ttl=60, clock=lambda: self.now, context_fn=lambda: "home",
+                           background_refresh=background_refresh)
+        cache.context()
+        cache.put(row("192.0.2.1", 40.0))
+        cache.put(row("192.0.2.2", 40.0))
+        self.now += 120
+        return cache
+
+    def test_without_background_refresh_stale_rows_are_probed_now(self):
+        cache = self.make_cache(background_refresh=False)
+        ranking = self.benchmark(cache)
+        self.assertEqual(self.probed, [self.SERVERS])
+        self.assertEqual([r["median"] for r in ranking], [5.0, 5.0])
+        self.assertFalse(any(r.get("stale") for r in ranking))
+        self.assertEqual(cache.get("192.0.2.1"), (row("192.0.2.1", 5.0), FRESH))
+
+    def test_background_refresh_returns_marked_stale_rows(self):
+        cache = self.make_cache(background_refresh=True)
+        ranking = self.benchmark(cache)
+        self.assertTrue(all(r["stale"] and r["age"] == 120.0 for r in ranking))
+        self.assertEqual(self.probed, [self.SERVERS])
+
+if __name__ == "__main__":
+    unittest.main()
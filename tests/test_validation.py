@@ -0,0 +1,56 @@
+import unittest
+
+from netswitch.validation import is_ipv4, is_ipv6, normalize_address, parse_address, validate_addresses
+
+class AddressParsingTest(unittest.TestCase):
+
+    def test_ipv4_is_strict(self):
+        self.assertTrue(is_ipv4("192.0.2.1"))
+        for text in ("192.0.2.01", "256.0.0.1", "192.0.2", " 192.0.2.1", "192.0.2.1\n", None):
+            self.assertFalse(is_ipv4(text), text)
+
+    def test_ipv6_forms(self):
+        for text in ("2001:db8::1", "::1", "::", "::ffff:192.0.2.1", "fe80::1%eth0", "fe80::1%12",
+                     "2001:DB8:0:0:0:0:0:1"):
+            self.assertTrue(is_ipv6(text), text)
+
+    def test_invalid_ipv6(self):
+        for text in ("2001:db8::1::2", "2001:db8::g", "2001:db8::12345", "1:2:3:4:5:6:7:8:9",
+                     "fe80::1%", "fe80::1%eth 0", "fe80::1%a/b", "192.0.2.1", "", None):
+            self.assertFalse(is_ipv6(text), text)
+
+    def test_normalize(self):
+        self.assertEqual(normalize_address("2001:DB8:0:0:0:0:0:1"), "2001:db8::1")
+        self.assertEqual(normalize_address("::ffff:192.0.2.1"), "192.0.2.1")
+        self.assertEqual(normalize_address("::FFFF:c000:0201"), "192.0.2.1")
+        self.assertEqual(normalize_address("FE80:0::1%eth0"), "fe80::1%eth0")
+        self.assertIsNone(normalize_address("2001:db8::1::2"))
+
+    def test_parse(self):
+        self.assertEqual(parse_address("::ffff:192.0.2.1").version, 4)
+        self.assertEqual(parse_address("fe80::1%eth0").scope_id, "eth0")
+        self.assertIsNone(parse_address("not-an-address"))
+
+class ValidateAddressesTest(unittest.TestCase):
+
+    def test_normalizes_and_dedupes(self):
+        result = validate_addresses([" 1.1.1.1", "::ffff:1.1.1.1", "2606:4700:4700:0::1111", "bogus",
+                                     "2606:4700:4700::1111"])
+        self.assertEqual(result, {"valid": ["1.1.1.1", "2606:4700:4700::1111"], "invalid": ["bogus"],
+                                  "duplicates": 2})
+
+    def test_family_filter(self):
+        self.assertEqual(validate_addresses(["1.1.1.1", "2001:db8::1"], family=6)["valid"], ["2001:db8::1"])
+        self.assertEqual(validate_addresses(["1.1.1.1", "2001:db8::1"], family=4)["valid"], ["1.1.1.1"])
+
+    def test_non_routable_addresses_are_rejected(self):
+        rejected = ["::", "0.0.0.0", "0.1.2.3", "224.0.0.251", "ff02::fb", "255.255.255.255", "240.0.0.1",
+                    "::ffff:0.0.0.0"]
+        self.assertEqual(validate_addresses(rejected)["invalid"], rejected)
+
+    def test_local_servers_are_kept(self):
+        local = ["127.0.0.53", "::1", "fe80::1%eth0", "192.168.1.1", "fd00::53"]
+        self.assertEqual(validate_addresses(local)["valid"], local)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import socket
+import unittest
+from unittest import mock
+
+from netswitch.warmup import warm_up
+
+def _raise(errno):
+    def getaddrinfo(*args, **kwargs):
+        raise socket.gaierror(errno, "lookup failed")
+    return getaddrinfo
+
+class SystemWarmupTest(unittest.TestCase):
+    """Warm-up through the OS resolver tells missing names from a resolver that cannot be reached"""
+
+    def run_warmup(self, getaddrinfo):
+        with mock.patch("netswitch.warmup.socket.getaddrinfo", getaddrinfo):
+            return warm_up(domains=["example.com", "example.org"])
+
+    def test_offline_host_is_a_failure(self):
+        result = self.run_warmup(_raise(socket.EAI_AGAIN))
+        self.assertFalse(result["ok"])
+        self.assertEqual((result["misses"], result["failures"]), (2, 2))
+        self.assertTrue(result["error"])
+
+    def test_unknown_names_are_misses(self):
+        result = self.run_warmup(_raise(socket.EAI_NONAME))
+        self.assertTrue(result["ok"])
+        self.assertEqual((result["misses"], result["failures"]), (2, 0))
+
+    def test_answers_are_hits(self):
+        result = self.run_warmup(lambda *args, **kwargs: [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("192.0.2.1", 0))])
+        self.assertEqual((result["hits"], result["misses"]), (2, 0))
+
+if __name__ == "__main__":
+    unittest.main()